@@ -0,0 +1,66 @@
+import discord
+import guild_index
+from typing import Iterable
+from database import async_queries, cache
+
+# Kinds of season artifacts. Player kinds are keyed by player_id, tribe kinds
+# by tribe_id, and 1-1s by both player ids (smallest first).
+PLAYER_ROLE = "player_role"
+TRIBE_ROLE = "tribe_role"
+SUBMISSIONS = "submissions"
+CONFESSIONAL = "confessional"
+TRIBE_CHAT = "tribe_chat"
+TRIBE_VC = "tribe_vc"
+ONE_ON_ONE = "one_on_one"
+
+ROLE_KINDS = (PLAYER_ROLE, TRIBE_ROLE)
+
+def pair_key(player1_id: int, player2_id: int) -> tuple[int, int]:
+    return (min(player1_id, player2_id), max(player1_id, player2_id))
+
+def _resolve(guild: discord.Guild, kind: str, discord_id: int | None):
+    if discord_id is None:
+        return None
+    if kind in ROLE_KINDS:
+        return guild.get_role(discord_id)
+    return guild.get_channel(discord_id)
+
+def _find_by_name(guild: discord.Guild, kind: str, names: Iterable[str]):
+    for name in names:
+        if kind in ROLE_KINDS:
+            found = guild_index.get_role(guild, name)
+        else:
+            found = guild_index.get_channel(guild, name)
+        if found is not None:
+            return found
+    return None
+
+async def get(guild: discord.Guild, kind: str, entity_id: int, other_id: int = 0, names: Iterable[str] = (), adopt: bool = True):
+    """The role or channel stored for an entity.
+
+    Falls back to the first of names that exists in the guild and, if adopt,
+    stores its id, so objects made before ids were stored are only looked up
+    by name once.
+    """
+    ids = cache.artifacts.get(guild.id)
+    if ids is None:
+        ids = await async_queries.get_artifacts(server_id=guild.id)
+    found = _resolve(guild, kind, ids.get((kind, entity_id, other_id)))
+    if found is None:
+        found = _find_by_name(guild, kind, names)
+        if found is not None and adopt:
+            await record(guild, kind, entity_id, found, other_id)
+    return found
+
+def get_cached(guild: discord.Guild, kind: str, entity_id: int, other_id: int = 0):
+    """Like get(), for sync callers: only ids already loaded, no name fallback."""
+    ids = cache.artifacts.get(guild.id)
+    if ids is None:
+        return None
+    return _resolve(guild, kind, ids.get((kind, entity_id, other_id)))
+
+async def record(guild: discord.Guild, kind: str, entity_id: int, item: discord.abc.Snowflake, other_id: int = 0):
+    await async_queries.set_artifact(server_id=guild.id, kind=kind, entity_id=entity_id, discord_id=item.id, other_id=other_id)
+
+async def forget(guild: discord.Guild, kind: str, entity_id: int, other_id: int = 0):
+    await async_queries.delete_artifact(server_id=guild.id, kind=kind, entity_id=entity_id, other_id=other_id)
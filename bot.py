@@ -1,11 +1,15 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import logging
 import os
 from commands import *
 from dotenv import load_dotenv
-from database import connection, queries
+import config
+import guild_index
+import metrics
+from database import async_queries
+from startup import run_startup, sync_user
 
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
@@ -16,109 +20,164 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = commands.Bot(command_prefix='!', intents=intents, http_trace=metrics.http_trace())
+
+@bot.event
+async def setup_hook():
+    # One handler for every setup button ever sent, so they work after a restart.
+    bot.add_dynamic_items(PersistentButton)
+    metrics.install_views()
+    if config.METRICS_PORT:
+        await metrics.serve(config.METRICS_PORT)
 
 @bot.event
 async def on_ready():
     print(f'Logged in as {bot.user} (ID: {bot.user.id})')
-    try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} commands.")
-    except Exception as e:
-        print(f"Failed to sync commands: {e}")
-
-    connection.setup_tables()
-
-    user_count = 0
-    for guild in bot.guilds:
-        print(f"Syncing members from guild: {guild.name}")
-        async for member in guild.fetch_members(limit=None):
-            if not member.bot:
-                discord_id = member.id
-                username = str(member)
-                success = queries.add_user(discord_id, username)
-                if success:
-                    user_count += 1
-
-    print(f"Finished syncing {user_count} new users.")
+    await run_startup(bot)
+    if not checkpoint_database.is_running():
+        checkpoint_database.start()
     print("Ready to go.")
 
+@tasks.loop(seconds=config.WAL_CHECKPOINT_INTERVAL)
+async def checkpoint_database():
+    await async_queries.checkpoint()
+
+@bot.event
+async def on_member_join(member: discord.Member):
+    await sync_user(member)
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    if str(before) != str(after):
+        await sync_user(after)
+
+@bot.event
+async def on_user_update(before: discord.User, after: discord.User):
+    if str(before) != str(after):
+        await sync_user(after)
+
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    guild_index.add(role)
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    guild_index.remove(role)
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    guild_index.update(before, after)
+
+@bot.event
+async def on_guild_channel_create(channel: discord.abc.GuildChannel):
+    guild_index.add(channel)
+
+@bot.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    guild_index.remove(channel)
+
+@bot.event
+async def on_guild_channel_update(before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+    guild_index.update(before, after)
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    guild_index.drop(guild)
+
 bot.tree.add_command(app_commands.Command(
     name="hello",
     description="Say hello to the bot",
-    callback=hello
+    callback=metrics.instrument(hello)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="deleteallchannels",
     description="Delete all current channels and categories in the server.",
-    callback=deleteallchannels
+    callback=metrics.instrument(deleteallchannels)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="clearallroles",
     description="Clear all roles except for the host.",
-    callback=clearallroles
+    callback=metrics.instrument(clearallroles)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="deleteroles",
     description="Delete all player and tribe roles.",
-    callback=deleteroles
+    callback=metrics.instrument(deleteroles)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="registerseason",
     description="Register a server as a new season in the database.",
-    callback=registerseason
+    callback=metrics.instrument(registerseason)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="addtribe",
     description="Create a new tribe for the season and register it in the database.",
-    callback=addtribe
+    callback=metrics.instrument(addtribe)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="addplayer",
     description="Add a new player to the season and register them in the database.",
-    callback=addplayer
+    callback=metrics.instrument(addplayer)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="setupserver",
     description="Set up the server.",
-    callback=setupserver
+    callback=metrics.instrument(setupserver)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="setupplayer",
     description="Set up a certain player on the season.",
-    callback=setupplayer
+    callback=metrics.instrument(setupplayer)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="setupallplayers",
     description="Send all player setup menus registered in the season.",
-    callback=setupallplayers
+    callback=metrics.instrument(setupallplayers)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="setuptribe",
     description="Set up a certain tribe on the season.",
-    callback=setuptribe
+    callback=metrics.instrument(setuptribe)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="setupalltribes",
     description="Send all tribe setup menus registered in the season.",
-    callback=setupalltribes
+    callback=metrics.instrument(setupalltribes)
 ))
 
 bot.tree.add_command(app_commands.Command(
     name="setupseason",
     description="Perform a season action.",
-    callback=setupseason
+    callback=metrics.instrument(setupseason)
+))
+
+bot.tree.add_command(app_commands.Command(
+    name="backfillartifacts",
+    description="Store the ids of this season's roles and channels made before ids were stored.",
+    callback=metrics.instrument(backfillartifacts)
+))
+
+bot.tree.add_command(app_commands.Command(
+    name="botstats",
+    description="Show command latency, database time and Discord API usage.",
+    callback=metrics.instrument(botstats)
+))
+
+bot.tree.add_command(app_commands.Command(
+    name="dbprofile",
+    description="Show the slowest database statements. Set reset to start counting again.",
+    callback=metrics.instrument(dbprofile)
 ))
 
 
@@ -2,6 +2,7 @@ import discord
 from discord import app_commands
 from helpers import *
 import re
+import metrics
 from interfaces import *
 
 async def deleteallchannels(interaction: discord.Interaction):
@@ -13,7 +14,7 @@ async def deleteallchannels(interaction: discord.Interaction):
 async def clearallroles(interaction: discord.Interaction):
     guild = interaction.guild
     bot_member = guild.me
-    host_role = discord.utils.get(guild.roles, name="Host")
+    host_role = guild_index.get_role(guild, "Host")
 
     await interaction.response.defer()
 
@@ -84,7 +85,7 @@ async def registerseason(interaction: discord.Interaction):
         return
     guild_id = guild.id
     guild_name = guild.name
-    result = queries.add_season(server_id=guild_id, server_name=guild_name)
+    result = await async_queries.add_season(server_id=guild_id, server_name=guild_name)
 
     if result == 1:
         await interaction.response.send_message(f"Season registered for **{guild_name}**!")
@@ -147,7 +148,7 @@ async def addplayer(interaction: discord.Interaction, player_name: str, discord_
 
     await interaction.response.defer()
     
-    result, player = queries.add_player(player_name, discord_id, server_id, tribe_name, tribe_iteration)
+    result, player = await async_queries.add_player(player_name, discord_id, server_id, tribe_name, tribe_iteration)
 
     if result == 1:
         await interaction.followup.send(f"**{player.display_name}** has been added to the current season.")
@@ -197,7 +198,7 @@ async def setupplayer(interaction: discord.Interaction, player_name: str):
         await interaction.response.send_message("This command must be used in a server.", ephemeral=True)
         return
     
-    player = get_first(queries.get_player(server_id=guild.id, display_name=player_name))
+    player = get_first(await async_queries.get_player(server_id=guild.id, display_name=player_name))
 
     if not player:
         await interaction.response.send_message(f"{player_name} not found on this season.")
@@ -214,13 +215,11 @@ async def setupallplayers(interaction:discord.Interaction):
         await interaction.response.send_message("This command must be used in a server.", ephemeral=True)
         return
     
-    players = queries.get_player(server_id=guild.id)
     await interaction.response.send_message("Setting up all players...", ephemeral=True)
 
-    for player in players:
-        embed = await get_player_embed(guild=guild, player=player)
-        view = PlayerSetupButtons(player=player)
-        await interaction.followup.send(embed=embed, view=view)
+    # Every embed carries its own player's buttons, so each still needs a message of its own.
+    player_embeds = await build_all_player_embeds(guild)
+    await send_setup_messages(interaction, "players", [(embed, PlayerSetupButtons(player=player)) for player, embed in player_embeds])
 
 @app_commands.autocomplete(tribe_string=autocomplete_tribes)
 async def setuptribe(interaction: discord.Interaction, tribe_string: str):
@@ -230,7 +229,7 @@ async def setuptribe(interaction: discord.Interaction, tribe_string: str):
         return
 
     tribe_name, iteration = parse_tribe_string(tribe_string)
-    tribe = get_first(queries.get_tribe(server_id=guild.id, tribe_name=tribe_name, tribe_iteration=iteration))
+    tribe = get_first(await async_queries.get_tribe(server_id=guild.id, tribe_name=tribe_name, tribe_iteration=iteration))
 
     if not tribe:
         await interaction.response.send_message("No matching tribe found.", ephemeral=True)
@@ -247,13 +246,10 @@ async def setupalltribes(interaction: discord.Interaction):
         await interaction.response.send_message("This command must be used in a server.", ephemeral=True)
         return
 
-    tribes = queries.get_tribe(server_id=guild.id)
     await interaction.response.send_message("Setting up all tribes...", ephemeral=True)
 
-    for tribe in tribes:
-        embed = await get_tribe_embed(guild=guild, tribe=tribe)
-        view = TribeSetupButtons(tribe=tribe)
-        await interaction.followup.send(embed=embed, view=view)
+    tribe_embeds = await build_all_tribe_embeds(guild)
+    await send_setup_messages(interaction, "tribes", [(embed, TribeSetupButtons(tribe=tribe)) for tribe, embed in tribe_embeds])
 
 async def setupseason(interaction: discord.Interaction):
     guild = interaction.guild
@@ -269,3 +265,26 @@ async def setupseason(interaction: discord.Interaction):
     view = SeasonSetupButtons()
 
     await interaction.response.send_message(embed=embed, view=view)
+
+async def backfillartifacts(interaction: discord.Interaction):
+    guild = interaction.guild
+    if guild is None:
+        await interaction.response.send_message("This command must be used in a server.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    found = await backfill_artifacts(guild)
+    await interaction.followup.send(f"Stored {found} existing roles and channels for this season.", ephemeral=True)
+
+@app_commands.default_permissions(manage_guild=True)
+async def botstats(interaction: discord.Interaction):
+    stats = metrics.report()
+    # Leave room for the code block within Discord's 2000 character limit.
+    await interaction.response.send_message(f"```\n{stats[:1980]}\n```", ephemeral=True)
+
+@app_commands.default_permissions(manage_guild=True)
+async def dbprofile(interaction: discord.Interaction, reset: bool = False):
+    profile = await async_queries.get_query_profile()
+    if reset:
+        await async_queries.reset_query_profile()
+    await interaction.response.send_message(f"```\n{profile[:1980]}\n```", ephemeral=True)
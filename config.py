@@ -1,3 +1,5 @@
+import os
+
 ROLE_ORDER = [
     'Host',
     'Survivor Bot', 
@@ -70,4 +72,28 @@ CATEGORY_STRUCTURE = [
         "name": "1-1's Archive",
         "create_on_setup": True,
     }
-]
\ No newline at end of file
+]
+
+# Number of guilds whose members are fetched at the same time during startup.
+STARTUP_FETCH_CONCURRENCY = 4
+
+# SQLite durability profile: "safe", "balanced" or "fast".
+DB_PROFILE = os.getenv("DB_PROFILE", "balanced")
+
+# Statements slower than this are written to database.log.
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "50"))
+
+# Also log EXPLAIN QUERY PLAN for the first slow run of each statement.
+DB_EXPLAIN_SLOW = os.getenv("DB_EXPLAIN_SLOW", "0") == "1"
+
+# Seconds between WAL checkpoints.
+WAL_CHECKPOINT_INTERVAL = int(os.getenv("WAL_CHECKPOINT_INTERVAL", "300"))
+
+# Discord mutations each guild's scheduler runs at once.
+MUTATION_CONCURRENCY = 4
+
+# Local port for the Prometheus metrics endpoint, 0 to turn it off.
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Most recent samples per timing that quantiles are computed over.
+METRICS_SAMPLES = 1024
@@ -0,0 +1,96 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from . import connection, queries
+
+# All database work runs on one dedicated thread so sqlite3 calls never block
+# the event loop. That thread owns a single long-lived connection, which also
+# makes it the only writer.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="database")
+
+def _timed(call):
+    # Runs on the database thread, so the statement count is this call's alone.
+    statements = connection.statement_count()
+    started = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - started, connection.statement_count() - statements
+
+async def run(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    result, seconds, statements = await loop.run_in_executor(_executor, _timed, functools.partial(func, *args, **kwargs))
+    metrics.record_query(func.__name__, seconds, statements)
+    return result
+
+async def setup_tables():
+    return await run(connection.setup_tables)
+
+async def checkpoint():
+    return await run(connection.checkpoint)
+
+async def get_query_profile(*args, **kwargs):
+    return await run(connection.query_profile, *args, **kwargs)
+
+async def reset_query_profile():
+    return await run(connection.reset_query_profile)
+
+async def add_user(*args, **kwargs):
+    return await run(queries.add_user, *args, **kwargs)
+
+async def add_users_bulk(*args, **kwargs):
+    return await run(queries.add_users_bulk, *args, **kwargs)
+
+async def add_season(*args, **kwargs):
+    return await run(queries.add_season, *args, **kwargs)
+
+async def add_tribe(*args, **kwargs):
+    return await run(queries.add_tribe, *args, **kwargs)
+
+async def add_player(*args, **kwargs):
+    return await run(queries.add_player, *args, **kwargs)
+
+async def get_user_discord_id(*args, **kwargs):
+    return await run(queries.get_user_discord_id, *args, **kwargs)
+
+async def get_roster(*args, **kwargs):
+    return await run(queries.get_roster, *args, **kwargs)
+
+async def get_player(*args, **kwargs):
+    return await run(queries.get_player, *args, **kwargs)
+
+async def get_tribe(*args, **kwargs):
+    return await run(queries.get_tribe, *args, **kwargs)
+
+async def get_artifacts(*args, **kwargs):
+    return await run(queries.get_artifacts, *args, **kwargs)
+
+async def set_artifact(*args, **kwargs):
+    return await run(queries.set_artifact, *args, **kwargs)
+
+async def delete_artifact(*args, **kwargs):
+    return await run(queries.delete_artifact, *args, **kwargs)
+
+async def search_players(*args, **kwargs):
+    return await run(queries.search_players, *args, **kwargs)
+
+async def search_tribes(*args, **kwargs):
+    return await run(queries.search_tribes, *args, **kwargs)
+
+async def edit_player(*args, **kwargs):
+    return await run(queries.edit_player, *args, **kwargs)
+
+async def set_player_tribes(*args, **kwargs):
+    return await run(queries.set_player_tribes, *args, **kwargs)
+
+async def edit_tribe(*args, **kwargs):
+    return await run(queries.edit_tribe, *args, **kwargs)
+
+async def delete_season(*args, **kwargs):
+    return await run(queries.delete_season, *args, **kwargs)
+
+async def delete_player(*args, **kwargs):
+    return await run(queries.delete_player, *args, **kwargs)
+
+async def delete_tribe(*args, **kwargs):
+    return await run(queries.delete_tribe, *args, **kwargs)
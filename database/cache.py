@@ -0,0 +1,147 @@
+from collections import defaultdict
+from player import Player
+from tribe import Tribe
+from .search import NameIndex
+
+class SeasonCache():
+    """In-memory snapshot of one season's players and tribes.
+
+    Built in one pass from the database and dropped whenever a write touches
+    the season, so it never has to be patched in place.
+    """
+
+    def __init__(self, season_id: int, players: list[Player], tribes: list[Tribe], discord_ids: dict[int, int]):
+        self.season_id = season_id
+        self.players = players  # Ordered by display_name.
+        self.tribes = tribes    # Ordered by order_id DESC, tribe_name, iteration.
+        self.discord_ids = discord_ids
+
+        self.players_by_id = {p.player_id: p for p in players}
+        self.players_by_name = {p.display_name: p for p in players}
+        self.players_by_user = {p.user_id: p for p in players}
+        self.players_by_discord_id = {discord_ids[p.user_id]: p for p in players if p.user_id in discord_ids}
+        self.players_by_tribe: dict[int, list[Player]] = defaultdict(list)
+        for player in players:
+            if player.tribe_id is not None:
+                self.players_by_tribe[player.tribe_id].append(player)
+
+        self.tribes_by_id = {t.tribe_id: t for t in tribes}
+        self.tribes_by_key = {(t.tribe_name, t.iteration): t for t in tribes}
+
+    def get_players(self,
+                    player_id: int | None = None,
+                    display_name: str | None = None,
+                    user_id: int | None = None,
+                    discord_id: int | None = None,
+                    tribe_id: int | None = None,
+                    tribe_name: str | None = None,
+                    tribe_iteration: int = 1) -> list[Player]:
+
+        if player_id is not None:
+            found = [self.players_by_id.get(player_id)]
+        elif display_name is not None:
+            found = [self.players_by_name.get(display_name)]
+        elif user_id is not None:
+            found = [self.players_by_user.get(user_id)]
+        elif discord_id is not None:
+            found = [self.players_by_discord_id.get(discord_id)]
+        elif tribe_id is not None:
+            found = self.players_by_tribe.get(tribe_id, [])
+        elif tribe_name is not None:
+            tribe = self.tribes_by_key.get((tribe_name, tribe_iteration))
+            found = self.players_by_tribe.get(tribe.tribe_id, []) if tribe else []
+        else:
+            found = self.players
+
+        # Players and tribes are immutable, so the cached objects can be handed out as is.
+        return [p for p in found if p is not None]
+
+    def get_tribes(self,
+                   tribe_id: int | None = None,
+                   tribe_name: str | None = None,
+                   tribe_iteration: int = 1,
+                   player_display_name: str | None = None,
+                   player_id: int | None = None,
+                   player_discord_id: int | None = None,
+                   user_id: int | None = None,
+                   order_id: int | None = None) -> list[Tribe]:
+
+        if tribe_id is not None:
+            found = [self.tribes_by_id.get(tribe_id)]
+        elif tribe_name is not None:
+            found = [self.tribes_by_key.get((tribe_name, tribe_iteration))]
+        elif player_display_name is not None:
+            found = [self._player_tribe(self.players_by_name.get(player_display_name))]
+        elif player_id is not None:
+            found = [self._player_tribe(self.players_by_id.get(player_id))]
+        elif player_discord_id is not None:
+            found = [self._player_tribe(self.players_by_discord_id.get(player_discord_id))]
+        elif user_id is not None:
+            found = [self._player_tribe(self.players_by_user.get(user_id))]
+        elif order_id is not None:
+            found = sorted((t for t in self.tribes if t.order_id == order_id), key=lambda t: t.tribe_name)
+        else:
+            found = self.tribes
+
+        return [t for t in found if t is not None]
+
+    def _player_tribe(self, player: Player | None) -> Tribe | None:
+        if player is None or player.tribe_id is None:
+            return None
+        return self.tribes_by_id.get(player.tribe_id)
+
+# server_id -> SeasonCache
+_seasons: dict[int, SeasonCache] = {}
+
+# users.id -> users.discord_id. Never changes for a given row, so it is shared
+# across seasons and never invalidated.
+discord_ids: dict[int, int] = {}
+
+# server_id -> autocomplete indexes. They outlive invalidation and are synced
+# against each reload, so a roster change only re-indexes the names it touched.
+_player_indexes: dict[int, NameIndex] = {}
+_tribe_indexes: dict[int, NameIndex] = {}
+
+# server_id -> (kind, entity_id, other_id) -> discord id. Loaded once per
+# server and written through by set_artifact/delete_artifact.
+artifacts: dict[int, dict[tuple[str, int, int], int]] = {}
+
+_stats = {"hits": 0, "misses": 0, "loads": 0, "invalidations": 0}
+
+def get(server_id: int) -> SeasonCache | None:
+    season = _seasons.get(server_id)
+    if season is None:
+        _stats["misses"] += 1
+    else:
+        _stats["hits"] += 1
+    return season
+
+def put(server_id: int, season: SeasonCache):
+    _stats["loads"] += 1
+    _seasons[server_id] = season
+    discord_ids.update(season.discord_ids)
+    _player_indexes.setdefault(server_id, NameIndex()).sync(p.display_name for p in season.players)
+    _tribe_indexes.setdefault(server_id, NameIndex()).sync(t.tribe_string for t in season.tribes)
+
+def player_index(server_id: int) -> NameIndex:
+    return _player_indexes.setdefault(server_id, NameIndex())
+
+def tribe_index(server_id: int) -> NameIndex:
+    return _tribe_indexes.setdefault(server_id, NameIndex())
+
+def invalidate(server_id: int):
+    if _seasons.pop(server_id, None) is not None:
+        _stats["invalidations"] += 1
+
+def clear():
+    """Forget everything, for when the database itself is replaced."""
+    _seasons.clear()
+    discord_ids.clear()
+    _player_indexes.clear()
+    _tribe_indexes.clear()
+    artifacts.clear()
+    for key in _stats:
+        _stats[key] = 0
+
+def get_stats() -> dict[str, int]:
+    return {**_stats, "seasons": len(_seasons)}
@@ -1,6 +1,13 @@
 import sqlite3
 import logging
 import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from . import migrations
+import config
 
 log_dir = os.path.join(os.path.dirname(__file__), "..", "logs")
 os.makedirs(log_dir, exist_ok=True)
@@ -19,68 +26,333 @@ logger.addHandler(file_handler)
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "sharkvivor.db")
 
-def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+# Durability/performance trade-offs, selected with config.DB_PROFILE.
+# All of them use WAL so readers are never blocked by the writer.
+PROFILES = {
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 10000,
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 2000,
+    },
+}
+
+def get_profile() -> dict:
+    profile = PROFILES.get(config.DB_PROFILE)
+    if profile is None:
+        logger.warning(f"Unknown database profile '{config.DB_PROFILE}', using 'balanced'.")
+        profile = PROFILES["balanced"]
+    return profile
+
+# One long-lived connection per thread. Pragmas are applied once when the
+# connection is opened instead of on every query.
+_local = threading.local()
+
+def _count_statement(statement: str):
+    _local.statements = getattr(_local, "statements", 0) + 1
+
+def statement_count() -> int:
+    """Statements this thread's connection has run so far."""
+    return getattr(_local, "statements", 0)
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+# sql -> shape. The statements in queries.py are fixed strings, so this stays small.
+_shapes: dict[str, str] = {}
+
+def statement_shape(sql: str) -> str:
+    """sql with whitespace collapsed and literals and IN lists replaced, so
+    the same query with different arguments is counted together."""
+    shape = _shapes.get(sql)
+    if shape is None:
+        shape = _WHITESPACE.sub(" ", sql).strip()
+        shape = _LITERAL.sub("?", shape)
+        shape = _IN_LIST.sub("IN (...)", shape)
+        if len(_shapes) < 10000:
+            _shapes[sql] = shape
+    return shape
+
+class ShapeStats():
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+        self.plan: list[str] | None = None
+
+# shape -> stats. Only touched on the database thread.
+_profile: dict[str, ShapeStats] = {}
+
+def _caller() -> str:
+    # The first frame outside the profiler, i.e. the function that ran the statement.
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code in _PROFILER_CODE:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})"
+
+def _explain(conn: sqlite3.Connection, sql: str, parameters) -> list[str]:
+    # A plain cursor, so the EXPLAIN itself is not profiled.
+    try:
+        rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    except sqlite3.Error as e:
+        return [f"(no plan: {e})"]
+    return [row[3] for row in rows]
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Times every statement, including fetching its rows, by shape.
+
+    Statements slower than config.DB_SLOW_QUERY_MS are logged with their
+    parameters and the query function that ran them. With
+    config.DB_EXPLAIN_SLOW on, the first slow run of each shape also logs
+    its EXPLAIN QUERY PLAN.
+    """
+
+    def execute(self, sql: str, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._finish(sql, parameters, time.perf_counter() - started)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._finish(sql, None, time.perf_counter() - started)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._add_fetch(time.perf_counter() - started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._add_fetch(time.perf_counter() - started)
+
+    def _finish(self, sql: str, parameters, seconds: float):
+        shape = statement_shape(sql)
+        stats = _profile.get(shape)
+        if stats is None:
+            stats = _profile[shape] = ShapeStats()
+        stats.count += 1
+        stats.total += seconds
+        stats.max = max(stats.max, seconds)
+
+        # Rows fetched afterwards count towards this statement.
+        self._statement = (sql, parameters, stats)
+        self._elapsed = seconds
+        self._logged = False
+        self._check_slow()
+
+    def _add_fetch(self, seconds: float):
+        if getattr(self, "_statement", None) is None:
+            return
+        stats = self._statement[2]
+        self._elapsed += seconds
+        stats.total += seconds
+        stats.max = max(stats.max, self._elapsed)
+        self._check_slow()
+
+    def _check_slow(self):
+        if self._logged or self._elapsed < config.DB_SLOW_QUERY_MS / 1000:
+            return
+        self._logged = True
+        sql, parameters, stats = self._statement
+        stats.slow += 1
+
+        shown = "(executemany)" if parameters is None else repr(parameters)[:200]
+        logger.warning(f"Slow query ({self._elapsed * 1000:.1f} ms) in {_caller()}: {_WHITESPACE.sub(' ', sql).strip()} {shown}")
+        if config.DB_EXPLAIN_SLOW and stats.plan is None and parameters is not None and sql.lstrip().upper().startswith(_EXPLAINABLE):
+            stats.plan = _explain(self.connection, sql, parameters)
+            logger.info(f"Query plan for {statement_shape(sql)}: {' | '.join(stats.plan)}")
+
+class ProfilingConnection(sqlite3.Connection):
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    # The C execute shortcuts make a plain cursor, so route them through ours.
+    def execute(self, sql: str, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+_PROFILER_CODE = {func.__code__ for cls in (ProfilingCursor, ProfilingConnection) for func in vars(cls).values() if callable(func)}
+
+def query_profile(limit: int = 10) -> str:
+    """The statement shapes with the most total time, as plain text. Also
+    written to the database log."""
+    lines = [f"{'total ms':>9} {'count':>7} {'avg ms':>7} {'max ms':>7} {'slow':>5}  statement"]
+    ranked = sorted(_profile.items(), key=lambda item: -item[1].total)[:limit]
+    for shape, stats in ranked:
+        lines.append(
+            f"{stats.total * 1000:>9.1f} {stats.count:>7} {stats.total * 1000 / stats.count:>7.2f} "
+            f"{stats.max * 1000:>7.1f} {stats.slow:>5}  {shape[:120]}"
+        )
+        if stats.plan:
+            lines.append(f"{'':>40}plan: {' | '.join(stats.plan)[:120]}")
+    report = "\n".join(lines)
+    logger.info(f"Query profile:\n{report}")
+    return report
+
+def reset_query_profile():
+    _profile.clear()
+
+def _open_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, factory=ProfilingConnection)
     conn.row_factory = sqlite3.Row
+    conn.set_trace_callback(_count_statement)
     conn.execute("PRAGMA foreign_keys = ON;")
+    for pragma, value in get_profile().items():
+        conn.execute(f"PRAGMA {pragma} = {value};")
+    logger.info(f"Opened database connection for thread {threading.current_thread().name}.")
     return conn
 
-def setup_tables():
+def _is_healthy(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("SELECT 1").fetchone()
+        return True
+    except sqlite3.Error:
+        return False
+
+def get_connection() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is not None and not _is_healthy(conn):
+        logger.warning("Database connection failed health check, reopening.")
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        conn = None
+
+    if conn is None:
+        conn = _open_connection()
+        _local.conn = conn
+        _local.depth = 0
+
+    return conn
+
+@contextmanager
+def connect():
+    """Borrow this thread's connection for the duration of a block.
+
+    Nested blocks share the connection. When the outermost block exits, any
+    transaction left open (e.g. by an early return) is rolled back so the
+    next caller starts clean.
+    """
     conn = get_connection()
-    c = conn.cursor()
-
-    commands = {
-        "users": '''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                discord_id INT UNIQUE NOT NULL,
-                username TEXT
-            );
-        ''',
-        
-        "seasons": '''
-            CREATE TABLE IF NOT EXISTS seasons (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                server_id INT UNIQUE NOT NULL,
-                season_name TEXT NOT NULL
-            );
-        ''',
-
-        "tribes": '''
-            CREATE TABLE IF NOT EXISTS tribes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                tribe_name TEXT NOT NULL,
-                iteration INTEGER DEFAULT 1,
-                season_id INTEGER NOT NULL,
-                color TEXT NOT NULL DEFAULT 'd3d3d3',
-                order_id INT NOT NULL DEFAULT 1,
-                FOREIGN KEY(season_id) REFERENCES seasons(id),
-                UNIQUE(tribe_name, iteration, season_id)
-            );
-        ''',
-
-        "players": '''
-            CREATE TABLE IF NOT EXISTS players (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                display_name TEXT NOT NULL,
-                user_id INTEGER NOT NULL,
-                season_id INTEGER NOT NULL,
-                tribe_id INTEGER DEFAULT NULL,
-                FOREIGN KEY (user_Id) REFERENCES users(id),
-                FOREIGN KEY (season_id) REFERENCES seasons(id),
-                FOREIGN KEY (tribe_id) REFERENCES tribes(id),
-                UNIQUE (user_id, season_id),
-                UNIQUE (display_name, season_id)
-            );
-        '''
-    }
-
-    for name, command in commands.items():
+    _local.depth += 1
+    try:
+        yield conn
+    finally:
+        _local.depth -= 1
+        if _local.depth == 0 and conn.in_transaction:
+            conn.rollback()
+
+def checkpoint() -> tuple[int, int, int] | None:
+    # Returns (busy, wal_pages, checkpointed_pages).
+    with connect() as conn:
         try:
-            c.execute(command)
-            logger.info(f"{name.capitalize()} table setup completed.")
-        except Exception as e:
-            logger.error(f"Error setting up {name} table: {e}")
+            row = conn.execute("PRAGMA wal_checkpoint(PASSIVE);").fetchone()
+            return tuple(row)
+        except sqlite3.Error as e:
+            logger.error(f"Error checkpointing database: {e}")
+            return None
+
+def close_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+        _local.depth = 0
+
+def setup_tables():
+    with connect() as conn:
+        c = conn.cursor()
+
+        commands = {
+            "users": '''
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    discord_id INT UNIQUE NOT NULL,
+                    username TEXT
+                );
+            ''',
+        
+            "seasons": '''
+                CREATE TABLE IF NOT EXISTS seasons (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    server_id INT UNIQUE NOT NULL,
+                    season_name TEXT NOT NULL
+                );
+            ''',
+
+            "tribes": '''
+                CREATE TABLE IF NOT EXISTS tribes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tribe_name TEXT NOT NULL,
+                    iteration INTEGER DEFAULT 1,
+                    season_id INTEGER NOT NULL,
+                    color TEXT NOT NULL DEFAULT 'd3d3d3',
+                    order_id INT NOT NULL DEFAULT 1,
+                    FOREIGN KEY(season_id) REFERENCES seasons(id),
+                    UNIQUE(tribe_name, iteration, season_id)
+                );
+            ''',
+
+            "players": '''
+                CREATE TABLE IF NOT EXISTS players (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    display_name TEXT NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    season_id INTEGER NOT NULL,
+                    tribe_id INTEGER DEFAULT NULL,
+                    FOREIGN KEY (user_Id) REFERENCES users(id),
+                    FOREIGN KEY (season_id) REFERENCES seasons(id),
+                    FOREIGN KEY (tribe_id) REFERENCES tribes(id),
+                    UNIQUE (user_id, season_id),
+                    UNIQUE (display_name, season_id)
+                );
+            '''
+        }
+
+        for name, command in commands.items():
+            try:
+                c.execute(command)
+                logger.info(f"{name.capitalize()} table setup completed.")
+            except Exception as e:
+                logger.error(f"Error setting up {name} table: {e}")
+
+        conn.commit()
 
-    conn.commit()
-    conn.close()
+        version = migrations.migrate(conn)
+        logger.info(f"Database schema at version {version}.")
@@ -0,0 +1,90 @@
+import sqlite3
+import logging
+
+logger = logging.getLogger("database_logger")
+
+# Ordered (version, description, statements). Migrations run once, in order, at
+# startup. Never edit one that has shipped; append a new version instead.
+MIGRATIONS = [
+    (1, "Covering indexes for player lookups", [
+        # get_player(tribe_id=...) and get_player(tribe_name=...), ordered by name.
+        '''
+            CREATE INDEX IF NOT EXISTS idx_players_season_tribe
+            ON players (season_id, tribe_id, display_name, user_id);
+        ''',
+        # get_player() for a whole season, ordered by name.
+        '''
+            CREATE INDEX IF NOT EXISTS idx_players_season_name
+            ON players (season_id, display_name, user_id, tribe_id);
+        ''',
+    ]),
+
+    (2, "Covering index for tribe ordering", [
+        # get_tribe(order_id=...) and get_tribe() for a whole season.
+        '''
+            CREATE INDEX IF NOT EXISTS idx_tribes_season_order
+            ON tribes (season_id, order_id DESC, tribe_name, iteration, color);
+        ''',
+    ]),
+
+    (3, "Discord ids of season artifacts", [
+        # One row per channel or role the bot made for a player, tribe or pair
+        # of players. other_id is the second player of a 1-1 and 0 otherwise.
+        '''
+            CREATE TABLE IF NOT EXISTS artifacts (
+                season_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                other_id INTEGER NOT NULL DEFAULT 0,
+                discord_id INT NOT NULL,
+                PRIMARY KEY (season_id, kind, entity_id, other_id),
+                FOREIGN KEY (season_id) REFERENCES seasons(id)
+            );
+        ''',
+    ]),
+
+    (4, "Drop the member sync watermark", [
+        # Member scans are no longer skipped, so nothing reads it any more.
+        '''
+            DROP TABLE IF EXISTS member_sync;
+        ''',
+    ]),
+]
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def migrate(conn: sqlite3.Connection) -> int:
+    version = get_schema_version(conn)
+    conn.commit()
+
+    for migration_version, description, statements in MIGRATIONS:
+        if migration_version <= version:
+            continue
+
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (migration_version, description)
+            )
+            conn.commit()
+            version = migration_version
+            logger.info(f"Applied migration {migration_version}: {description}.")
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error applying migration {migration_version} ({description}): {e}")
+            break
+
+    return version
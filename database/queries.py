@@ -1,57 +1,94 @@
-from .connection import get_connection, logger
+from typing import Iterable
+from itertools import islice
+from .connection import connect, logger
+from . import cache
 from player import Player
-from tribe import Tribe
+from tribe import Tribe, parse_color
 
 def add_user(discord_id: int, username: str) -> bool:
-    conn = get_connection()
-    c = conn.cursor()
-
-    try:
-        command = '''
-            INSERT INTO users (discord_id, username)
-            VALUES (?, ?)
-            ON CONFLICT(discord_id)
-            DO UPDATE SET username = excluded.username
-            WHERE users.username IS NOT excluded.username;
-        '''
-        c.execute(command, (discord_id, username))
-        success = c.rowcount > 0
-        conn.commit()
-        return success
-
-    except Exception as e:
-        logger.error(f"Error adding user: {e}")
-        return False
-
-    finally:
-        conn.close()
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            command = '''
+                INSERT INTO users (discord_id, username)
+                VALUES (?, ?)
+                ON CONFLICT(discord_id)
+                DO UPDATE SET username = excluded.username
+                WHERE users.username IS NOT excluded.username;
+            '''
+            c.execute(command, (discord_id, username))
+            success = c.rowcount > 0
+            conn.commit()
+            return success
+
+        except Exception as e:
+            logger.error(f"Error adding user: {e}")
+            return False
+
+def add_users_bulk(users: Iterable[tuple[int, str]], chunk_size: int = 500) -> tuple[int, int]:
+    # Upserts (discord_id, username) pairs in one transaction.
+    # Returns (inserted, updated). On error nothing is written and (0, 0) is returned.
+
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            command = '''
+                INSERT INTO users (discord_id, username)
+                VALUES (?, ?)
+                ON CONFLICT(discord_id)
+                DO UPDATE SET username = excluded.username
+                WHERE users.username IS NOT excluded.username;
+            '''
+            c.execute("BEGIN")
+            c.execute("SELECT COUNT(*) FROM users")
+            users_before = c.fetchone()[0]
+            changes_before = conn.total_changes
+
+            users = iter(users)
+            while True:
+                chunk = list(islice(users, chunk_size))
+                if not chunk:
+                    break
+                c.executemany(command, chunk)
+
+            c.execute("SELECT COUNT(*) FROM users")
+            inserted = c.fetchone()[0] - users_before
+            updated = (conn.total_changes - changes_before) - inserted
+            conn.commit()
+
+            logger.info(f"Bulk user sync: {inserted} inserted, {updated} updated.")
+            return inserted, updated
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error bulk adding users: {e}")
+            return 0, 0
 
 def add_season(server_id: int, server_name: str) -> int:
-    conn = get_connection()
-    c = conn.cursor()
-
-    try:
-        command = '''
-            INSERT INTO seasons (server_id, season_name)
-            VALUES (?, ?)
-            ON CONFLICT (server_id)
-            DO UPDATE SET season_name = excluded.season_name
-            WHERE seasons.season_name IS NOT excluded.season_name;
-        '''
-        c.execute(command, (server_id, server_name))
-        conn.commit()
-
-        if c.rowcount == 0:
-            return 0
-        else:
-            return 1
-
-    except Exception as e:
-        logger.error(f"Error adding season: {e}")
-        return -1
-
-    finally:
-        conn.close()
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            command = '''
+                INSERT INTO seasons (server_id, season_name)
+                VALUES (?, ?)
+                ON CONFLICT (server_id)
+                DO UPDATE SET season_name = excluded.season_name
+                WHERE seasons.season_name IS NOT excluded.season_name;
+            '''
+            c.execute(command, (server_id, server_name))
+            conn.commit()
+
+            if c.rowcount == 0:
+                return 0
+            else:
+                return 1
+
+        except Exception as e:
+            logger.error(f"Error adding season: {e}")
+            return -1
 
 def add_tribe(tribe_name: str, server_id: int, iteration: int = 1, color: str = '#d3d3d3', order_id: int = 1) -> int:
     # 1 = success.
@@ -59,40 +96,37 @@ def add_tribe(tribe_name: str, server_id: int, iteration: int = 1, color: str =
     # -1 = unexpected error. 
     # -2 = tribe's season not registered in the database yet.
 
-    conn = get_connection()
-    c = conn.cursor()
+    with connect() as conn:
+        c = conn.cursor()
 
-    try:
-        command = 'SELECT id FROM seasons WHERE server_id = ?'
-        c.execute(command, (server_id,))
-        season_row = c.fetchone()
+        try:
+            command = 'SELECT id FROM seasons WHERE server_id = ?'
+            c.execute(command, (server_id,))
+            season_row = c.fetchone()
 
-        if season_row is None:
-            logger.error(f"Season with ID: {server_id} not found.")
-            conn.close()
-            return -2
-    
-        season_id = season_row['id']
-
-        command = '''
-            INSERT INTO tribes (tribe_name, iteration, season_id, color, order_id)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(tribe_name, iteration, season_id) DO NOTHING
-        '''
-        c.execute(command, (tribe_name, iteration, season_id, color, order_id))
-        conn.commit()
-
-        if c.rowcount == 0:
-            return 0
-        else:
-            return 1
+            if season_row is None:
+                logger.error(f"Season with ID: {server_id} not found.")
+                return -2
     
-    except Exception as e:
-        logger.error(f"Error adding tribe: {e}")
-        return -1
+            season_id = season_row['id']
+
+            command = '''
+                INSERT INTO tribes (tribe_name, iteration, season_id, color, order_id)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(tribe_name, iteration, season_id) DO NOTHING
+            '''
+            c.execute(command, (tribe_name, iteration, season_id, color, order_id))
+            conn.commit()
+            cache.invalidate(server_id)
 
-    finally:
-        conn.close()
+            if c.rowcount == 0:
+                return 0
+            else:
+                return 1
+    
+        except Exception as e:
+            logger.error(f"Error adding tribe: {e}")
+            return -1
 
 def add_player(display_name: str, discord_id: int, server_id: int, tribe_name: str = None, tribe_iter: int = 1) -> tuple[int, Player | None]:
 
@@ -105,102 +139,179 @@ def add_player(display_name: str, discord_id: int, server_id: int, tribe_name: s
     # -5 = display_name already registered as another player in this season.
     # -6 = user_id already registered as another player in this season.
 
-    conn = get_connection()
-    c = conn.cursor()
-
-    try:
-        # User check
-        c.execute("SELECT id FROM users WHERE discord_id = ?", (discord_id,))
-        result = c.fetchone()
-        if result is None:
-            logger.warning(f"User with discord_id {discord_id} not found.")
-            return -2, None
-        user_id = result[0]
-
-        # Server check
-        command = 'SELECT id FROM seasons WHERE server_id = ?'
-        c.execute(command, (server_id,))
-        result = c.fetchone()
-        if result is None:
-            logger.warning(f"Season with server_id {server_id} not found.")
-            return -3, None
-        season_id = result[0]
-
-        # Tribe check
-        tribe_id = None
-        if tribe_name is not None:
-            command = 'SELECT id FROM tribes WHERE tribe_name = ? AND iteration = ? AND season_id = ?'
-            c.execute(command, (tribe_name, tribe_iter, season_id))
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            # User check
+            c.execute("SELECT id FROM users WHERE discord_id = ?", (discord_id,))
             result = c.fetchone()
             if result is None:
-                logger.warning(f"Tribe {tribe_name} (iteration {tribe_iter}) not found in season {season_id}.")
-                return -4, None
-        
-            tribe_id = result[0]
-
-        # Duplicate display name in the same season check
-        c.execute("SELECT 1 FROM players WHERE display_name = ? AND season_id = ?", (display_name, season_id))
-        result = c.fetchone()
-        if result is not None:
-            logger.info(f"Display name '{display_name}' already exists in season {season_id}.")
-            return -5, None
-
-        # Duplicate user_id in the same season check
-        c.execute("SELECT 1 FROM players WHERE user_id = ? AND season_id = ?", (user_id, season_id))
-        result = c.fetchone()
-        if result is not None:
-            logger.info(f"User {user_id} already registered as a player in season {season_id}.")
-            return -6, None
-
-        command = '''
-            INSERT OR IGNORE INTO players (display_name, user_id, season_id, tribe_id)
-            VALUES (?, ?, ?, ?);
-        '''
-        c.execute(command, (display_name, user_id, season_id, tribe_id))
-        conn.commit()
-
-        if c.rowcount == 0:
-            logger.info(f"User: {user_id} name: {display_name} already exists in season {season_id}.")
-            return 0
+                logger.warning(f"User with discord_id {discord_id} not found.")
+                return -2, None
+            user_id = result[0]
+
+            # Server check
+            command = 'SELECT id FROM seasons WHERE server_id = ?'
+            c.execute(command, (server_id,))
+            result = c.fetchone()
+            if result is None:
+                logger.warning(f"Season with server_id {server_id} not found.")
+                return -3, None
+            season_id = result[0]
+
+            # Tribe check
+            tribe_id = None
+            if tribe_name is not None:
+                command = 'SELECT id FROM tribes WHERE tribe_name = ? AND iteration = ? AND season_id = ?'
+                c.execute(command, (tribe_name, tribe_iter, season_id))
+                result = c.fetchone()
+                if result is None:
+                    logger.warning(f"Tribe {tribe_name} (iteration {tribe_iter}) not found in season {season_id}.")
+                    return -4, None
         
-        logger.info(f"User {user_id} added to season {season_id} with tribe {tribe_id}.")
+                tribe_id = result[0]
 
-        new_player = Player(
-            display_name=display_name,
-            user_id=user_id,
-            season_id=season_id,
-            player_id=c.lastrowid,
-            tribe_id=tribe_id,
-        )
+            # Duplicate display name in the same season check
+            c.execute("SELECT 1 FROM players WHERE display_name = ? AND season_id = ?", (display_name, season_id))
+            result = c.fetchone()
+            if result is not None:
+                logger.info(f"Display name '{display_name}' already exists in season {season_id}.")
+                return -5, None
 
-        return 1, new_player
+            # Duplicate user_id in the same season check
+            c.execute("SELECT 1 FROM players WHERE user_id = ? AND season_id = ?", (user_id, season_id))
+            result = c.fetchone()
+            if result is not None:
+                logger.info(f"User {user_id} already registered as a player in season {season_id}.")
+                return -6, None
 
-    except Exception as e:
-        logger.error(f"Error adding player: {e}")
-        return -1, None
-    
-    finally:
-        conn.close()
+            command = '''
+                INSERT OR IGNORE INTO players (display_name, user_id, season_id, tribe_id)
+                VALUES (?, ?, ?, ?);
+            '''
+            c.execute(command, (display_name, user_id, season_id, tribe_id))
+            conn.commit()
+            cache.invalidate(server_id)
 
-def get_user_discord_id(user_id: int):
-    conn = get_connection()
-    c = conn.cursor()
-    discord_id = None
-
-    try:
-        c.execute("SELECT discord_id FROM users WHERE id = ?", (user_id,))
-        row = c.fetchone()
-        if row:
-            discord_id = row[0]
-
-    except Exception as e:
-        logger.error(f"Error getting user: {e}")
+            if c.rowcount == 0:
+                logger.info(f"User: {user_id} name: {display_name} already exists in season {season_id}.")
+                return 0
+        
+            logger.info(f"User {user_id} added to season {season_id} with tribe {tribe_id}.")
+
+            new_player = Player(
+                display_name=display_name,
+                user_id=user_id,
+                season_id=season_id,
+                player_id=c.lastrowid,
+                tribe_id=tribe_id,
+                discord_id=discord_id,
+            )
+
+            return 1, new_player
+
+        except Exception as e:
+            logger.error(f"Error adding player: {e}")
+            return -1, None
+
+def _tribes_from_rows(rows) -> list[Tribe]:
+    tribes = [Tribe.from_row(row) for row in rows]
+    for tribe in tribes:
+        if parse_color(tribe.color) is None:
+            logger.warning(f"Tribe {tribe.tribe_string} has an invalid color {tribe.color!r}, using the default.")
+    return tribes
+
+def _load_season_cache(c, server_id: int) -> cache.SeasonCache | None:
+    season = cache.get(server_id)
+    if season is not None:
+        return season
+
+    c.execute("SELECT id FROM seasons WHERE server_id = ?", (server_id,))
+    result = c.fetchone()
+    if result is None:
         return None
+    season_id = result[0]
 
-    finally:
-        conn.close()
+    c.execute("SELECT * FROM tribes WHERE season_id = ? ORDER BY order_id DESC, tribe_name, iteration", (season_id,))
+    tribes = _tribes_from_rows(c.fetchall())
+    tribes_by_id = {tribe.tribe_id: tribe for tribe in tribes}
 
-    return discord_id
+    c.execute('''
+        SELECT p.*, u.discord_id FROM players p
+        JOIN users u ON p.user_id = u.id
+        WHERE p.season_id = ?
+        ORDER BY p.display_name
+    ''', (season_id,))
+    players = [Player.from_row(row, row["discord_id"], tribes_by_id.get(row["tribe_id"])) for row in c.fetchall()]
+    discord_ids = {player.user_id: player.discord_id for player in players}
+
+    season = cache.SeasonCache(season_id=season_id, players=players, tribes=tribes, discord_ids=discord_ids)
+    cache.put(server_id, season)
+    return season
+
+def get_user_discord_id(user_id: int):
+    with connect() as conn:
+        c = conn.cursor()
+        discord_id = cache.discord_ids.get(user_id)
+        if discord_id is not None:
+            return discord_id
+
+        try:
+            c.execute("SELECT discord_id FROM users WHERE id = ?", (user_id,))
+            row = c.fetchone()
+            if row:
+                discord_id = row[0]
+
+        except Exception as e:
+            logger.error(f"Error getting user: {e}")
+            return None
+
+        return discord_id
+
+def get_roster(server_id: int) -> list[Player]:
+    """Every player of the server's season, ordered by display_name, with
+    discord_id and tribe filled in from one joined query."""
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            season = cache.get(server_id)
+            if season is not None:
+                return season.get_players()
+
+            c.execute('''
+                SELECT p.id, p.display_name, p.user_id, p.season_id, p.tribe_id, u.discord_id,
+                       t.tribe_name, t.iteration, t.color, t.order_id
+                FROM seasons s
+                JOIN players p ON p.season_id = s.id
+                JOIN users u ON p.user_id = u.id
+                LEFT JOIN tribes t ON p.tribe_id = t.id
+                WHERE s.server_id = ?
+                ORDER BY p.display_name
+            ''', (server_id,))
+
+            roster = []
+            tribes = {}
+            for row in c.fetchall():
+                tribe = None
+                if row["tribe_id"] is not None:
+                    tribe = tribes.get(row["tribe_id"])
+                    if tribe is None:
+                        tribe = Tribe(tribe_id=row["tribe_id"],
+                                      tribe_name=row["tribe_name"],
+                                      iteration=row["iteration"],
+                                      season_id=row["season_id"],
+                                      color=row["color"],
+                                      order_id=row["order_id"])
+                        tribes[tribe.tribe_id] = tribe
+
+                roster.append(Player.from_row(row, row["discord_id"], tribe))
+            return roster
+
+        except Exception as e:
+            logger.error(f"Error getting roster: {e}")
+            return []
 
 def get_player(server_id: int, 
                player_id: int | None = None,
@@ -212,76 +323,68 @@ def get_player(server_id: int,
                tribe_name: str | None = None,
                tribe_iteration: int = 1) -> list[Player]:
     
-    conn = get_connection()
-    c = conn.cursor()
-
-    try:
-        if season_id is None:
-            c.execute("SELECT id FROM seasons WHERE server_id = ?", (server_id,))
-            result = c.fetchone()
-            if result is None:
-                logger.warning(f"Season with server_id {server_id} not found.")
-                return []
-            season_id = result[0]
-
-        if player_id is not None:
-            query = "SELECT * FROM players WHERE season_id = ? AND id = ?"
-            params = (season_id, player_id)
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            if season_id is None:
+                season = _load_season_cache(c, server_id)
+                if season is None:
+                    logger.warning(f"Season with server_id {server_id} not found.")
+                    return []
+                return season.get_players(player_id=player_id,
+                                          display_name=display_name,
+                                          user_id=user_id,
+                                          discord_id=discord_id,
+                                          tribe_id=tribe_id,
+                                          tribe_name=tribe_name,
+                                          tribe_iteration=tribe_iteration)
 
-        elif display_name is not None:
-            query = "SELECT * FROM players WHERE season_id = ? AND display_name = ?"
-            params = (season_id, display_name)
+            if player_id is not None:
+                query = "SELECT * FROM players WHERE season_id = ? AND id = ?"
+                params = (season_id, player_id)
 
-        elif user_id is not None:
-            query = "SELECT * FROM players WHERE season_id = ? AND user_id = ?"
-            params = (season_id, user_id)
+            elif display_name is not None:
+                query = "SELECT * FROM players WHERE season_id = ? AND display_name = ?"
+                params = (season_id, display_name)
 
-        elif discord_id is not None:
-            query = '''
-                SELECT p.* FROM players p
-                JOIN users u ON p.user_id = u.id
-                WHERE p.season_id = ? AND u.discord_id = ?
-            '''
-            params = (season_id, discord_id)
+            elif user_id is not None:
+                query = "SELECT * FROM players WHERE season_id = ? AND user_id = ?"
+                params = (season_id, user_id)
 
-        elif tribe_id is not None:
-            query = "SELECT * FROM players WHERE season_id = ? AND tribe_id = ? ORDER BY display_name"
-            params = (season_id, tribe_id)
+            elif discord_id is not None:
+                query = '''
+                    SELECT p.* FROM players p
+                    JOIN users u ON p.user_id = u.id
+                    WHERE p.season_id = ? AND u.discord_id = ?
+                '''
+                params = (season_id, discord_id)
 
-        elif tribe_name is not None:
-            query = '''
-                SELECT p.* FROM players p
-                JOIN tribes t ON p.tribe_id = t.id
-                WHERE p.season_id = ? AND t.tribe_name = ? AND t.iteration = ?
-                ORDER BY p.display_name
-            '''
-            params = (season_id, tribe_name, tribe_iteration)
+            elif tribe_id is not None:
+                query = "SELECT * FROM players WHERE season_id = ? AND tribe_id = ? ORDER BY display_name"
+                params = (season_id, tribe_id)
+
+            elif tribe_name is not None:
+                query = '''
+                    SELECT p.* FROM players p
+                    JOIN tribes t ON p.tribe_id = t.id
+                    WHERE p.season_id = ? AND t.tribe_name = ? AND t.iteration = ?
+                    ORDER BY p.display_name
+                '''
+                params = (season_id, tribe_name, tribe_iteration)
 
-        else:
-            query = "SELECT * FROM players WHERE season_id = ? ORDER BY display_name"
-            params = (season_id,)
+            else:
+                query = "SELECT * FROM players WHERE season_id = ? ORDER BY display_name"
+                params = (season_id,)
     
-        c.execute(query, params)
-        rows = c.fetchall()
-
-        players = []
-        for row in rows:
-            row_dict = dict(row)
-            new_player = Player(display_name=row_dict["display_name"],
-                                user_id=row_dict["user_id"],
-                                season_id=row_dict["season_id"],
-                                player_id=row_dict["id"],
-                                tribe_id=row_dict["tribe_id"])
-            players.append(new_player)
-
-        return players
+            c.execute(query, params)
+            rows = c.fetchall()
 
-    except Exception as e:
-        logger.error(f"Error retrieving player: {e}")
-        return []
+            return [Player.from_row(row) for row in rows]
 
-    finally:
-        conn.close()
+        except Exception as e:
+            logger.error(f"Error retrieving player: {e}")
+            return []
 
 def get_tribe(server_id: int, 
               tribe_id: int | None = None,
@@ -294,120 +397,203 @@ def get_tribe(server_id: int,
               order_id: int | None = None,
               season_id: int | None = None) -> list[Tribe]:
     
-    conn = get_connection()
-    c = conn.cursor()
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            if season_id is None:
+                season = _load_season_cache(c, server_id)
+                if season is None:
+                    logger.warning(f"Season with server_id {server_id} not found.")
+                    return []
+                return season.get_tribes(tribe_id=tribe_id,
+                                         tribe_name=tribe_name,
+                                         tribe_iteration=tribe_iteration,
+                                         player_display_name=player_display_name,
+                                         player_id=player_id,
+                                         player_discord_id=player_discord_id,
+                                         user_id=user_id,
+                                         order_id=order_id)
+
+            if tribe_id is not None:
+                query = "SELECT * FROM tribes WHERE season_id = ? AND id = ?"
+                params = (season_id, tribe_id)
+
+            elif tribe_name is not None:
+                query = "SELECT * FROM tribes WHERE season_id = ? AND tribe_name = ? AND iteration = ?"
+                params = (season_id, tribe_name, tribe_iteration)
+
+            elif player_display_name is not None:
+                c.execute("SELECT tribe_id FROM players WHERE season_id = ? AND display_name = ?", (season_id, player_display_name))
+                result = c.fetchone()
+                if result is None:
+                    logger.warning(f"Player with display_name {player_display_name} not found.")
+                    return []
+                tribe_id = result[0]
+                if tribe_id is None:
+                    logger.warning(f"Player {player_display_name} exists but is not assigned to a tribe.")
+                    return []
+                query = "SELECT * FROM tribes WHERE season_id = ? AND id = ?"
+                params = (season_id, tribe_id)
 
-    try:
-        if season_id is None:
-            c.execute("SELECT id FROM seasons WHERE server_id = ?", (server_id,))
-            result = c.fetchone()
-            if result is None:
+            elif player_id is not None:
+                c.execute("SELECT tribe_id FROM players WHERE season_id = ? AND id = ?", (season_id, player_id))
+                result = c.fetchone()
+                if result is None:
+                    logger.warning(f"Player with player_id {player_id} not found.")
+                    return []
+                tribe_id = result[0]
+                if tribe_id is None:
+                    logger.warning(f"Player with ID {player_id} exists but is not assigned to a tribe.")
+                    return []
+                query = "SELECT * FROM tribes WHERE season_id = ? AND id = ?"
+                params = (season_id, tribe_id)
+
+            elif player_discord_id is not None:
+                c.execute("SELECT id FROM users WHERE discord_id = ?", (player_discord_id,))
+                result = c.fetchone()
+                if result is None:
+                    logger.warning(f"User with discord_id {player_discord_id} not found in users table.")
+                    return []
+                user_id = result[0]
+
+                c.execute("SELECT tribe_id FROM players WHERE season_id = ? AND user_id = ?", (season_id, user_id))
+                result = c.fetchone()
+                if result is None:
+                    logger.warning(f"No player found in season {season_id} for user_id {user_id} (discord_id {player_discord_id}).")
+                    return []
+                tribe_id = result[0]
+
+                if tribe_id is None:
+                    logger.warning(f"User with discord_id {player_discord_id} (user_id {user_id}) exists in season {season_id} but is not assigned to a tribe.")
+                    return []
+
+                query = "SELECT * FROM tribes WHERE season_id = ? AND id = ?"
+                params = (season_id, tribe_id)
+        
+            elif user_id is not None:
+                c.execute("SELECT tribe_id FROM players WHERE season_id = ? AND user_id = ?", (season_id, user_id))
+                result = c.fetchone()
+                if result is None:
+                    logger.warning(f"No player found in season {season_id} for user_id {user_id}.")
+                    return []
+                tribe_id = result[0]
+
+                if tribe_id is None:
+                    logger.warning(f"User with user_id {user_id} exists in season {season_id} but is not assigned to a tribe.")
+                    return []
+
+                query = "SELECT * FROM tribes WHERE season_id = ? AND id = ?"
+                params = (season_id, tribe_id)
+        
+            elif order_id is not None:
+                query = "SELECT * FROM tribes WHERE season_id = ? AND order_id = ? ORDER BY tribe_name"
+                params = (season_id, order_id)
+
+            else:
+                query = "SELECT * FROM tribes WHERE season_id = ? ORDER BY order_id DESC, tribe_name, iteration"
+                params = (season_id,)
+
+            c.execute(query, params)
+            rows = c.fetchall()
+
+            return _tribes_from_rows(rows)
+
+
+        except Exception as e:
+            logger.error(f"Error retrieving tribe: {e}")
+            return []
+
+def get_artifacts(server_id: int) -> dict[tuple[str, int, int], int]:
+    """(kind, entity_id, other_id) -> discord id for every artifact of the season."""
+    with connect() as conn:
+        c = conn.cursor()
+        found = cache.artifacts.get(server_id)
+        if found is not None:
+            return found
+
+        try:
+            c.execute('''
+                SELECT a.kind, a.entity_id, a.other_id, a.discord_id FROM artifacts a
+                JOIN seasons s ON a.season_id = s.id
+                WHERE s.server_id = ?
+            ''', (server_id,))
+            found = {(row[0], row[1], row[2]): row[3] for row in c.fetchall()}
+            cache.artifacts[server_id] = found
+            return found
+
+        except Exception as e:
+            logger.error(f"Error getting artifacts: {e}")
+            return {}
+
+def set_artifact(server_id: int, kind: str, entity_id: int, discord_id: int, other_id: int = 0) -> bool:
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            c.execute('''
+                INSERT INTO artifacts (season_id, kind, entity_id, other_id, discord_id)
+                SELECT id, ?, ?, ?, ? FROM seasons WHERE server_id = ?
+                ON CONFLICT (season_id, kind, entity_id, other_id)
+                DO UPDATE SET discord_id = excluded.discord_id
+            ''', (kind, entity_id, other_id, discord_id, server_id))
+            conn.commit()
+            if c.rowcount == 0:
                 logger.warning(f"Season with server_id {server_id} not found.")
-                return []
-            season_id = result[0]
+                return False
 
-        if tribe_id is not None:
-            query = "SELECT * FROM tribes WHERE season_id = ? AND id = ?"
-            params = (season_id, tribe_id)
+            if server_id in cache.artifacts:
+                cache.artifacts[server_id][(kind, entity_id, other_id)] = discord_id
+            return True
 
-        elif tribe_name is not None:
-            query = "SELECT * FROM tribes WHERE season_id = ? AND tribe_name = ? AND iteration = ?"
-            params = (season_id, tribe_name, tribe_iteration)
+        except Exception as e:
+            logger.error(f"Error saving artifact: {e}")
+            return False
 
-        elif player_display_name is not None:
-            c.execute("SELECT tribe_id FROM players WHERE season_id = ? AND display_name = ?", (season_id, player_display_name))
-            result = c.fetchone()
-            if result is None:
-                logger.warning(f"Player with display_name {player_display_name} not found.")
-                return []
-            tribe_id = result[0]
-            if tribe_id is None:
-                logger.warning(f"Player {player_display_name} exists but is not assigned to a tribe.")
-                return []
-            query = "SELECT * FROM tribes WHERE season_id = ? AND id = ?"
-            params = (season_id, tribe_id)
+def delete_artifact(server_id: int, kind: str, entity_id: int, other_id: int = 0) -> bool:
+    with connect() as conn:
+        c = conn.cursor()
 
-        elif player_id is not None:
-            c.execute("SELECT tribe_id FROM players WHERE season_id = ? AND id = ?", (season_id, player_id))
-            result = c.fetchone()
-            if result is None:
-                logger.warning(f"Player with player_id {player_id} not found.")
-                return []
-            tribe_id = result[0]
-            if tribe_id is None:
-                logger.warning(f"Player with ID {player_id} exists but is not assigned to a tribe.")
-                return []
-            query = "SELECT * FROM tribes WHERE season_id = ? AND id = ?"
-            params = (season_id, tribe_id)
+        try:
+            c.execute('''
+                DELETE FROM artifacts
+                WHERE season_id = (SELECT id FROM seasons WHERE server_id = ?)
+                AND kind = ? AND entity_id = ? AND other_id = ?
+            ''', (server_id, kind, entity_id, other_id))
+            conn.commit()
+            if server_id in cache.artifacts:
+                cache.artifacts[server_id].pop((kind, entity_id, other_id), None)
+            return c.rowcount > 0
 
-        elif player_discord_id is not None:
-            c.execute("SELECT id FROM users WHERE discord_id = ?", (player_discord_id,))
-            result = c.fetchone()
-            if result is None:
-                logger.warning(f"User with discord_id {player_discord_id} not found in users table.")
-                return []
-            user_id = result[0]
+        except Exception as e:
+            logger.error(f"Error deleting artifact: {e}")
+            return False
 
-            c.execute("SELECT tribe_id FROM players WHERE season_id = ? AND user_id = ?", (season_id, user_id))
-            result = c.fetchone()
-            if result is None:
-                logger.warning(f"No player found in season {season_id} for user_id {user_id} (discord_id {player_discord_id}).")
-                return []
-            tribe_id = result[0]
+def search_players(server_id: int, current: str, limit: int = 25) -> list[str]:
+    with connect() as conn:
+        c = conn.cursor()
 
-            if tribe_id is None:
-                logger.warning(f"User with discord_id {player_discord_id} (user_id {user_id}) exists in season {season_id} but is not assigned to a tribe.")
+        try:
+            if _load_season_cache(c, server_id) is None:
                 return []
+            return cache.player_index(server_id).search(current, limit)
 
-            query = "SELECT * FROM tribes WHERE season_id = ? AND id = ?"
-            params = (season_id, tribe_id)
-        
-        elif user_id is not None:
-            c.execute("SELECT tribe_id FROM players WHERE season_id = ? AND user_id = ?", (season_id, user_id))
-            result = c.fetchone()
-            if result is None:
-                logger.warning(f"No player found in season {season_id} for user_id {user_id}.")
-                return []
-            tribe_id = result[0]
+        except Exception as e:
+            logger.error(f"Error searching players: {e}")
+            return []
+
+def search_tribes(server_id: int, current: str, limit: int = 25) -> list[str]:
+    with connect() as conn:
+        c = conn.cursor()
 
-            if tribe_id is None:
-                logger.warning(f"User with user_id {user_id} exists in season {season_id} but is not assigned to a tribe.")
+        try:
+            if _load_season_cache(c, server_id) is None:
                 return []
+            return cache.tribe_index(server_id).search(current, limit)
 
-            query = "SELECT * FROM tribes WHERE season_id = ? AND id = ?"
-            params = (season_id, tribe_id)
-        
-        elif order_id is not None:
-            query = "SELECT * FROM tribes WHERE season_id = ? AND order_id = ? ORDER BY tribe_name"
-            params = (season_id, order_id)
-
-        else:
-            query = "SELECT * FROM tribes WHERE season_id = ? ORDER BY order_id DESC, tribe_name, iteration"
-            params = (season_id,)
-
-        c.execute(query, params)
-        rows = c.fetchall()
-
-        tribes = []
-        for row in rows:
-            row_dict = dict(row)
-            new_tribe = Tribe(tribe_id=row_dict["id"],
-                              tribe_name=row_dict["tribe_name"],
-                              iteration=row_dict["iteration"],
-                              season_id=row_dict["season_id"],
-                              color=row_dict["color"],
-                              order_id=row_dict["order_id"])
-            tribes.append(new_tribe)
-
-        return tribes
-
-
-    except Exception as e:
-        logger.error(f"Error retrieving tribe: {e}")
-        return []
-    
-    finally:
-        conn.close()
+        except Exception as e:
+            logger.error(f"Error searching tribes: {e}")
+            return []
 
 def edit_player(server_id: int,
                 player: Player | None = None,
@@ -421,76 +607,111 @@ def edit_player(server_id: int,
                 new_tribe_name: str | None = None,
                 new_tribe_iteration: int = 1) -> bool:
     
-    conn = get_connection()
-    c = conn.cursor()
-
-    try:
-        c.execute("SELECT id FROM seasons WHERE server_id = ?", (server_id,))
-        result = c.fetchone()
-        if result is None:
-            logger.warning(f"Season with server_id {server_id} not found.")
-            return False
-        season_id = result[0]
+    with connect() as conn:
+        c = conn.cursor()
 
-        if player is None:
-            if display_name is not None:
-                player = next(iter(get_player(server_id=server_id, display_name=display_name)), None)
-            elif player_id is not None:
-                player = next(iter(get_player(server_id=server_id, player_id=player_id)), None)
-            elif player_discord_id is not None:
-                player = next(iter(get_player(server_id=server_id, discord_id=player_discord_id)), None)
-            elif user_id is not None:
-                player = next(iter(get_player(server_id=server_id, user_id=user_id)), None)
+        try:
+            c.execute("SELECT id FROM seasons WHERE server_id = ?", (server_id,))
+            result = c.fetchone()
+            if result is None:
+                logger.warning(f"Season with server_id {server_id} not found.")
+                return False
+            season_id = result[0]
 
-        if player is None:
-            logger.warning("No player found to edit (invalid ID, name, or discord_id).")
-            return False
+            if player is None:
+                if display_name is not None:
+                    player = next(iter(get_player(server_id=server_id, display_name=display_name)), None)
+                elif player_id is not None:
+                    player = next(iter(get_player(server_id=server_id, player_id=player_id)), None)
+                elif player_discord_id is not None:
+                    player = next(iter(get_player(server_id=server_id, discord_id=player_discord_id)), None)
+                elif user_id is not None:
+                    player = next(iter(get_player(server_id=server_id, user_id=user_id)), None)
+
+            if player is None:
+                logger.warning("No player found to edit (invalid ID, name, or discord_id).")
+                return False
         
-        queries = []
-        params_list = []
+            queries = []
+            params_list = []
 
-        if new_display_name is not None:
-            c.execute("SELECT 1 FROM players WHERE season_id = ? AND display_name = ?", (season_id, new_display_name))
-            if c.fetchone() is not None:
-                logger.warning(f"Player with display name {new_display_name} already exists in this season.")
-                return False
+            if new_display_name is not None:
+                c.execute("SELECT 1 FROM players WHERE season_id = ? AND display_name = ?", (season_id, new_display_name))
+                if c.fetchone() is not None:
+                    logger.warning(f"Player with display name {new_display_name} already exists in this season.")
+                    return False
 
-            queries.append("UPDATE players SET display_name = ? WHERE id = ?")
-            params_list.append((new_display_name, player.player_id))
+                queries.append("UPDATE players SET display_name = ? WHERE id = ?")
+                params_list.append((new_display_name, player.player_id))
 
-        if new_tribe is None:
-            if new_tribe_id is not None:
-                new_tribe = next(iter(get_tribe(server_id=server_id, tribe_id=new_tribe_id)), None)
-                if new_tribe is None:
-                    logger.warning(f"Tribe with id {new_tribe_id} does not exist.")
-                    return False
+            if new_tribe is None:
+                if new_tribe_id is not None:
+                    new_tribe = next(iter(get_tribe(server_id=server_id, tribe_id=new_tribe_id)), None)
+                    if new_tribe is None:
+                        logger.warning(f"Tribe with id {new_tribe_id} does not exist.")
+                        return False
             
-            elif new_tribe_name is not None:
-                new_tribe = next(iter(get_tribe(server_id=server_id, tribe_name=new_tribe_name, tribe_iteration=new_tribe_iteration)), None)
-                if new_tribe is None:
-                    logger.warning(f"Tribe with name {new_tribe_name} and iteration {new_tribe_iteration} does not exist.")
-                    return False
+                elif new_tribe_name is not None:
+                    new_tribe = next(iter(get_tribe(server_id=server_id, tribe_name=new_tribe_name, tribe_iteration=new_tribe_iteration)), None)
+                    if new_tribe is None:
+                        logger.warning(f"Tribe with name {new_tribe_name} and iteration {new_tribe_iteration} does not exist.")
+                        return False
                 
-        if new_tribe is not None:
-            queries.append("UPDATE players SET tribe_id = ? WHERE id = ?")
-            params_list.append((new_tribe.tribe_id, player.player_id))
+            if new_tribe is not None:
+                queries.append("UPDATE players SET tribe_id = ? WHERE id = ?")
+                params_list.append((new_tribe.tribe_id, player.player_id))
+
+            c.execute("BEGIN")
+            rows_updated = 0
+            for query, params in zip(queries, params_list):
+                c.execute(query, params)
+                rows_updated += c.rowcount
+            conn.commit()
+            cache.invalidate(server_id)
+            print(f"Queries made: {rows_updated}")
+            return rows_updated > 0
 
-        c.execute("BEGIN")
-        rows_updated = 0
-        for query, params in zip(queries, params_list):
-            c.execute(query, params)
-            rows_updated += c.rowcount
-        conn.commit()
-        print(f"Queries made: {rows_updated}")
-        return rows_updated > 0
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error editing player: {e}")
+            return False
 
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"Error editing player: {e}")
-        return False
+def set_player_tribes(server_id: int, tribe_ids: dict[int, int | None]) -> dict[int, int | None] | None:
+    # Moves every player_id to its tribe_id in one transaction.
+    # Returns each player's previous tribe_id, or None if nothing was written.
+    with connect() as conn:
+        c = conn.cursor()
 
-    finally:
-        conn.close()
+        try:
+            c.execute("SELECT id FROM seasons WHERE server_id = ?", (server_id,))
+            result = c.fetchone()
+            if result is None:
+                logger.warning(f"Season with server_id {server_id} not found.")
+                return None
+            season_id = result[0]
+
+            c.execute("BEGIN")
+            previous = {}
+            for player_id in tribe_ids:
+                c.execute("SELECT tribe_id FROM players WHERE id = ? AND season_id = ?", (player_id, season_id))
+                row = c.fetchone()
+                if row is None:
+                    raise ValueError(f"Player {player_id} not found in season {season_id}.")
+                previous[player_id] = row[0]
+
+            c.executemany(
+                "UPDATE players SET tribe_id = ? WHERE id = ?",
+                [(tribe_id, player_id) for player_id, tribe_id in tribe_ids.items()]
+            )
+            conn.commit()
+            cache.invalidate(server_id)
+            logger.info(f"Moved {len(tribe_ids)} player(s) between tribes in season {season_id}.")
+            return previous
+
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error moving players between tribes: {e}")
+            return None
 
 def edit_tribe(server_id: int,
                tribe: Tribe | None = None,
@@ -502,110 +723,108 @@ def edit_tribe(server_id: int,
                new_color: str | None = None,
                new_order_id: int | None = None) -> bool:
     
-    conn = get_connection()
-    c = conn.cursor()
-
-    try:
-        c.execute("SELECT id FROM seasons WHERE server_id = ?", (server_id,))
-        result = c.fetchone()
-        if result is None:
-            logger.warning(f"Season with server_id {server_id} not found.")
-            return False
-        season_id = result[0]
+    with connect() as conn:
+        c = conn.cursor()
 
-        if tribe is None:
-            if tribe_name is not None:
-                tribe = next(iter(get_tribe(server_id=server_id, tribe_name=tribe_name, tribe_iteration=tribe_iteration)), None)
-            elif tribe_id is not None:
-                tribe = next(iter(get_tribe(server_id=server_id, tribe_id=tribe_id)), None)
+        try:
+            c.execute("SELECT id FROM seasons WHERE server_id = ?", (server_id,))
+            result = c.fetchone()
+            if result is None:
+                logger.warning(f"Season with server_id {server_id} not found.")
+                return False
+            season_id = result[0]
 
-        if tribe is None:
-            logger.warning("No tribe found to edit (invalid ID, name, or iteration).")
-            return False
+            if tribe is None:
+                if tribe_name is not None:
+                    tribe = next(iter(get_tribe(server_id=server_id, tribe_name=tribe_name, tribe_iteration=tribe_iteration)), None)
+                elif tribe_id is not None:
+                    tribe = next(iter(get_tribe(server_id=server_id, tribe_id=tribe_id)), None)
+
+            if tribe is None:
+                logger.warning("No tribe found to edit (invalid ID, name, or iteration).")
+                return False
         
-        print(f"Updating tribe with id {tribe.tribe_id}")
+            print(f"Updating tribe with id {tribe.tribe_id}")
 
-        queries = []
-        params_list = []
+            queries = []
+            params_list = []
 
-        # Update iteration + name
-        if new_tribe_name is not None and new_tribe_iteration is not None:
-            c.execute("SELECT 1 FROM tribes WHERE season_id = ? AND tribe_name = ? AND iteration = ?", (season_id, new_tribe_name, new_tribe_iteration))
-            if c.fetchone() is not None:
-                logger.warning("Tribe already exists in this season.")
-            else:
-                queries.append("UPDATE tribes SET tribe_name = ?, iteration = ? WHERE id = ?")
-                params_list.append((new_tribe_name, new_tribe_iteration, tribe.tribe_id))
-
-        # Update name only
-        elif new_tribe_name is not None:
-            c.execute("SELECT 1 FROM tribes WHERE season_id = ? AND tribe_name = ? AND iteration = ?", (season_id, new_tribe_name, tribe.iteration))
-            if c.fetchone() is not None:
-                logger.warning("Tribe already exists in this season.")
-            else:
-                queries.append("UPDATE tribes SET tribe_name = ? WHERE id = ?")
-                params_list.append((new_tribe_name, tribe.tribe_id))
-
-        # Update iteration only
-        elif new_tribe_iteration is not None:
-            c.execute("SELECT 1 FROM tribes WHERE season_id = ? AND tribe_name = ? AND iteration = ?", (season_id, tribe.tribe_name, new_tribe_iteration))
-            if c.fetchone() is not None:
-                logger.warning("Tribe already exists in this season.")
-                return False
-            else:
-                queries.append("UPDATE tribes SET iteration = ? WHERE id = ?")
-                params_list.append((new_tribe_iteration, tribe.tribe_id))
-
-        if new_color is not None:
-            queries.append("UPDATE tribes SET color = ? WHERE id = ?")
-            params_list.append((new_color, tribe.tribe_id))
-        if new_order_id is not None:
-            queries.append("UPDATE tribes SET order_id = ? WHERE id = ?")
-            params_list.append((new_order_id, tribe.tribe_id))
+            # Update iteration + name
+            if new_tribe_name is not None and new_tribe_iteration is not None:
+                c.execute("SELECT 1 FROM tribes WHERE season_id = ? AND tribe_name = ? AND iteration = ?", (season_id, new_tribe_name, new_tribe_iteration))
+                if c.fetchone() is not None:
+                    logger.warning("Tribe already exists in this season.")
+                else:
+                    queries.append("UPDATE tribes SET tribe_name = ?, iteration = ? WHERE id = ?")
+                    params_list.append((new_tribe_name, new_tribe_iteration, tribe.tribe_id))
+
+            # Update name only
+            elif new_tribe_name is not None:
+                c.execute("SELECT 1 FROM tribes WHERE season_id = ? AND tribe_name = ? AND iteration = ?", (season_id, new_tribe_name, tribe.iteration))
+                if c.fetchone() is not None:
+                    logger.warning("Tribe already exists in this season.")
+                else:
+                    queries.append("UPDATE tribes SET tribe_name = ? WHERE id = ?")
+                    params_list.append((new_tribe_name, tribe.tribe_id))
+
+            # Update iteration only
+            elif new_tribe_iteration is not None:
+                c.execute("SELECT 1 FROM tribes WHERE season_id = ? AND tribe_name = ? AND iteration = ?", (season_id, tribe.tribe_name, new_tribe_iteration))
+                if c.fetchone() is not None:
+                    logger.warning("Tribe already exists in this season.")
+                    return False
+                else:
+                    queries.append("UPDATE tribes SET iteration = ? WHERE id = ?")
+                    params_list.append((new_tribe_iteration, tribe.tribe_id))
+
+            if new_color is not None:
+                queries.append("UPDATE tribes SET color = ? WHERE id = ?")
+                params_list.append((new_color, tribe.tribe_id))
+            if new_order_id is not None:
+                queries.append("UPDATE tribes SET order_id = ? WHERE id = ?")
+                params_list.append((new_order_id, tribe.tribe_id))
         
-        c.execute("BEGIN")
-        rows_updated = 0
-        for query, params in zip(queries, params_list):
-            c.execute(query, params)
-            rows_updated += c.rowcount
-        conn.commit()
-        print(f"Queries made: {rows_updated}")
-        return rows_updated > 0
-
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"Error editing player: {e}")
-        return False
-    
-    finally:
-        conn.close()
+            c.execute("BEGIN")
+            rows_updated = 0
+            for query, params in zip(queries, params_list):
+                c.execute(query, params)
+                rows_updated += c.rowcount
+            conn.commit()
+            cache.invalidate(server_id)
+            print(f"Queries made: {rows_updated}")
+            return rows_updated > 0
 
-def delete_season(server_id: int):
-    conn = get_connection()
-    c = conn.cursor()
-
-    try:
-        c.execute("SELECT id FROM seasons WHERE server_id = ?", (server_id,))
-        result = c.fetchone()
-        if result is None:
-            logger.warning(f"Season with server_id {server_id} not found.")
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error editing player: {e}")
             return False
-        season_id = result[0]
-
-        c.execute("BEGIN")
-        c.execute("DELETE FROM players WHERE season_id = ?", (season_id,))
-        c.execute("DELETE FROM tribes WHERE season_id = ?", (season_id,))
-        c.execute("DELETE FROM seasons WHERE id = ?", (season_id,))
-        conn.commit()
-        return True
-    
-    except Exception as e:
-        conn.rollback()
-        logger.warning(f"Error deleting season: {e}")
-        return False
 
-    finally:
-        conn.close()
+def delete_season(server_id: int):
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            c.execute("SELECT id FROM seasons WHERE server_id = ?", (server_id,))
+            result = c.fetchone()
+            if result is None:
+                logger.warning(f"Season with server_id {server_id} not found.")
+                return False
+            season_id = result[0]
+
+            c.execute("BEGIN")
+            c.execute("DELETE FROM artifacts WHERE season_id = ?", (season_id,))
+            c.execute("DELETE FROM players WHERE season_id = ?", (season_id,))
+            c.execute("DELETE FROM tribes WHERE season_id = ?", (season_id,))
+            c.execute("DELETE FROM seasons WHERE id = ?", (season_id,))
+            conn.commit()
+            cache.invalidate(server_id)
+            cache.artifacts.pop(server_id, None)
+            return True
+    
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"Error deleting season: {e}")
+            return False
 
 def delete_player(server_id: int,
                   player: Player | None = None,
@@ -614,37 +833,35 @@ def delete_player(server_id: int,
                   player_discord_id: int | None = None,
                   user_id: int | None = None):
     
-    conn = get_connection()
-    c = conn.cursor()
-
-    try:
-        if player is None:
-            player = next(iter(get_player(server_id=server_id,
-                                          player_id=player_id,
-                                          display_name=display_name,
-                                          user_id=user_id,
-                                          discord_id=player_discord_id)), None)
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            if player is None:
+                player = next(iter(get_player(server_id=server_id,
+                                              player_id=player_id,
+                                              display_name=display_name,
+                                              user_id=user_id,
+                                              discord_id=player_discord_id)), None)
         
-        if player is None:
-            logger.warning("No player found to delete.")
-        else:
-            c.execute("DELETE FROM players WHERE id = ?", (player.player_id,))
-            conn.commit()
-
-        if c.rowcount > 0:
-            logger.info(f"Deleted player {player.display_name} (id={player.player_id})")
-            return True
-        else:
-            logger.warning(f"Player {player.display_name} (id={player.player_id}) not found in database.")
-            return False
+            if player is None:
+                logger.warning("No player found to delete.")
+            else:
+                c.execute("DELETE FROM players WHERE id = ?", (player.player_id,))
+                conn.commit()
+                cache.invalidate(server_id)
 
-    except Exception as e:
-        conn.rollback()
-        logger.warning(f"Error deleting player: {e}")
-        return False
+            if c.rowcount > 0:
+                logger.info(f"Deleted player {player.display_name} (id={player.player_id})")
+                return True
+            else:
+                logger.warning(f"Player {player.display_name} (id={player.player_id}) not found in database.")
+                return False
 
-    finally:
-        conn.close()
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"Error deleting player: {e}")
+            return False
 
 def delete_tribe(server_id: int,
                  tribe: Tribe | None = None,
@@ -652,34 +869,32 @@ def delete_tribe(server_id: int,
                  tribe_iteration: int = 1,
                  tribe_id: int | None = None,):
     
-    conn = get_connection()
-    c = conn.cursor()
-
-    try:
-        if tribe is None:
-            tribe = next(iter(get_tribe(server_id=server_id,
-                                                  tribe_name=tribe_name,
-                                                  tribe_iteration=tribe_iteration,
-                                                  tribe_id=tribe_id)), None)
+    with connect() as conn:
+        c = conn.cursor()
+
+        try:
+            if tribe is None:
+                tribe = next(iter(get_tribe(server_id=server_id,
+                                                      tribe_name=tribe_name,
+                                                      tribe_iteration=tribe_iteration,
+                                                      tribe_id=tribe_id)), None)
             
-        if tribe is None:
-            logger.warning("No tribe found to delete.")
-            return False
-
-        c.execute("BEGIN")
-        c.execute("UPDATE players SET tribe_id = NULL WHERE tribe_id = ?", (tribe.tribe_id,))
-        updated_players = c.rowcount
+            if tribe is None:
+                logger.warning("No tribe found to delete.")
+                return False
 
-        c.execute("DELETE FROM tribes WHERE id = ?", (tribe.tribe_id,))
-        deleted_tribes = c.rowcount
-        conn.commit()
+            c.execute("BEGIN")
+            c.execute("UPDATE players SET tribe_id = NULL WHERE tribe_id = ?", (tribe.tribe_id,))
+            updated_players = c.rowcount
 
-        return (updated_players > 0) or (deleted_tribes > 0)
+            c.execute("DELETE FROM tribes WHERE id = ?", (tribe.tribe_id,))
+            deleted_tribes = c.rowcount
+            conn.commit()
+            cache.invalidate(server_id)
 
-    except Exception as e:
-        conn.rollback()
-        logger.warning(f"Error deleting tribe: {e}")
-        return False
+            return (updated_players > 0) or (deleted_tribes > 0)
 
-    finally:
-        conn.close()
\ No newline at end of file
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"Error deleting tribe: {e}")
+            return False
\ No newline at end of file
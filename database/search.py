@@ -0,0 +1,115 @@
+import heapq
+import unicodedata
+from collections import defaultdict
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents so 'Zoë' matches 'zoe'."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+def ngrams(text: str) -> set[str]:
+    """Every substring of length 1 to 3, so short queries are a single lookup."""
+    return {text[i:i + n] for n in (1, 2, 3) for i in range(len(text) - n + 1)}
+
+class _TrieNode():
+    __slots__ = ("children", "names")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.names: set[str] = set()
+
+class NameIndex():
+    """Autocomplete index over a set of names.
+
+    Prefix matches come from a trie over the folded names. Substring matches
+    come from an n-gram index (lengths 1-3), so a lookup only touches names
+    that share every trigram with the query. Prefix matches rank ahead of
+    substring matches.
+    """
+
+    def __init__(self):
+        self.names: set[str] = set()
+        self.folded: dict[str, str] = {}
+        self.root = _TrieNode()
+        self.ngram_index: dict[str, set[str]] = defaultdict(set)
+
+    def add(self, name: str):
+        if name in self.names:
+            return
+        folded = fold(name)
+        self.names.add(name)
+        self.folded[name] = folded
+
+        node = self.root
+        for ch in folded:
+            node = node.children.setdefault(ch, _TrieNode())
+        node.names.add(name)
+
+        for gram in ngrams(folded):
+            self.ngram_index[gram].add(name)
+
+    def remove(self, name: str):
+        if name not in self.names:
+            return
+        folded = self.folded.pop(name)
+        self.names.discard(name)
+
+        node = self.root
+        for ch in folded:
+            node = node.children[ch]
+        node.names.discard(name)
+
+        for gram in ngrams(folded):
+            self.ngram_index[gram].discard(name)
+            if not self.ngram_index[gram]:
+                del self.ngram_index[gram]
+
+    def sync(self, names):
+        """Bring the index in line with names, touching only what changed."""
+        names = set(names)
+        for name in self.names - names:
+            self.remove(name)
+        for name in names - self.names:
+            self.add(name)
+
+    def _prefix_matches(self, query: str, limit: int) -> list[str]:
+        node = self.root
+        for ch in query:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+
+        matches = []
+        stack = [node]
+        while stack and len(matches) < limit:
+            node = stack.pop()
+            matches.extend(sorted(node.names))
+            # Reverse so children pop in alphabetical order.
+            stack.extend(node.children[ch] for ch in sorted(node.children, reverse=True))
+        return matches[:limit]
+
+    def _substring_matches(self, query: str, limit: int) -> list[str]:
+        if not query:
+            candidates = self.names
+        elif len(query) <= 3:
+            candidates = self.ngram_index.get(query, set())
+        else:
+            grams = {query[i:i + 3] for i in range(len(query) - 2)}
+            postings = sorted((self.ngram_index.get(gram, set()) for gram in grams), key=len)
+            candidates = set.intersection(*postings)
+
+        found = [name for name in candidates if query in self.folded[name]]
+        return heapq.nsmallest(limit, found, key=lambda name: (self.folded[name].find(query), self.folded[name], name))
+
+    def search(self, query: str, limit: int = 25) -> list[str]:
+        query = fold(query)
+        matches = self._prefix_matches(query, limit)
+        if len(matches) < limit:
+            seen = set(matches)
+            # Over-fetch by the prefix count, since those names also match as substrings.
+            for name in self._substring_matches(query, limit + len(matches)):
+                if name not in seen:
+                    matches.append(name)
+                    if len(matches) >= limit:
+                        break
+        return matches
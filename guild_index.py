@@ -0,0 +1,120 @@
+import discord
+from collections import defaultdict
+
+ROLE = "role"
+CATEGORY = "category"
+TEXT = "text"
+VOICE = "voice"
+OTHER = "other"
+
+CHANNEL_KINDS = (CATEGORY, TEXT, VOICE, OTHER)
+
+def _kind(item) -> str:
+    if isinstance(item, discord.Role):
+        return ROLE
+    if isinstance(item, discord.CategoryChannel):
+        return CATEGORY
+    if isinstance(item, discord.TextChannel):
+        return TEXT
+    if isinstance(item, discord.VoiceChannel):
+        return VOICE
+    return OTHER
+
+def _first(matches: dict | None):
+    # Same pick as discord.utils.get over guild.roles / guild.categories /
+    # guild.text_channels, which are ordered by (position, id).
+    if not matches:
+        return None
+    return min(matches.values(), key=lambda item: (item.position, item.id))
+
+class GuildIndex():
+    """Name -> object lookups for one guild's roles and channels.
+
+    Built once from the guild's cache and then patched by the role and
+    channel gateway events, instead of scanning guild.roles or
+    guild.channels on every lookup.
+    """
+
+    def __init__(self, guild: discord.Guild):
+        self.guild = guild
+        # kind -> name -> id -> object. Names are not unique on Discord.
+        self.names: dict[str, defaultdict[str, dict]] = {kind: defaultdict(dict) for kind in (ROLE, *CHANNEL_KINDS)}
+
+        for role in guild.roles:
+            self.add(role)
+        for channel in guild.channels:
+            self.add(channel)
+
+    def add(self, item):
+        self.names[_kind(item)][item.name][item.id] = item
+
+    def remove(self, item):
+        names = self.names[_kind(item)]
+        matches = names.get(item.name)
+        if matches is None:
+            return
+        matches.pop(item.id, None)
+        if not matches:
+            del names[item.name]
+
+    def get(self, kind: str, name: str):
+        return _first(self.names[kind].get(name))
+
+# guild id -> GuildIndex
+_indexes: dict[int, GuildIndex] = {}
+
+def get_index(guild: discord.Guild) -> GuildIndex:
+    index = _indexes.get(guild.id)
+    # A full reconnect replaces the Guild object, so rebuild against the new one.
+    if index is None or index.guild is not guild:
+        index = GuildIndex(guild)
+        _indexes[guild.id] = index
+    return index
+
+def get_role(guild: discord.Guild, name: str) -> discord.Role | None:
+    return get_index(guild).get(ROLE, name)
+
+def get_category(guild: discord.Guild, name: str) -> discord.CategoryChannel | None:
+    return get_index(guild).get(CATEGORY, name)
+
+def get_text_channel(guild: discord.Guild, name: str) -> discord.TextChannel | None:
+    return get_index(guild).get(TEXT, name)
+
+def get_voice_channel(guild: discord.Guild, name: str) -> discord.VoiceChannel | None:
+    return get_index(guild).get(VOICE, name)
+
+def get_channel(guild: discord.Guild, name: str) -> discord.abc.GuildChannel | None:
+    index = get_index(guild)
+    for kind in CHANNEL_KINDS:
+        channel = index.get(kind, name)
+        if channel is not None:
+            return channel
+    return None
+
+def _loaded_index(item) -> GuildIndex | None:
+    # Events for a guild nobody has looked anything up in yet are ignored; its
+    # index is built from the up-to-date cache on first use.
+    index = _indexes.get(item.guild.id)
+    if index is None or index.guild is not item.guild:
+        return None
+    return index
+
+def add(item):
+    index = _loaded_index(item)
+    if index is not None:
+        index.add(item)
+
+def remove(item):
+    index = _loaded_index(item)
+    if index is not None:
+        index.remove(item)
+
+def update(before, after):
+    index = _loaded_index(after)
+    if index is not None:
+        # before carries the old name and type, after is the live object.
+        index.remove(before)
+        index.add(after)
+
+def drop(guild: discord.Guild):
+    _indexes.pop(guild.id, None)
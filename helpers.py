@@ -1,12 +1,18 @@
+import asyncio
+import artifacts
 import discord
-from database import queries
+import guild_index
+import scheduler
+from database import async_queries
 from discord import app_commands
 from typing import Iterable, TypeVar, Optional
 import re
 import config
 from player import Player
 from tribe import Tribe
-import asyncio
+
+LOCK_SUFFIX = "-🔒"
+ONE_ON_ONE_CATEGORY_SIZE = 50
 
 T = TypeVar("T")
 def get_first(iterable: Iterable[T], default: Optional[T] = None) -> Optional[T]:
@@ -26,228 +32,543 @@ async def autocomplete_players(interaction: discord.Interaction, current: str) -
     if not guild:
         return []
     
-    players = queries.get_player(server_id=guild.id)
-    choices = [app_commands.Choice(name=p.display_name, value=p.display_name) for p in players if current.lower() in p.display_name.lower()]
-
-    return choices[:25]
+    names = await async_queries.search_players(server_id=guild.id, current=current)
+    return [app_commands.Choice(name=name, value=name) for name in names]
 
 async def autocomplete_tribes(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
     guild = interaction.guild
     if not guild:
         return []
     
-    tribes = queries.get_tribe(server_id=guild.id)
-    choices = [app_commands.Choice(name=t.tribe_string, value=t.tribe_string) for t in tribes if current.lower() in t.tribe_string.lower()]
+    tribe_strings = await async_queries.search_tribes(server_id=guild.id, current=current)
+    return [app_commands.Choice(name=tribe_string, value=tribe_string) for tribe_string in tribe_strings]
+
+async def resolve_members(guild: discord.Guild, discord_ids: Iterable[int]) -> dict[int, discord.Member]:
+    """Look members up in the cache, then fetch every miss with one gateway
+    member query per 100 ids. Users no longer in the guild are left out."""
+    members = {}
+    missing = []
+    for discord_id in set(discord_ids):
+        member = guild.get_member(discord_id)
+        if member is not None:
+            members[discord_id] = member
+        else:
+            missing.append(discord_id)
+
+    for i in range(0, len(missing), 100):
+        try:
+            fetched = await guild.query_members(user_ids=missing[i:i + 100], limit=100, cache=True)
+        except asyncio.TimeoutError:
+            continue
+        members.update((member.id, member) for member in fetched)
+
+    return members
 
-    return choices[:25]
+def plan_channel_positions(channels: list[discord.abc.GuildChannel]) -> dict[discord.abc.GuildChannel, int]:
+    """Diff a desired sibling order against the current channel positions.
+
+    channels must be every sibling of one kind (all categories, or all text
+    channels of one category) in the order they should end up in. Only the
+    channels whose position changes are returned.
+    """
+    return {channel: position for position, channel in enumerate(channels) if channel.position != position}
+
+async def edit_channel_positions(guild: discord.Guild, positions: dict[discord.abc.GuildChannel, int]):
+    # One bulk PATCH to the guild's channel positions, which is what
+    # channel.move() sends for a single channel.
+    if not positions:
+        return
+    payload = [{"id": channel.id, "position": position} for channel, position in positions.items()]
+    await scheduler.submit(guild, lambda: guild._state.http.bulk_channel_update(guild.id, payload, reason=None), bucket=("channel_positions", guild.id))
+
+async def arrange_channels(guild: discord.Guild, channels: list[discord.abc.GuildChannel]) -> int:
+    positions = plan_channel_positions(channels)
+    await edit_channel_positions(guild, positions)
+    return len(positions)
+
+def _current_order(channels: list[discord.abc.GuildChannel]) -> list[discord.abc.GuildChannel]:
+    return sorted({channel.id: channel for channel in channels}.values(), key=lambda c: (c.position, c.id))
 
 async def arrange_categories(guild: discord.Guild):
-    previous_category = None
+    created = []
+    setup_categories = []
     for category_dict in config.CATEGORY_STRUCTURE:
 
         if not category_dict.get("create_on_setup", False):
             continue
 
         category_name = category_dict["name"]
-        category = discord.utils.get(guild.categories, name=category_name)
+        category = guild_index.get_category(guild, category_name)
 
         if category is None:
-            category = await guild.create_category(name=category_name)
-
-        if previous_category is None:
-            await category.move(beginning=True)
-        else:
-            await category.move(after=previous_category)
-
-        previous_category = category
-
-async def arrange_player_roles(guild: discord.Guild):
-    players = queries.get_player(server_id=guild.id)
-
-    previous_role = discord.utils.get(guild.roles, name="Castaway")
+            category = await scheduler.submit(guild, lambda name=category_name: guild.create_category(name=name))
+            created.append(category)
+
+        setup_categories.append(category)
+
+    # Setup categories go first, in config order; anything else keeps its order below them.
+    others = [c for c in _current_order([*guild.categories, *created]) if c not in setup_categories]
+    await arrange_channels(guild, setup_categories + others)
+
+def plan_role_layout(roles: list[discord.Role], players: list[Player], tribes: list[Tribe], top_role: discord.Role) -> list[discord.Role]:
+    """Return the roles below top_role bottom-up, in the order they should end up.
+
+    Tribe roles sit directly below Immunity (latest order_id first) and player
+    roles directly below Castaway (alphabetical), which is where the old
+    role.move(above=previous_role) loops put them. Every other role keeps its
+    place. A block whose anchor is above top_role goes right below top_role;
+    one whose anchor does not exist goes to the bottom. Season roles at or
+    above top_role are left out, since the bot cannot move them.
+    """
+    current = sorted(roles, key=lambda r: (r.position, r.id))
+    ceiling = current.index(top_role)
+    # The default role is always at the bottom and cannot be moved.
+    movable = current[1:ceiling]
+
+    roles_by_name = {}
+    for role in current:
+        roles_by_name.setdefault(role.name, role)
+
+    def block(names: list[str]) -> list[discord.Role]:
+        found = []
+        for role_name in names:
+            role = roles_by_name.get(role_name)
+            if role is not None and role in movable and role not in found:
+                found.append(role)
+        return found
+
+    tribe_roles = block([tribe.tribe_string for tribe in tribes])
+    player_roles = [role for role in block([player.display_name for player in players]) if role not in tribe_roles]
+    blocks = {"Immunity": tribe_roles, "Castaway": player_roles}
+
+    bottom, top = [], []
+    for anchor, season_roles in blocks.items():
+        anchor_role = roles_by_name.get(anchor)
+        if anchor_role is None or anchor_role in tribe_roles or anchor_role in player_roles:
+            bottom.extend(reversed(season_roles))
+        elif anchor_role not in movable:
+            top.append((current.index(anchor_role), season_roles))
+
+    layout = list(bottom)
+    for role in movable:
+        if role in tribe_roles or role in player_roles:
+            continue
+        season_roles = blocks.get(role.name)
+        if season_roles is not None and roles_by_name[role.name] is role:
+            layout.extend(reversed(season_roles))
+        layout.append(role)
+    for _, season_roles in sorted(top, key=lambda item: item[0]):
+        layout.extend(reversed(season_roles))
+    return layout
+
+def plan_role_positions(roles: list[discord.Role], layout: list[discord.Role]) -> dict[discord.Role, int]:
+    """Diff the bottom-up layout against the current role positions.
+
+    The layout roles are shuffled among the slots they already occupy, so
+    every other role stays where it is. Only roles whose position actually
+    changes are returned.
+    """
+    current = sorted(roles, key=lambda r: (r.position, r.id))
+    index = {role: i for i, role in enumerate(current)}
+
+    slots = sorted(index[role] for role in layout)
+    targets = zip(layout, slots)
+    return {role: slot for role, slot in targets if index[role] != slot}
+
+async def apply_role_layout(guild: discord.Guild,
+                            players: list[Player],
+                            tribes: list[Tribe],
+                            created_roles: list[discord.Role] | None = None,
+                            dry_run: bool = False) -> dict[discord.Role, int]:
+    # Roles created moments ago may not be in guild.roles until the gateway event arrives.
+    roles = list({role.id: role for role in [*guild.roles, *(created_roles or [])]}.values())
+
+    bot_top_role = guild.me.top_role
+    season_names = {tribe.tribe_string for tribe in tribes} | {player.display_name for player in players}
+    for role in roles:
+        if role.name in season_names and role >= bot_top_role:
+            print(f"Cannot move role {role.name} (not below the bot's top role).")
+
+    layout = plan_role_layout(roles, players, tribes, bot_top_role)
+    positions = plan_role_positions(roles, layout)
+
+    if dry_run:
+        print(f"Role layout for {guild.name}: {len(positions)} position change(s).")
+        for role, position in sorted(positions.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {role.name}: {role.position} -> {position}")
+        return positions
+
+    if positions:
+        await scheduler.submit(guild, lambda: guild.edit_role_positions(positions=positions), bucket=("role_positions", guild.id))
+
+    return positions
+
+async def _sync_role(guild: discord.Guild, kind: str, entity_id: int, name: str, color: discord.Color, created_roles: list[discord.Role], dry_run: bool):
+    role = await artifacts.get(guild, kind, entity_id, names=(name,), adopt=not dry_run)
+    if role is None:
+        if dry_run:
+            print(f"  create role {name} ({color})")
+            return
+        role = await scheduler.submit(guild, lambda: guild.create_role(name=name, color=color))
+        await artifacts.record(guild, kind, entity_id, role)
+        created_roles.append(role)
+        return
+
+    # Found by id, so a renamed player or tribe renames its role too.
+    changes = {}
+    if role.name != name:
+        changes["name"] = name
+    if role.color != color:
+        changes["color"] = color
+    if changes:
+        if dry_run:
+            print(f"  update role {role.name}: {changes}")
+            return
+        await scheduler.edit(role, **changes)
+
+async def arrange_player_roles(guild: discord.Guild, dry_run: bool = False):
+    players = await async_queries.get_player(server_id=guild.id)
+    tribes = await async_queries.get_tribe(server_id=guild.id)
+    tribes_by_id = {tribe.tribe_id: tribe for tribe in tribes}
+
+    created_roles = []
+    syncs = []
     for player in players:
-        player_role = discord.utils.get(guild.roles, name=player.display_name)
-        if player_role is None:
-            player_tribe = get_first(queries.get_tribe(server_id=guild.id, player_display_name=player.display_name))
-            if player_tribe is not None:
-                player_role = await guild.create_role(name=player.display_name, color=discord.Color(int(player_tribe.color, 16)))
-            else:
-                player_role = await guild.create_role(name=player.display_name)
-        else:
-            player_tribe = get_first(queries.get_tribe(server_id=guild.id, player_display_name=player.display_name))
-            if player_tribe is not None:
-                await player_role.edit(color=discord.Color(int(player_tribe.color, 16)))
-            else:
-                await player_role.edit(color=discord.Color.default)
-
-        if previous_role is None:
-            await player_role.move(beginning=True)
+        player_tribe = tribes_by_id.get(player.tribe_id)
+        if player_tribe is not None:
+            color = discord.Color(player_tribe.color_int)
         else:
-            await player_role.move(above=previous_role)
+            color = discord.Color.default()
+        syncs.append(_sync_role(guild, artifacts.PLAYER_ROLE, player.player_id, player.display_name, color, created_roles, dry_run))
+    await asyncio.gather(*syncs)
 
-        previous_role = player_role
+    await apply_role_layout(guild, players, tribes, created_roles=created_roles, dry_run=dry_run)
 
-async def arrange_tribe_roles(guild: discord.Guild):
-    tribes = queries.get_tribe(server_id=guild.id)
-    previous_role = discord.utils.get(guild.roles, name="Immunity")
-    for tribe in tribes:
-        tribe_role = discord.utils.get(guild.roles, name=tribe.tribe_string)
-        if tribe_role is None:
-            tribe_role = await guild.create_role(name=tribe.tribe_string, color=discord.Color(int(tribe.color, 16)))
-        else:
-            await tribe_role.edit(color=discord.Color(int(tribe.color, 16)))
+async def arrange_tribe_roles(guild: discord.Guild, dry_run: bool = False):
+    players = await async_queries.get_player(server_id=guild.id)
+    tribes = await async_queries.get_tribe(server_id=guild.id)
 
-        if previous_role is None:
-            await tribe_role.move(beginning=True)
-        else:
-            await tribe_role.move(above=previous_role)
+    created_roles = []
+    await asyncio.gather(*(
+        _sync_role(guild, artifacts.TRIBE_ROLE, tribe.tribe_id, tribe.tribe_string, discord.Color(tribe.color_int), created_roles, dry_run)
+        for tribe in tribes
+    ))
 
-        previous_role = tribe_role
+    await apply_role_layout(guild, players, tribes, created_roles=created_roles, dry_run=dry_run)
 
-async def arrange_tribe_confessionals(guild: discord.Guild):
-    confessional_category = discord.utils.get(guild.categories, name="Confessionals")
-    tribes_list = queries.get_tribe(server_id=guild.id)
+async def _arrange_tribe_categories(guild: discord.Guild, base_name: str, suffix: str):
+    base_category = guild_index.get_category(guild, base_name)
+    if base_category is None:
+        return
 
-    category_order = [confessional_category]
-    for tribe in tribes_list:
-        category_name = f"{tribe.tribe_string} Confessionals"
-        found_category = discord.utils.get(guild.categories, name=category_name)
-        if found_category:
-            category_order.append(found_category)
+    tribes_list = await async_queries.get_tribe(server_id=guild.id)
 
-    prev_category = category_order[0]
-    for category in category_order:
-        if category is not confessional_category:
-            await category.move(after=prev_category)
-        prev_category = category
-
-async def arrange_tribe_submissions(guild: discord.Guild):
-    submissions_category = discord.utils.get(guild.categories, name="Submissions")
-    tribes_list = queries.get_tribe(server_id=guild.id)
-
-    category_order = [submissions_category]
+    tribe_categories = []
     for tribe in tribes_list:
-        category_name = f"{tribe.tribe_string} Submissions"
-        found_category = discord.utils.get(guild.categories, name=category_name)
-
+        category_name = f"{tribe.tribe_string} {suffix}"
+        found_category = guild_index.get_category(guild, category_name)
         if found_category:
-            category_order.append(found_category)
+            tribe_categories.append(found_category)
 
-    prev_category = category_order[0]
-    for category in category_order:
-        if category is not submissions_category:
-            await category.move(after=prev_category)
-        prev_category = category
+    # Tribe categories directly follow their base category; everything else keeps its order.
+    order = [c for c in _current_order(guild.categories) if c not in tribe_categories]
+    index = order.index(base_category) + 1
+    order[index:index] = tribe_categories
+    await arrange_channels(guild, order)
 
-async def arrange_tribe_1_1_categories(guild: discord.Guild):
-    one_on_ones_category = discord.utils.get(guild.categories, name="1-1's")
-    tribes_list = queries.get_tribe(server_id=guild.id)
-
-    category_order = [one_on_ones_category]
-    for tribe in tribes_list:
-        category_name = f"{tribe.tribe_string} 1-1's"
-        found_category = discord.utils.get(guild.categories, name=category_name)
-
-        if found_category:
-            category_order.append(found_category)
-
-    prev_category = category_order[0]
-    for category in category_order:
-        if category is not one_on_ones_category:
-            await category.move(after=prev_category)
-        prev_category = category
-
-async def swap_player_tribe(guild: discord.Guild, player: Player, new_tribe: Tribe):
-    player.tribe_id = new_tribe.tribe_id
-
-    queries.edit_player(server_id=guild.id, player=player, new_tribe=new_tribe)
-
-    tribe_role = discord.utils.get(guild.roles, name=new_tribe.tribe_string)
-    player_role = discord.utils.get(guild.roles, name=player.display_name)
-    player_user = await player.get_discord_user(guild)
-
-    if player_user:
-        castaway_role = discord.utils.get(player_user.roles, name="Castaway")
+async def arrange_tribe_confessionals(guild: discord.Guild):
+    await _arrange_tribe_categories(guild, "Confessionals", "Confessionals")
 
-    if castaway_role and tribe_role and player_user:
-        await player_user.add_roles(tribe_role)
+async def arrange_tribe_submissions(guild: discord.Guild):
+    await _arrange_tribe_categories(guild, "Submissions", "Submissions")
 
-    if player_role:
-        await player_role.edit(color=discord.Color(int(new_tribe.color, 16)))
+async def arrange_tribe_1_1_categories(guild: discord.Guild):
+    await _arrange_tribe_categories(guild, "1-1's", "1-1's")
+
+class SwapResult():
+    """What happened to one player in a tribe swap."""
+
+    def __init__(self, player: Player, old_tribe: Tribe | None, new_tribe: Tribe | None):
+        self.player = player
+        self.old_tribe = old_tribe
+        self.new_tribe = new_tribe
+        self.error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"failed: {self.error}"
+        return f"{self.player}: {self.old_tribe or 'Unassigned'} -> {self.new_tribe or 'Unassigned'} ({status})"
+
+async def _apply_swap_roles(guild: discord.Guild, result: SwapResult, member: discord.Member | None):
+    new_role = result.new_tribe.role(guild) if result.new_tribe else None
+    old_role = result.old_tribe.role(guild) if result.old_tribe else None
+    player_role = result.player.role(guild)
+    color = discord.Color(result.new_tribe.color_int) if result.new_tribe else discord.Color.default()
+
+    # Each step checks the current state first, so re-running a swap only
+    # sends what is still missing.
+    updates = []
+    if member is not None:
+        if old_role and old_role != new_role and old_role in member.roles:
+            updates.append(scheduler.submit(guild, lambda: member.remove_roles(old_role), priority=scheduler.INTERACTIVE, bucket=("Member", member.id)))
+        castaway_role = discord.utils.get(member.roles, name="Castaway")
+        if castaway_role and new_role and new_role not in member.roles:
+            updates.append(scheduler.submit(guild, lambda: member.add_roles(new_role), priority=scheduler.INTERACTIVE, bucket=("Member", member.id)))
+    if player_role and player_role.color != color:
+        updates.append(scheduler.edit(player_role, priority=scheduler.INTERACTIVE, color=color))
+
+    for outcome in await asyncio.gather(*updates, return_exceptions=True):
+        if isinstance(outcome, Exception):
+            result.error = str(outcome)
+
+async def _run_tribe_swap(guild: discord.Guild, results: list[SwapResult]) -> list[SwapResult]:
+    tribe_ids = {result.player.player_id: result.new_tribe.tribe_id if result.new_tribe else None for result in results}
+    if await async_queries.set_player_tribes(server_id=guild.id, tribe_ids=tribe_ids) is None:
+        for result in results:
+            result.error = "Database update failed, nothing was changed."
+        return results
+
+    members = await resolve_members(guild, (result.player.discord_id for result in results if result.player.discord_id))
+    await asyncio.gather(*(_apply_swap_roles(guild, result, members.get(result.player.discord_id)) for result in results))
+    return results
+
+async def execute_tribe_swap(guild: discord.Guild, targets: dict[Player, Tribe | None]) -> list[SwapResult]:
+    """Move players to their target tribes.
+
+    All tribe assignments are written in one transaction first. If that
+    fails, nothing changes and every result carries the error. The role
+    changes then run concurrently through the scheduler: add the new tribe
+    role, remove the old one, recolor the player role. Failures are recorded
+    per player. resume_tribe_swap() retries the failed results and
+    rollback_tribe_swap() undoes a swap.
+    """
+    roster = {player.player_id: player for player in await async_queries.get_roster(server_id=guild.id)}
+    tribes_by_id = {tribe.tribe_id: tribe for tribe in await async_queries.get_tribe(server_id=guild.id)}
+
+    results = []
+    for player, new_tribe in targets.items():
+        current = roster.get(player.player_id, player)
+        results.append(SwapResult(current, tribes_by_id.get(current.tribe_id), new_tribe))
+    return await _run_tribe_swap(guild, results)
+
+async def resume_tribe_swap(guild: discord.Guild, results: list[SwapResult]) -> list[SwapResult]:
+    # The roster already holds the new tribes, so the old tribe whose role
+    # still has to be removed only survives in the original results.
+    return await _run_tribe_swap(guild, [SwapResult(result.player, result.old_tribe, result.new_tribe) for result in results if not result.ok])
+
+async def rollback_tribe_swap(guild: discord.Guild, results: list[SwapResult]) -> list[SwapResult]:
+    return await _run_tribe_swap(guild, [SwapResult(result.player, result.new_tribe, result.old_tribe) for result in results])
+
+async def swap_player_tribe(guild: discord.Guild, player: Player, new_tribe: Tribe) -> SwapResult:
+    return get_first(await execute_tribe_swap(guild, {player: new_tribe}))
 
 async def alphabetize_category(category: discord.CategoryChannel):
-    text_channels = list(category.text_channels)
-    sorted_channels = sorted(text_channels, key=lambda c: c.name)
-
-    previous_channel = None
-    for channel in sorted_channels:
-        if previous_channel is None:
-            await channel.move(beginning=True)
-        else:
-            await channel.move(after=previous_channel)
-        previous_channel = channel
-        await asyncio.sleep(0.25)
+    sorted_channels = sorted(category.text_channels, key=lambda c: c.name)
+    await arrange_channels(category.guild, sorted_channels)
 
 def extract_number(name: str) -> int:
     match = re.search(r"(\d+)", name)
     return int(match.group(1)) if match else 0
 
 async def arrange_tribal_channels(category: discord.CategoryChannel):
-    text_channels = [ch for ch in category.text_channels]
+    sorted_channels = sorted(category.text_channels, key=lambda c: (extract_number(c.name), c.name))
+    await arrange_channels(category.guild, sorted_channels)
 
-    sorted_channels = sorted(text_channels, key=lambda c: (extract_number(c.name), c.name))
+def one_on_one_channel_name(player1: Player, player2: Player) -> str:
+    return "-".join(sorted([player1.one_on_one_slug, player2.one_on_one_slug]))
 
-    previous_channel = None
-    for channel in sorted_channels:
-        if previous_channel is None:
-            await channel.move(beginning=True)
-        else:
-            await channel.move(after=previous_channel)
-        previous_channel = channel
+def tribe_chat_name(tribe: Tribe) -> str:
+    if tribe.iteration == 1:
+        return f"{tribe.tribe_name.strip().lower()}-camp"
+    return f"{tribe.tribe_name.strip().lower()}-{tribe.iteration}-camp"
 
-async def lock_1_1(guild: discord.Guild, channel: discord.TextChannel, role1: discord.Role, role2: discord.Role):
-    if not channel.name.endswith("-🔒"):
-        new_name = f"{channel.name}-🔒"
-        await channel.edit(name=new_name)
+async def backfill_artifacts(guild: discord.Guild) -> int:
+    """Store the ids of the season's existing roles and channels, found by name.
 
-    for role in (role1, role2):
-        overwrite = channel.overwrites_for(role)
-        overwrite.send_messages = False
-        await channel.set_permissions(role, overwrite=overwrite)
-
-async def unlock_1_1(guild: discord.Guild, channel: discord.TextChannel, role1: discord.Role, role2: discord.Role):
-    if channel.name.endswith("-🔒"):
-        new_name = channel.name[:-2]
-        await channel.edit(name=new_name)
+    For seasons set up before ids were stored. Returns how many were found.
+    """
+    players = await async_queries.get_roster(server_id=guild.id)
+    tribes = await async_queries.get_tribe(server_id=guild.id)
 
+    found = 0
+    for player in players:
+        found += await artifacts.get(guild, artifacts.PLAYER_ROLE, player.player_id, names=(player.display_name,)) is not None
+        found += await artifacts.get(guild, artifacts.SUBMISSIONS, player.player_id, names=(f"{player.channel_slug}-submissions",)) is not None
+        found += await artifacts.get(guild, artifacts.CONFESSIONAL, player.player_id, names=(f"{player.channel_slug}-confessionals",)) is not None
+    for tribe in tribes:
+        chat_name = tribe_chat_name(tribe)
+        found += await artifacts.get(guild, artifacts.TRIBE_ROLE, tribe.tribe_id, names=(tribe.tribe_string,)) is not None
+        found += await artifacts.get(guild, artifacts.TRIBE_CHAT, tribe.tribe_id, names=(chat_name, f"{chat_name}-🔒")) is not None
+        found += await artifacts.get(guild, artifacts.TRIBE_VC, tribe.tribe_id, names=(f"{tribe.tribe_string} VC",)) is not None
+    for i, p1 in enumerate(players):
+        for p2 in players[i + 1:]:
+            found += await find_1_1(guild, p1, p2) is not None
+    return found
+
+async def find_1_1(guild: discord.Guild, player1: Player, player2: Player) -> discord.TextChannel | None:
+    """The 1-1 of two players, by stored id, else by name whether locked or not."""
+    name = one_on_one_channel_name(player1, player2)
+    entity_id, other_id = artifacts.pair_key(player1.player_id, player2.player_id)
+    return await artifacts.get(guild, artifacts.ONE_ON_ONE, entity_id, other_id, names=(name, f"{name}{LOCK_SUFFIX}"))
+
+class ChannelState():
+    """Desired name, category and overwrites for a channel."""
+
+    def __init__(self, name: str, category: discord.CategoryChannel | None, overwrites: dict):
+        self.name = name
+        self.category = category
+        self.overwrites = overwrites
+
+    def diff(self, channel: discord.abc.GuildChannel) -> dict:
+        """Keyword arguments for channel.edit() covering only what differs."""
+        changes = {}
+        if channel.name != self.name:
+            changes["name"] = self.name
+        if self.category is not None and channel.category_id != self.category.id:
+            changes["category"] = self.category
+        if channel.overwrites != self.overwrites:
+            changes["overwrites"] = self.overwrites
+        return changes
+
+def open_1_1_overwrites(guild: discord.Guild, role1: discord.Role | None, role2: discord.Role | None) -> dict:
+    overwrites = {
+        guild.default_role: discord.PermissionOverwrite(view_channel=False, send_messages=False),
+    }
     for role in (role1, role2):
-        overwrite = channel.overwrites_for(role)
-        overwrite.send_messages = False
-        await channel.set_permissions(role, overwrite=overwrite)
-
-async def alphabetize_categories(guild: discord.Guild, categories: list[discord.CategoryChannel]):
-    
-    all_channels = []
-    for c in categories:
-        all_channels.extend(c.text_channels)
-
-    all_channels.sort(key=lambda ch: ch.name)
-
-    buckets: list[list[discord.TextChannel]] = []
-    for i in range(0, len(all_channels), 50):
-        buckets.append(all_channels[i:i+50])
-
-    new_category_list = []
-    for category in categories:
-        new_category = await guild.create_category(name=category.name, overwrites=category.overwrites)
-        await new_category.move(after=category)
-        new_category_list.append(new_category)
-
-    for i, bucket in enumerate(buckets):
-        for pos, channel in enumerate(bucket):
-            await channel.edit(category=new_category_list[i], position=pos)
-            await asyncio.sleep(0.25)
-
-    for category in categories:
-        await category.delete()
-    
+        if role:
+            overwrites[role] = discord.PermissionOverwrite(
+                view_channel=True, send_messages=True, read_message_history=True
+            )
+    return overwrites
+
+def _1_1_overwrites(channel: discord.TextChannel, role1: discord.Role | None, role2: discord.Role | None, send_messages: bool) -> dict:
+    overwrites = dict(channel.overwrites)
+    for role in (role1, role2):
+        if role:
+            overwrite = channel.overwrites_for(role)
+            overwrite.send_messages = send_messages
+            overwrites[role] = overwrite
+    return overwrites
+
+def locked_1_1_overwrites(channel: discord.TextChannel, role1: discord.Role | None, role2: discord.Role | None) -> dict:
+    return _1_1_overwrites(channel, role1, role2, send_messages=False)
+
+def unlocked_1_1_overwrites(channel: discord.TextChannel, role1: discord.Role | None, role2: discord.Role | None) -> dict:
+    return _1_1_overwrites(channel, role1, role2, send_messages=True)
+
+def locked_1_1_state(channel: discord.TextChannel, role1: discord.Role | None, role2: discord.Role | None, category: discord.CategoryChannel | None = None) -> ChannelState:
+    name = f"{channel.name.removesuffix(LOCK_SUFFIX)}{LOCK_SUFFIX}"
+    return ChannelState(name, category, locked_1_1_overwrites(channel, role1, role2))
+
+def unlocked_1_1_state(channel: discord.TextChannel, role1: discord.Role | None, role2: discord.Role | None, category: discord.CategoryChannel | None = None) -> ChannelState:
+    return ChannelState(channel.name.removesuffix(LOCK_SUFFIX), category, unlocked_1_1_overwrites(channel, role1, role2))
+
+async def apply_channel_state(channel: discord.abc.GuildChannel, state: ChannelState, priority: int = scheduler.BULK) -> bool:
+    """Move channel to state in a single edit. Returns whether an edit was needed."""
+    changes = state.diff(channel)
+    if not changes:
+        return False
+    await scheduler.edit(channel, priority=priority, **changes)
+    return True
+
+async def lock_1_1(guild: discord.Guild, channel: discord.TextChannel, role1: discord.Role, role2: discord.Role, category: discord.CategoryChannel | None = None) -> bool:
+    return await apply_channel_state(channel, locked_1_1_state(channel, role1, role2, category))
+
+async def unlock_1_1(guild: discord.Guild, channel: discord.TextChannel, role1: discord.Role, role2: discord.Role, category: discord.CategoryChannel | None = None) -> bool:
+    return await apply_channel_state(channel, unlocked_1_1_state(channel, role1, role2, category))
+
+async def reconcile_tribe_1_1s(guild: discord.Guild, tribe: Tribe) -> int:
+    """Bring a tribe's 1-1 channels in line with the season roster.
+
+    Pairs inside the tribe get an open channel in the tribe's 1-1 categories,
+    alphabetized and split 50 per category. Existing 1-1s with players from
+    other tribes are locked and moved to Closed. Only the creates, edits and
+    moves that are actually needed are sent, so running it twice in a row
+    makes no API calls the second time. Returns the number of calls made.
+    """
+    tribe_players = await async_queries.get_player(server_id=guild.id, tribe_id=tribe.tribe_id)
+    season_players = await async_queries.get_player(server_id=guild.id)
+
+    api_calls = 0
+
+    pairs = []
+    for i in range(len(tribe_players)):
+        for j in range(i + 1, len(tribe_players)):
+            p1 = tribe_players[i]
+            p2 = tribe_players[j]
+            pairs.append((one_on_one_channel_name(p1, p2), p1, p2))
+    pairs.sort(key=lambda pair: pair[0])
+
+    one_on_ones_category = guild_index.get_category(guild, "1-1's")
+    base_category_name = f"{tribe.tribe_string} 1-1's"
+    bucket_count = max(1, -(-len(pairs) // ONE_ON_ONE_CATEGORY_SIZE))
+
+    categories = []
+    last_category = one_on_ones_category
+    for i in range(bucket_count):
+        category_name = base_category_name if i == 0 else f"{base_category_name} {i + 1}"
+        category = guild_index.get_category(guild, category_name)
+        if not category:
+            category = await scheduler.submit(guild, lambda: guild.create_category(name=category_name))
+            api_calls += 1
+            if last_category is not None:
+                await scheduler.submit(guild, lambda: category.move(after=last_category), bucket=("channel_positions", guild.id))
+                api_calls += 1
+        categories.append(category)
+        last_category = category
+
+    # Creates and edits are all queued up front and run concurrently by the scheduler.
+    placed = []  # (bucket, channel or pending create), in name order.
+    edits = []
+    for index, (channel_name, p1, p2) in enumerate(pairs):
+        bucket = index // ONE_ON_ONE_CATEGORY_SIZE
+        state = ChannelState(channel_name, categories[bucket], open_1_1_overwrites(guild, p1.role(guild), p2.role(guild)))
+
+        channel = await find_1_1(guild, p1, p2)
+        if channel is None:
+            channel = scheduler.submit(guild, lambda state=state: guild.create_text_channel(name=state.name, category=state.category, overwrites=state.overwrites))
+            api_calls += 1
+        else:
+            changes = state.diff(channel)
+            if changes:
+                edits.append(scheduler.edit(channel, **changes))
+                api_calls += 1
+        placed.append((bucket, channel, p1, p2))
+
+    closed_category = guild_index.get_category(guild, "Closed")
+    closed_ids = set()
+    for p1 in tribe_players:
+        for p2 in season_players:
+            if p1 == p2 or p1.tribe_id == p2.tribe_id:
+                continue
+
+            channel = await find_1_1(guild, p1, p2)
+            if channel is None:
+                continue
+
+            state = locked_1_1_state(channel, p1.role(guild), p2.role(guild), closed_category)
+            changes = state.diff(channel)
+            if changes:
+                edits.append(scheduler.edit(channel, **changes))
+                api_calls += 1
+                closed_ids.add(channel.id)
+
+    await asyncio.gather(*edits)
+    buckets: list[list[discord.TextChannel]] = [[] for _ in categories]
+    for bucket, channel, p1, p2 in placed:
+        if isinstance(channel, asyncio.Future):
+            channel = await channel
+            entity_id, other_id = artifacts.pair_key(p1.player_id, p2.player_id)
+            await artifacts.record(guild, artifacts.ONE_ON_ONE, entity_id, channel, other_id)
+        buckets[bucket].append(channel)
+
+    for category, bucket in zip(categories, buckets):
+        planned = {channel.id for channel in bucket} | closed_ids
+        leftovers = [c for c in category.text_channels if c.id not in planned]
+        if await arrange_channels(guild, bucket + leftovers):
+            api_calls += 1
+
+    return api_calls
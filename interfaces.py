@@ -1,15 +1,22 @@
+import asyncio
 import discord
 from discord import SelectOption
 from discord.ui import View, Button, Select, Modal, TextInput
 from player import Player
 from tribe import Tribe
-from database import queries
+import artifacts
+import guild_index
+import metrics
+import scheduler
+from database import async_queries
 from helpers import *
 
 async def get_player_embed(guild: discord.Guild, player: Player) -> discord.Embed:
-    player_tribe = get_first(queries.get_tribe(server_id=guild.id, player_display_name=player.display_name))
+    player_tribe = player.tribe
+    if player_tribe is None and player.tribe_id is not None:
+        player_tribe = get_first(await async_queries.get_tribe(server_id=guild.id, tribe_id=player.tribe_id))
 
-    user_id = player.get_discord_id()
+    user_id = await player.get_discord_id()
     user = guild.get_member(user_id)
     if user is None:
         try:
@@ -17,8 +24,11 @@ async def get_player_embed(guild: discord.Guild, player: Player) -> discord.Embe
         except discord.NotFound:
             user = None
 
+    return build_player_embed(guild, player, player_tribe, user_id, user)
+
+def build_player_embed(guild: discord.Guild, player: Player, player_tribe: Tribe | None, user_id: int, user: discord.Member | None) -> discord.Embed:
     if player_tribe is not None:
-        tribe_color = discord.Color(int(player_tribe.color, 16))
+        tribe_color = discord.Color(player_tribe.color_int)
     else:
         tribe_color = discord.Color.light_gray()
 
@@ -61,11 +71,13 @@ async def get_player_embed(guild: discord.Guild, player: Player) -> discord.Embe
     return embed
 
 async def get_tribe_embed(guild: discord.Guild, tribe: Tribe) -> discord.Embed:
-    tribe_players = queries.get_player(server_id=guild.id, tribe_id=tribe.tribe_id)
+    roster = await async_queries.get_roster(server_id=guild.id)
+    return build_tribe_embed(guild, tribe, [player for player in roster if player.tribe_id == tribe.tribe_id])
 
+def build_tribe_embed(guild: discord.Guild, tribe: Tribe, tribe_players: list[Player]) -> discord.Embed:
     embed = discord.Embed(
         title=tribe.tribe_string,
-        color=discord.Color(int(tribe.color, 16))
+        color=discord.Color(tribe.color_int)
     )
 
     if not tribe_players:
@@ -73,73 +85,141 @@ async def get_tribe_embed(guild: discord.Guild, tribe: Tribe) -> discord.Embed:
         return embed
 
     for player in tribe_players:
-        embed.add_field(name=player.display_name, value=f"{player.mention(guild)}\n<@{player.get_discord_id()}>", inline=False)
+        embed.add_field(name=player.display_name, value=f"{player.mention(guild)}\n<@{player.discord_id}>", inline=False)
 
     embed.set_footer(text=f"Tribe ID: {tribe.tribe_id} | Season ID: {tribe.season_id}")
 
     return embed
 
-class PlayerSetupButtons(View):
-    def __init__(self, player: Player):
+async def build_all_player_embeds(guild: discord.Guild) -> list[tuple[Player, discord.Embed]]:
+    """Embeds for every player of the season from one roster query and one
+    bulk member query for members not in cache."""
+    roster = await async_queries.get_roster(server_id=guild.id)
+    members = await resolve_members(guild, (player.discord_id for player in roster))
+    return [
+        (player, build_player_embed(guild, player, player.tribe, player.discord_id, members.get(player.discord_id)))
+        for player in roster
+    ]
+
+async def build_all_tribe_embeds(guild: discord.Guild) -> list[tuple[Tribe, discord.Embed]]:
+    tribes = await async_queries.get_tribe(server_id=guild.id)
+    roster = await async_queries.get_roster(server_id=guild.id)
+
+    players_by_tribe = {}
+    for player in roster:
+        players_by_tribe.setdefault(player.tribe_id, []).append(player)
+
+    return [(tribe, build_tribe_embed(guild, tribe, players_by_tribe.get(tribe.tribe_id, []))) for tribe in tribes]
+
+async def send_setup_messages(interaction: discord.Interaction, label: str, messages: list[tuple[discord.Embed, View]]):
+    """Send one followup per (embed, view), reporting progress in the original
+    ephemeral response every few messages."""
+    total = len(messages)
+    for sent, (embed, view) in enumerate(messages, start=1):
+        await interaction.followup.send(embed=embed, view=view)
+        if sent % 5 == 0 and sent < total:
+            await interaction.edit_original_response(content=f"Setting up all {label}... {sent}/{total}")
+
+    await interaction.edit_original_response(content=f"Set up {total} {label}.")
+
+class PersistentView(View):
+    """A view whose buttons keep working across restarts.
+
+    Every button's custom_id becomes "<prefix>:<key>:<callback name>", with
+    key the id of the player or tribe the view is for. Sent copies are not
+    kept in memory. PersistentButton picks up the click, rebuilds the view
+    with rehydrate() and runs the button's callback.
+    """
+    prefix: str
+
+    def __init__(self, key: int = 0):
         super().__init__(timeout=None)
+        for item in self.children:
+            item.custom_id = f"{self.prefix}:{key}:{item.custom_id}"
+        # discord.py only stores unfinished views when a message is sent.
+        self.stop()
+
+    @classmethod
+    async def rehydrate(cls, guild: discord.Guild, key: int) -> "PersistentView | None":
+        return cls()
+
+    async def dispatch(self, custom_id: str, interaction: discord.Interaction):
+        item = get_first(item for item in self.children if item.custom_id == custom_id)
+        if item is not None:
+            await item.callback(interaction)
+
+class PlayerSetupButtons(PersistentView):
+    prefix = "player"
+
+    def __init__(self, player: Player):
+        super().__init__(key=player.player_id)
         self.player = player
 
-    @discord.ui.button(label="Submissions", style=discord.ButtonStyle.blurple)
+    @classmethod
+    async def rehydrate(cls, guild: discord.Guild, key: int) -> "PlayerSetupButtons | None":
+        player = get_first(await async_queries.get_player(server_id=guild.id, player_id=key))
+        return cls(player=player) if player else None
+
+    @discord.ui.button(label="Submissions", style=discord.ButtonStyle.blurple, custom_id="player_submissions_callback")
     async def player_submissions_callback(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
 
-        category = discord.utils.get(guild.categories, name="Submissions")
+        category = guild_index.get_category(guild, "Submissions")
         if category is None:
             await interaction.response.send_message("Submissions category not found. Please use `/setupserver` first.", ephemeral=True)
             return
         
-        channel_name = f"{self.player.display_name.strip().lower().replace(' ', '-')}-submissions"
-        channel = discord.utils.get(guild.text_channels, name=channel_name)
+        channel_name = f"{self.player.channel_slug}-submissions"
+        channel = await artifacts.get(guild, artifacts.SUBMISSIONS, self.player.player_id, names=(channel_name,))
         if channel is not None:
-            await channel.delete()
+            await scheduler.submit(guild, channel.delete, priority=scheduler.INTERACTIVE)
+            await artifacts.forget(guild, artifacts.SUBMISSIONS, self.player.player_id)
             await interaction.response.send_message(
                 f"Deleted channel {channel_name}.", ephemeral=True
             )
         else:
-            new_channel = await guild.create_text_channel(name=channel_name, category=category)
+            new_channel = await scheduler.submit(guild, lambda: guild.create_text_channel(name=channel_name, category=category), priority=scheduler.INTERACTIVE)
+            await artifacts.record(guild, artifacts.SUBMISSIONS, self.player.player_id, new_channel)
             await interaction.response.send_message(
                 f"Created chat {new_channel.mention}.", ephemeral=True
             )
 
-    @discord.ui.button(label="Confessional", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Confessional", style=discord.ButtonStyle.blurple, custom_id="player_confessionals_callback")
     async def player_confessionals_callback(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
 
-        category = discord.utils.get(guild.categories, name="Confessionals")
+        category = guild_index.get_category(guild, "Confessionals")
         if category is None:
             await interaction.response.send_message("Confessionals category not found. Please use `/setupserver` first.", ephemeral=True)
             return
         
-        channel_name = f"{self.player.display_name.strip().lower().replace(' ', '-')}-confessionals"
-        channel = discord.utils.get(guild.text_channels, name=channel_name)
+        channel_name = f"{self.player.channel_slug}-confessionals"
+        channel = await artifacts.get(guild, artifacts.CONFESSIONAL, self.player.player_id, names=(channel_name,))
         if channel is not None:
-            await channel.delete()
+            await scheduler.submit(guild, channel.delete, priority=scheduler.INTERACTIVE)
+            await artifacts.forget(guild, artifacts.CONFESSIONAL, self.player.player_id)
             await interaction.response.send_message(
                 f"Deleted channel {channel_name}.", ephemeral=True
             )
         else:
-            new_channel = await guild.create_text_channel(name=channel_name, category=category)
+            new_channel = await scheduler.submit(guild, lambda: guild.create_text_channel(name=channel_name, category=category), priority=scheduler.INTERACTIVE)
+            await artifacts.record(guild, artifacts.CONFESSIONAL, self.player.player_id, new_channel)
             await interaction.response.send_message(
                 f"Created chat {new_channel.mention}.", ephemeral=True
             )
 
-    @discord.ui.button(label="Swap Tribe", style=discord.ButtonStyle.green)
+    @discord.ui.button(label="Swap Tribe", style=discord.ButtonStyle.green, custom_id="player_swap_tribe")
     async def player_swap_tribe(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
-        tribes_list = queries.get_tribe(server_id=guild.id)
+        tribes_list = await async_queries.get_tribe(server_id=guild.id)
         options = [SelectOption(label=tribe.tribe_string, value=tribe.tribe_id) for tribe in tribes_list]
         dropdown_view = TribeDropdownMenuView(player=self.player, options=options)
 
-        player_tribe = get_first(queries.get_tribe(server_id=guild.id, player_id=self.player.player_id))
+        player_tribe = get_first(await async_queries.get_tribe(server_id=guild.id, player_id=self.player.player_id))
         if player_tribe:
             title=f"**{self.player.display_name}**"
             value_name=f"{player_tribe.mention(guild)}"
-            color=discord.Color(int(player_tribe.color, 16))
+            color=discord.Color(player_tribe.color_int)
         else:
             title=f"**{self.player.display_name}**"
             value_name = "Unassigned"
@@ -153,22 +233,22 @@ class PlayerSetupButtons(View):
 
         await interaction.response.send_message(embed=old_tribe_embed, view=dropdown_view)
 
-    @discord.ui.button(label="Reveal Player", style=discord.ButtonStyle.green)
+    @discord.ui.button(label="Reveal Player", style=discord.ButtonStyle.green, custom_id="player_reveal_callback")
     async def player_reveal_callback(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
 
         await interaction.response.defer()
 
-        player_tribe = get_first(queries.get_tribe(server_id=guild.id, player_display_name=self.player.display_name))
+        player_tribe = get_first(await async_queries.get_tribe(server_id=guild.id, player_display_name=self.player.display_name))
 
-        viewer_role = discord.utils.get(guild.roles, name="Viewer")
-        trusted_viewer_role = discord.utils.get(guild.roles, name="Trusted Viewer")
-        castaway_role = discord.utils.get(guild.roles, name="Castaway")
-        player_role = discord.utils.get(guild.roles, name=self.player.display_name)
-        tribe_role = discord.utils.get(guild.roles, name=player_tribe.tribe_string)
+        viewer_role = guild_index.get_role(guild, "Viewer")
+        trusted_viewer_role = guild_index.get_role(guild, "Trusted Viewer")
+        castaway_role = guild_index.get_role(guild, "Castaway")
+        player_role = self.player.role(guild)
+        tribe_role = player_tribe.role(guild)
 
-        user = await guild.fetch_member(self.player.get_discord_id())
-        await user.edit(roles=[])
+        user = await guild.fetch_member(await self.player.get_discord_id())
+        await scheduler.edit(user, priority=scheduler.INTERACTIVE, roles=[])
 
         if user is None:
             return
@@ -180,7 +260,7 @@ class PlayerSetupButtons(View):
                 roles_to_remove.append(trusted_viewer_role)
         
             if roles_to_remove is not None:
-                await user.remove_roles(*roles_to_remove)
+                await scheduler.submit(guild, lambda: user.remove_roles(*roles_to_remove), priority=scheduler.INTERACTIVE, bucket=("Member", user.id))
 
             roles_to_add = []
             if castaway_role is not None and castaway_role not in user.roles:
@@ -193,26 +273,27 @@ class PlayerSetupButtons(View):
                 roles_to_add.append(tribe_role)
 
             if roles_to_add is not None:
-                await user.add_roles(*roles_to_add)
+                await scheduler.submit(guild, lambda: user.add_roles(*roles_to_add), priority=scheduler.INTERACTIVE, bucket=("Member", user.id))
 
             await interaction.followup.send(f"Successfully revealed player **{self.player.display_name}**.")
 
-    @discord.ui.button(label="Eliminate Player", style=discord.ButtonStyle.red)
+    @discord.ui.button(label="Eliminate Player", style=discord.ButtonStyle.red, custom_id="player_elimination_callback")
     async def player_elimination_callback(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
         embed = await get_player_embed(guild=guild, player=self.player)
         embed.color = discord.Color.red()
         embed.title = f"Eliminate: {embed.title}"
         embed.add_field(name="Elimination Type", value="(Not Selected)", inline=False)
-        view = PlayerEliminationView(guild=interaction.guild, player=self.player)
+        discord_member = guild.get_member(await self.player.get_discord_id())
+        view = PlayerEliminationView(guild=interaction.guild, player=self.player, discord_member=discord_member)
         await interaction.response.send_message(embed=embed, view=view)
 
 class PlayerEliminationView(View):
-    def __init__(self, guild: discord.Guild, player: Player):
+    def __init__(self, guild: discord.Guild, player: Player, discord_member: discord.Member | None):
         super().__init__(timeout=None)
         self.player = player
         self.guild = guild
-        self.discord_member = guild.get_member(self.player.get_discord_id())
+        self.discord_member = discord_member
 
         options = [
             discord.SelectOption(label="Jury", value="Jury"),
@@ -237,11 +318,11 @@ class PlayerEliminationView(View):
             if field.name == "Elimination Type":
 
                 if elimination_type == "Jury":
-                    value = discord.utils.get(interaction.guild.roles, name="Jury").mention or "Jury"
+                    value = guild_index.get_role(interaction.guild, "Jury").mention or "Jury"
                 elif elimination_type == "Pre-Jury":
-                    value = discord.utils.get(interaction.guild.roles, name="Pre-Jury").mention or "Pre-Jury"
+                    value = guild_index.get_role(interaction.guild, "Pre-Jury").mention or "Pre-Jury"
                 else:
-                    value = discord.utils.get(interaction.guild.roles, name="Sequester").mention or "Sequester"
+                    value = guild_index.get_role(interaction.guild, "Sequester").mention or "Sequester"
 
                 embed.set_field_at(i, name="Elimination Type", value=value, inline=False)
                 break
@@ -252,57 +333,56 @@ class PlayerEliminationView(View):
         await self.update_embed(interaction, self.elimination_type.values[0])
 
     async def eliminate_prejury(self, interaction: discord.Interaction):
-        player_role = discord.utils.get(self.guild.roles, name=self.player.display_name)
-        await self.discord_member.edit(roles=[player_role])
+        player_role = self.player.role(self.guild)
+        await scheduler.edit(self.discord_member, priority=scheduler.INTERACTIVE, roles=[player_role])
         
-        prejury_role = discord.utils.get(interaction.guild.roles, name="Pre-Jury")
+        prejury_role = guild_index.get_role(interaction.guild, "Pre-Jury")
         if prejury_role:
-            await self.discord_member.add_roles(prejury_role)
+            await scheduler.submit(self.guild, lambda: self.discord_member.add_roles(prejury_role), priority=scheduler.INTERACTIVE, bucket=("Member", self.discord_member.id))
 
         await interaction.followup.send(f"{self.discord_member.mention} has been moved to {prejury_role.mention}.", ephemeral=True)
         await self.archive_player_1_1s()
 
     async def eliminate_jury(self, interaction: discord.Interaction):
-        player_role = discord.utils.get(self.guild.roles, name=self.player.display_name)
-        await self.discord_member.edit(roles=[player_role])
+        player_role = self.player.role(self.guild)
+        await scheduler.edit(self.discord_member, priority=scheduler.INTERACTIVE, roles=[player_role])
         
-        jury_role = discord.utils.get(interaction.guild.roles, name="Jury")
+        jury_role = guild_index.get_role(interaction.guild, "Jury")
         if jury_role:
-            await self.discord_member.add_roles(jury_role)
+            await scheduler.submit(self.guild, lambda: self.discord_member.add_roles(jury_role), priority=scheduler.INTERACTIVE, bucket=("Member", self.discord_member.id))
 
         await interaction.followup.send(f"{self.discord_member.mention} has been moved to {jury_role.mention}.", ephemeral=True)
         await self.archive_player_1_1s()
 
     async def eliminate_sequester(self, interaction: discord.Interaction):
-        player_role = discord.utils.get(self.guild.roles, name=self.player.display_name)
-        await self.discord_member.edit(roles=[player_role])
+        player_role = self.player.role(self.guild)
+        await scheduler.edit(self.discord_member, priority=scheduler.INTERACTIVE, roles=[player_role])
         
-        sequester_role = discord.utils.get(interaction.guild.roles, name="Sequester")
+        sequester_role = guild_index.get_role(interaction.guild, "Sequester")
         if sequester_role:
-            await self.discord_member.add_roles(sequester_role)
+            await scheduler.submit(self.guild, lambda: self.discord_member.add_roles(sequester_role), priority=scheduler.INTERACTIVE, bucket=("Member", self.discord_member.id))
 
         await interaction.followup.send(f"{self.discord_member.mention} has been moved to {sequester_role.mention}.", ephemeral=True)
         await self.archive_player_1_1s()
 
     async def archive_player_1_1s(self):
-        category = discord.utils.get(self.guild.categories, name="1-1's Archive")
+        category = guild_index.get_category(self.guild, "1-1's Archive")
+
+        season_players = await async_queries.get_player(server_id=self.guild.id)
 
-        season_players = queries.get_player(server_id=self.guild.id)
+        role1 = self.player.role(self.guild)
 
+        # One edit per channel covering name, category and overwrites, all queued at once.
+        locks = []
         for player in season_players:
             if player == self.player:
                 continue
-            else:
-                name1 = self.player.display_name.strip().replace(" ", "").lower()
-                name2 = player.display_name.strip().replace(" ", "").lower()
-                full_channel_name = "-".join(sorted([name1, name2]))
-                locked_channel_name = f"{full_channel_name}-🔒"
-                channel = discord.utils.get(self.guild.text_channels, name=full_channel_name) or discord.utils.get(self.guild.text_channels, name=locked_channel_name)
-                if channel:
-                    role1 = discord.utils.get(self.guild.roles, name=self.player.display_name)
-                    role2 = discord.utils.get(self.guild.roles, name=player.display_name)
-                    await lock_1_1(guild=self.guild, channel=channel, role1=role1, role2=role2)
-                    await channel.edit(category=category)
+            channel = await find_1_1(self.guild, self.player, player)
+            if channel:
+                role2 = player.role(self.guild)
+                locks.append(lock_1_1(guild=self.guild, channel=channel, role1=role1, role2=role2, category=category))
+
+        await asyncio.gather(*locks)
 
     @discord.ui.button(label="✅", style=discord.ButtonStyle.green)
     async def confirm_elimination(self, interaction: discord.Interaction, button: Button):
@@ -342,12 +422,12 @@ class TribeDropdownMenuSelect(Select):
         guild = interaction.guild
         selected_tribe_id = int(self.values[0])
 
-        new_tribe = get_first(queries.get_tribe(server_id=guild.id, tribe_id=selected_tribe_id))
+        new_tribe = get_first(await async_queries.get_tribe(server_id=guild.id, tribe_id=selected_tribe_id))
         if new_tribe is None:
             await interaction.response.send_message("No tribe found.")
             return
         
-        old_tribe = get_first(queries.get_tribe(server_id=guild.id, tribe_id=self.player.tribe_id))
+        old_tribe = get_first(await async_queries.get_tribe(server_id=guild.id, tribe_id=self.player.tribe_id))
 
         if new_tribe == old_tribe:
             await interaction.response.send_message("Cannot swap to same tribe.")
@@ -360,7 +440,7 @@ class TribeDropdownMenuSelect(Select):
         
         embed = discord.Embed(
             title=f"{self.player.display_name}",
-            color=discord.Color(int(new_tribe.color, 16))
+            color=discord.Color(new_tribe.color_int)
         )
         embed.add_field(name=f"Old Tribe", value=f"{old_tribe_name}", inline=False)
         embed.add_field(name=f"New Tribe", value=f"{new_tribe.mention(guild)}", inline=False)
@@ -372,6 +452,23 @@ class TribeDropdownMenuSelect(Select):
 
         await interaction.response.send_message(embed=embed, view=view)
 
+async def claim_buttons(view: View, interaction: discord.Interaction) -> bool:
+    """Disable the view's buttons and acknowledge the click.
+
+    discord.py still dispatches clicks that raced the edit disabling the
+    buttons, so only the first click gets True; later ones are acknowledged
+    and should do nothing. Set view.claimed back to False to allow another run.
+    """
+    if getattr(view, "claimed", False):
+        await interaction.response.defer()
+        return False
+    view.claimed = True
+
+    for child in view.children:
+        child.disabled = True
+    await interaction.response.edit_message(view=view)
+    return True
+
 class TribeSwapConfirmView(View):
     def __init__(self, player: Player, new_tribe: Tribe, prev_message: discord.Message):
         super().__init__(timeout=None)
@@ -381,14 +478,11 @@ class TribeSwapConfirmView(View):
 
     @discord.ui.button(label="✅", style=discord.ButtonStyle.green)
     async def confirm_swap_button(self, interaction: discord.Interaction, button: Button):
-        guild = interaction.guild
-
-        await swap_player_tribe(guild=guild, player=self.player, new_tribe=self.new_tribe)     
+        if not await claim_buttons(self, interaction):
+            return
 
-        for child in self.children:
-            child.disabled = True
-        await interaction.message.edit(view=self)
-        await interaction.response.defer(ephemeral=True)
+        result = await swap_player_tribe(guild=interaction.guild, player=self.player, new_tribe=self.new_tribe)
+        await interaction.followup.send(format_swap_report([result]), view=TribeSwapResultView([result]), ephemeral=True)
 
 
     @discord.ui.button(label="❌", style=discord.ButtonStyle.red)
@@ -397,11 +491,10 @@ class TribeSwapConfirmView(View):
         if self.prev_message:
             await self.prev_message.delete()
 
-class ServerSetupButtons(View):
-    def __init__(self):
-        super().__init__(timeout=None)
+class ServerSetupButtons(PersistentView):
+    prefix = "server"
 
-    @discord.ui.button(label="Server Categories", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Server Categories", style=discord.ButtonStyle.blurple, custom_id="setupcategories")
     async def setupcategories(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
         if not guild:
@@ -412,7 +505,7 @@ class ServerSetupButtons(View):
         await arrange_categories(guild)
         await interaction.followup.send("Done.")
 
-    @discord.ui.button(label="Confessional Categories", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Confessional Categories", style=discord.ButtonStyle.blurple, custom_id="setupconfessionalcategories")
     async def setupconfessionalcategories(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
         if not guild:
@@ -423,7 +516,7 @@ class ServerSetupButtons(View):
         await arrange_tribe_confessionals(guild)
         await interaction.followup.send("Done.")
 
-    @discord.ui.button(label="Submissions Categories", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Submissions Categories", style=discord.ButtonStyle.blurple, custom_id="setupsubmissionscategories")
     async def setupsubmissionscategories(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
         if not guild:
@@ -434,7 +527,7 @@ class ServerSetupButtons(View):
         await arrange_tribe_submissions(guild)
         await interaction.followup.send("Done.")
 
-    @discord.ui.button(label="1-1's Categories", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="1-1's Categories", style=discord.ButtonStyle.blurple, custom_id="setup1_1scategories")
     async def setup1_1scategories(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
         if not guild:
@@ -445,7 +538,7 @@ class ServerSetupButtons(View):
         await arrange_tribe_1_1_categories(guild=guild)
         await interaction.followup.send("Done.")
 
-    @discord.ui.button(label="Player Roles", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Player Roles", style=discord.ButtonStyle.blurple, custom_id="setupplayerroles")
     async def setupplayerroles(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
         if not guild:
@@ -456,7 +549,7 @@ class ServerSetupButtons(View):
         await arrange_player_roles(guild)
         await interaction.followup.send("Done.")
 
-    @discord.ui.button(label="Tribe Roles", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Tribe Roles", style=discord.ButtonStyle.blurple, custom_id="setuptriberoles")
     async def setuptriberoles(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
         if not guild:
@@ -467,27 +560,31 @@ class ServerSetupButtons(View):
         await arrange_tribe_roles(guild)
         await interaction.followup.send("Done.")
 
-class TribeSetupButtons(View):
+class TribeSetupButtons(PersistentView):
+    prefix = "tribe"
+
     def __init__(self, tribe: Tribe):
-        super().__init__(timeout=None)
+        super().__init__(key=tribe.tribe_id)
         self.tribe = tribe
 
-    @discord.ui.button(label="Tribe Chat", style=discord.ButtonStyle.blurple)
+    @classmethod
+    async def rehydrate(cls, guild: discord.Guild, key: int) -> "TribeSetupButtons | None":
+        tribe = get_first(await async_queries.get_tribe(server_id=guild.id, tribe_id=key))
+        return cls(tribe=tribe) if tribe else None
+
+    @discord.ui.button(label="Tribe Chat", style=discord.ButtonStyle.blurple, custom_id="setuptribechat")
     async def setuptribechat(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
-        category = discord.utils.get(guild.categories, name="Tribes")
+        category = guild_index.get_category(guild, "Tribes")
         if category is None:
             await interaction.response.send_message("Tribes category not found. Please use /setupcategories first.", ephemeral=True)
             return
         
         await interaction.response.defer()
         
-        if self.tribe.iteration == 1:
-            channel_name = f"{self.tribe.tribe_name.strip().lower()}-camp"
-        else:
-            channel_name = f"{self.tribe.tribe_name.strip().lower()}-{self.tribe.iteration}-camp"
+        channel_name = tribe_chat_name(self.tribe)
 
-        tribe_role = discord.utils.get(guild.roles, name=self.tribe.tribe_string)
+        tribe_role = self.tribe.role(guild)
 
         overwrites = {
             guild.default_role: discord.PermissionOverwrite(view_channel=False),
@@ -504,187 +601,117 @@ class TribeSetupButtons(View):
             tribe_role: discord.PermissionOverwrite(view_channel=True, send_messages=True)
         }
 
-        channel = discord.utils.get(guild.channels, name=channel_name) or discord.utils.get(guild.channels, name=f"{channel_name}-🔒")
+        channel = await artifacts.get(guild, artifacts.TRIBE_CHAT, self.tribe.tribe_id, names=(channel_name, f"{channel_name}-🔒"))
         if channel is not None:
-            archive_category = discord.utils.get(guild.categories, name="Archive")
+            archive_category = guild_index.get_category(guild, "Archive")
             if channel.category == archive_category:
                 new_name = channel.name[:-2]
-                await channel.edit(name=new_name, category=category, overwrites=unarchive_overwrites)
+                await scheduler.edit(channel, priority=scheduler.INTERACTIVE, name=new_name, category=category, overwrites=unarchive_overwrites)
                 await interaction.followup.send(
                     f"Unarchived tribe chat {channel.mention}.", ephemeral=True
                 )
             else:
                 new_name = f"{channel.name}-🔒"
-                await channel.edit(name=new_name, category=archive_category, overwrites=archive_overwrites)
+                await scheduler.edit(channel, priority=scheduler.INTERACTIVE, name=new_name, category=archive_category, overwrites=archive_overwrites)
                 await interaction.followup.send(
                     f"Archived tribe chat {channel.mention}.", ephemeral=True
                 )
         else:
-            new_channel = await guild.create_text_channel(name=channel_name, category=category, overwrites=overwrites)
+            new_channel = await scheduler.submit(guild, lambda: guild.create_text_channel(name=channel_name, category=category, overwrites=overwrites), priority=scheduler.INTERACTIVE)
+            await artifacts.record(guild, artifacts.TRIBE_CHAT, self.tribe.tribe_id, new_channel)
             await interaction.followup.send(
                 f"Created tribe chat {new_channel.mention}.", ephemeral=True
             )
 
-    @discord.ui.button(label="Tribe VC", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Tribe VC", style=discord.ButtonStyle.blurple, custom_id="setuptribevc")
     async def setuptribevc(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
-        category = discord.utils.get(guild.categories, name="Tribes")
+        category = guild_index.get_category(guild, "Tribes")
         if category is None:
             await interaction.response.send_message("Tribes category not found. Please use /setupcategories first.", ephemeral=True)
             return
         
         channel_name = f"{self.tribe.tribe_string} VC"
-        channel = discord.utils.get(category.voice_channels, name=channel_name)
+        channel = await artifacts.get(guild, artifacts.TRIBE_VC, self.tribe.tribe_id, names=(channel_name,))
         if channel is not None:
-            await channel.delete()
+            await scheduler.submit(guild, channel.delete, priority=scheduler.INTERACTIVE)
+            await artifacts.forget(guild, artifacts.TRIBE_VC, self.tribe.tribe_id)
             await interaction.response.send_message(
                 f"Deleted channel {channel_name}.", ephemeral=True
             )
         else:
-            tribe_role = discord.utils.get(guild.roles, name=self.tribe.tribe_string)
+            tribe_role = self.tribe.role(guild)
             overwrites = {
                 guild.default_role: discord.PermissionOverwrite(connect=True, view_channel=False, speak=False),
                 tribe_role: discord.PermissionOverwrite(connect=True, view_channel=True, speak=True),
             }
-            new_channel = await guild.create_voice_channel(name=channel_name, category=category, overwrites=overwrites)
+            new_channel = await scheduler.submit(guild, lambda: guild.create_voice_channel(name=channel_name, category=category, overwrites=overwrites), priority=scheduler.INTERACTIVE)
+            await artifacts.record(guild, artifacts.TRIBE_VC, self.tribe.tribe_id, new_channel)
             await interaction.response.send_message(
                 f"Created tribe voice chat {new_channel.mention}.", ephemeral=True
             )
 
-    @discord.ui.button(label="Submissions", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Submissions", style=discord.ButtonStyle.blurple, custom_id="setuptribesubmissions")
     async def setuptribesubmissions(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
 
         category_name = f"{self.tribe.tribe_string} Submissions"
-        category = discord.utils.get(guild.categories, name=category_name)
+        category = guild_index.get_category(guild, category_name)
         if not category:
-            category = await guild.create_category(name=category_name)
+            category = await scheduler.submit(guild, lambda: guild.create_category(name=category_name))
         
-        tribe_players = queries.get_player(server_id=guild.id, tribe_id=self.tribe.tribe_id)
+        tribe_players = await async_queries.get_player(server_id=guild.id, tribe_id=self.tribe.tribe_id)
+        jobs = []
+        created = []
         for player in tribe_players:
-            channel_name = f"{player.display_name.strip().lower().replace(' ', '-')}-submissions"
-            channel = discord.utils.get(guild.text_channels, name=channel_name)
+            channel_name = f"{player.channel_slug}-submissions"
+            channel = await artifacts.get(guild, artifacts.SUBMISSIONS, player.player_id, names=(channel_name,))
             if not channel:
-                channel = await guild.create_text_channel(name=channel_name, category=category)
+                job = scheduler.submit(guild, lambda name=channel_name: guild.create_text_channel(name=name, category=category))
+                jobs.append(job)
+                created.append((player, job))
             else:
                 if channel.category is not category:
-                    await channel.edit(category=category)
+                    jobs.append(scheduler.edit(channel, category=category))
+        await asyncio.gather(*jobs)
+        for player, job in created:
+            await artifacts.record(guild, artifacts.SUBMISSIONS, player.player_id, job.result())
 
         await interaction.response.send_message("Done")
 
-    @discord.ui.button(label="Confessionals", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Confessionals", style=discord.ButtonStyle.blurple, custom_id="setuptribeconfessionals")
     async def setuptribeconfessionals(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
 
         category_name = f"{self.tribe.tribe_string} Confessionals"
-        category = discord.utils.get(guild.categories, name=category_name)
+        category = guild_index.get_category(guild, category_name)
         if not category:
-            category = await guild.create_category(name=category_name)
+            category = await scheduler.submit(guild, lambda: guild.create_category(name=category_name))
         
-        tribe_players = queries.get_player(server_id=guild.id, tribe_id=self.tribe.tribe_id)
+        tribe_players = await async_queries.get_player(server_id=guild.id, tribe_id=self.tribe.tribe_id)
+        jobs = []
         for player in tribe_players:
-            channel_name = f"{player.display_name.strip().lower().replace(' ', '-')}-confessionals"
-            channel = discord.utils.get(guild.text_channels, name=channel_name)
+            channel_name = f"{player.channel_slug}-confessionals"
+            channel = await artifacts.get(guild, artifacts.CONFESSIONAL, player.player_id, names=(channel_name,))
             if not channel:
                 # channel = await guild.create_text_channel(name=channel_name, category=category)
                 pass
             else:
                 if channel.category is not category:
-                    await channel.edit(category=category)
+                    jobs.append(scheduler.edit(channel, category=category))
+        await asyncio.gather(*jobs)
 
         await interaction.response.send_message("Done")
 
-    @discord.ui.button(label="1-1's", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="1-1's", style=discord.ButtonStyle.blurple, custom_id="setuptribe1_1s")
     async def setuptribe1_1s(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
         await interaction.response.defer()
 
-        tribe_players = queries.get_player(server_id=guild.id, tribe_id=self.tribe.tribe_id)
-        one_on_ones_list = []
-        for i in range(len(tribe_players)):
-            for j in range(i + 1, len(tribe_players)):
-                p1 = tribe_players[i]
-                p2 = tribe_players[j]
-                name1 = p1.display_name.strip().replace(" ", "").lower()
-                name2 = p2.display_name.strip().replace(" ", "").lower()
-                channel_name = "-".join(sorted([name1, name2]))
-                role1 = discord.utils.get(guild.roles, name=p1.display_name)
-                role2 = discord.utils.get(guild.roles, name=p2.display_name)
-                one_on_ones_list.append((channel_name, role1, role2))
-
-        one_on_ones_category = discord.utils.get(guild.categories, name="1-1's")
-        base_category_name = f"{self.tribe.tribe_string} 1-1's"
-
-        categories_to_sort = []
-
-        category_index = 1
-        category_name = base_category_name
-        category = discord.utils.get(guild.categories, name=category_name)
-        if not category:
-            category = await guild.create_category(name=category_name)
-            await category.move(after=one_on_ones_category)
-
-        categories_to_sort.append(category)
-        last_category = category
-        for channel_name, role1, role2 in one_on_ones_list:
-
-            if len(category.text_channels) >= 50:
-                category_index += 1
-                new_category_name = f"{base_category_name} {category_index}"
-                category = discord.utils.get(guild.categories, name=new_category_name)
-                if not category:
-                    category = await guild.create_category(name=new_category_name)
-                    await category.move(after=last_category)
-                categories_to_sort.append(category)
-                last_category = category
-
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(view_channel=False, send_messages=False),
-            }
-            if role1:
-                overwrites[role1] = discord.PermissionOverwrite(
-                    view_channel=True, send_messages=True, read_message_history=True
-                )
-            if role2:
-                overwrites[role2] = discord.PermissionOverwrite(
-                    view_channel=True, send_messages=True, read_message_history=True
-                )
-                
-            channel = discord.utils.get(
-                guild.text_channels, name=channel_name
-            ) or discord.utils.get(
-                guild.text_channels, name=f"{channel_name}-🔒"
-            )
-
-            if channel:
-                await unlock_1_1(guild=guild, channel=channel, role1=role1, role2=role2)
-                await channel.edit(category=category, overwrites=overwrites)
-            else:
-                await guild.create_text_channel(name=channel_name, category=category, overwrites=overwrites)
-
-        season_players = queries.get_player(server_id=guild.id)
-        closed_category = discord.utils.get(guild.categories, name="Closed")
-
-        for p1 in tribe_players:
-            for p2 in season_players:
-                if p1 != p2 and p1.tribe_id != p2.tribe_id:
-                    name1 = p1.display_name.strip().replace(" ", "").lower()
-                    name2 = p2.display_name.strip().replace(" ", "").lower()
-                    channel_name = "-".join(sorted([name1, name2]))
-                        
-                    channel = discord.utils.get(guild.text_channels, name=channel_name) or discord.utils.get(guild.text_channels, name=f"{channel_name}-🔒")
-                    
-                    if channel:
-                        role1 = discord.utils.get(guild.roles, name=p1.display_name)
-                        role2 = discord.utils.get(guild.roles, name=p2.display_name)
-                        await lock_1_1(guild=guild, channel=channel, role1=role1, role2=role2)
-                        await channel.edit(category=closed_category)
-
-        await alphabetize_categories(guild=guild, categories=categories_to_sort)
+        await reconcile_tribe_1_1s(guild=guild, tribe=self.tribe)
         await interaction.followup.send("Done")
 
-
-    @discord.ui.button(label="Arrange Tribe Categories", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Arrange Tribe Categories", style=discord.ButtonStyle.blurple, custom_id="setupcategories")
     async def setupcategories(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
         if not guild:
@@ -697,11 +724,10 @@ class TribeSetupButtons(View):
         await arrange_tribe_1_1_categories(guild)
         await interaction.followup.send("Done.")
 
-class SeasonSetupButtons(View):
-    def __init__(self):
-        super().__init__(timeout=None)
+class SeasonSetupButtons(PersistentView):
+    prefix = "season"
 
-    @discord.ui.button(label="Tribe Swap", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Tribe Swap", style=discord.ButtonStyle.blurple, custom_id="tribe_swap_callback")
     async def tribe_swap_callback(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
 
@@ -710,24 +736,24 @@ class SeasonSetupButtons(View):
         )
         embed.add_field(name="From Tribe(s):", value="(None)", inline=False)
         embed.add_field(name="To Tribe(s):", value="(None)", inline=False)
-        view = TribeSwapView(guild)
+        tribes_list = await async_queries.get_tribe(server_id=guild.id)
+        view = TribeSwapView(guild=guild, tribes_list=tribes_list)
 
         await interaction.response.send_message(embed=embed, view=view)
 
-    @discord.ui.button(label="Tribal Council", style=discord.ButtonStyle.blurple)
+    @discord.ui.button(label="Tribal Council", style=discord.ButtonStyle.blurple, custom_id="tribal_council_callback")
     async def tribal_council_callback(self, interaction: discord.Interaction, button: Button):
         guild = interaction.guild
 
         await interaction.response.send_modal(TribalCouncilNumberModal())
 
 class TribeSwapView(View):
-    def __init__(self, guild: discord.Guild):
+    def __init__(self, guild: discord.Guild, tribes_list: list[Tribe]):
         super().__init__(timeout=None)
         self.guild = guild
         self.from_tribes = set()
         self.to_tribes = set()
 
-        tribes_list = queries.get_tribe(server_id=guild.id)
         options = [
             discord.SelectOption(label=tribe.tribe_string, value=str(tribe.tribe_id))
             for tribe in tribes_list
@@ -754,8 +780,8 @@ class TribeSwapView(View):
     async def update_embed(self, interaction: discord.Interaction):
         embed = discord.Embed(title="Perform Tribe Swap")
 
-        from_tribes_objects = [get_first(queries.get_tribe(server_id=interaction.guild.id, tribe_id=id)) for id in self.from_tribes]
-        to_tribes_objects = [get_first(queries.get_tribe(server_id=interaction.guild.id, tribe_id=id)) for id in self.to_tribes]
+        from_tribes_objects = [get_first(await async_queries.get_tribe(server_id=interaction.guild.id, tribe_id=id)) for id in self.from_tribes]
+        to_tribes_objects = [get_first(await async_queries.get_tribe(server_id=interaction.guild.id, tribe_id=id)) for id in self.to_tribes]
 
         embed.add_field(
             name="From Tribe(s):",
@@ -786,19 +812,23 @@ class TribeSwapView(View):
             child.disabled = True
         await interaction.message.edit(view=self)
 
-        from_tribes_objects = [get_first(queries.get_tribe(server_id=interaction.guild.id, tribe_id=id)) for id in self.from_tribes]
-        to_tribes_objects = [get_first(queries.get_tribe(server_id=interaction.guild.id, tribe_id=id)) for id in self.to_tribes]
+        from_tribes_objects = [get_first(await async_queries.get_tribe(server_id=interaction.guild.id, tribe_id=id)) for id in self.from_tribes]
+        to_tribes_objects = [get_first(await async_queries.get_tribe(server_id=interaction.guild.id, tribe_id=id)) for id in self.to_tribes]
 
         embeds_list = []
         for tribe in to_tribes_objects:
             embed = discord.Embed(
                 title=f"{tribe.tribe_name}",
-                color=discord.Color(int(tribe.color, 16))
+                color=discord.Color(tribe.color_int)
             )
             embed.add_field(name="Players", value="(No Players Added)")
             embeds_list.append(embed)
 
-        view = TribeSwapPlayersView(guild=guild, from_tribes=from_tribes_objects, to_tribes=to_tribes_objects, prev_message=interaction.message)
+        players_to_swap: list[Player] = []
+        for tribe in from_tribes_objects:
+            players_to_swap.extend(await async_queries.get_player(server_id=guild.id, tribe_id=tribe.tribe_id))
+
+        view = TribeSwapPlayersView(guild=guild, from_tribes=from_tribes_objects, to_tribes=to_tribes_objects, players_to_swap=players_to_swap, prev_message=interaction.message)
         await interaction.response.send_message(embeds=embeds_list, view=view)
 
     @discord.ui.button(label="❌", style=discord.ButtonStyle.red)
@@ -806,17 +836,14 @@ class TribeSwapView(View):
         await interaction.message.delete()
 
 class TribeSwapPlayersView(View):
-    def __init__(self, guild: discord.Guild, from_tribes: list[Tribe], to_tribes: list[Tribe], prev_message: discord.Message):
+    def __init__(self, guild: discord.Guild, from_tribes: list[Tribe], to_tribes: list[Tribe], players_to_swap: list[Player], prev_message: discord.Message):
         super().__init__(timeout=None)
         self.guild = guild
         self.from_tribes = from_tribes
         self.to_tribes = to_tribes
         self.prev_message = prev_message
 
-        self.players_to_swap: list[Player] = []
-        for tribe in from_tribes:
-            swap_players = queries.get_player(server_id=guild.id, tribe_id=tribe.tribe_id)
-            self.players_to_swap.extend(swap_players)
+        self.players_to_swap: list[Player] = list(players_to_swap)
         self.players_to_swap.sort(key=lambda p: p.display_name)
 
         self.assignments: dict[Tribe, list[Player]] = {tribe: [] for tribe in self.to_tribes}
@@ -839,7 +866,7 @@ class TribeSwapPlayersView(View):
 
     def make_callback(self, tribe: Tribe, select: discord.ui.Select):
         async def callback(interaction: discord.Interaction):
-            self.assignments[tribe] = [get_first(queries.get_player(server_id=self.guild.id, player_id=int(s))) for s in select.values]
+            self.assignments[tribe] = [get_first(await async_queries.get_player(server_id=self.guild.id, player_id=int(s))) for s in select.values]
             await self.update_embeds(interaction)
         return callback
 
@@ -849,7 +876,7 @@ class TribeSwapPlayersView(View):
         for tribe in self.to_tribes:
             embed = discord.Embed(
                 title=f"{tribe.tribe_name}",
-                color=discord.Color(int(tribe.color, 16))
+                color=discord.Color(tribe.color_int)
             )
             players_list = self.assignments[tribe]
             players_mentions = [p.mention(self.guild) for p in players_list]
@@ -862,31 +889,19 @@ class TribeSwapPlayersView(View):
     async def confirm_swap_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         guild = interaction.guild
 
-        for child in self.children:
-            child.disabled = True
-        await interaction.message.edit(view=self)
-
-        await interaction.response.defer()
-
-        seen = set()
-        for lst in self.assignments.values():
+        targets = {}
+        for tribe, lst in self.assignments.items():
             for player in lst:
-                if player not in seen:
-                    seen.add(player)
-                else:
+                if player in targets:
                     await interaction.response.send_message(f"Cannot add {player.display_name} to multiple tribes.", ephemeral=True)
                     return
+                targets[player] = tribe
 
-        for tribe, lst in self.assignments.items():
-            for player in lst:
-                await swap_player_tribe(guild=guild, player=player, new_tribe=tribe)
-            
-        for child in self.children:
-            if isinstance(child, discord.ui.Button):
-                child.disabled = True
-        await interaction.message.edit(view=self)
-        
-        await interaction.followup.send(f"Swapping players: {self.assignments}", ephemeral=True)
+        if not await claim_buttons(self, interaction):
+            return
+
+        results = await execute_tribe_swap(guild, targets)
+        await interaction.followup.send(format_swap_report(results), view=TribeSwapResultView(results), ephemeral=True)
 
     @discord.ui.button(label="❌", style=discord.ButtonStyle.red)
     async def cancel_swap_button(self, interaction: discord.Interaction, button: Button):
@@ -894,6 +909,41 @@ class TribeSwapPlayersView(View):
         if self.prev_message:
             await self.prev_message.delete()
 
+def format_swap_report(results: list[SwapResult]) -> str:
+    failed = [result for result in results if not result.ok]
+    lines = [f"Swapped {len(results) - len(failed)}/{len(results)} player(s)."]
+    lines.extend(f"- {result}" for result in results)
+    return "\n".join(lines)[:2000]
+
+class TribeSwapResultView(View):
+    def __init__(self, results: list[SwapResult]):
+        super().__init__(timeout=None)
+        self.results = results
+        self.retry_failed.disabled = all(result.ok for result in results)
+
+    @discord.ui.button(label="Retry Failed", style=discord.ButtonStyle.blurple)
+    async def retry_failed(self, interaction: discord.Interaction, button: Button):
+        if not await claim_buttons(self, interaction):
+            return
+
+        retried = {result.player.player_id: result for result in await resume_tribe_swap(interaction.guild, self.results)}
+        # Keep the original old tribes, so a later rollback still goes back to them.
+        for result in self.results:
+            if result.player.player_id in retried:
+                result.error = retried[result.player.player_id].error
+        self.claimed = False
+        self.roll_back.disabled = False
+        button.disabled = all(result.ok for result in self.results)
+        await interaction.edit_original_response(content=format_swap_report(self.results), view=self)
+
+    @discord.ui.button(label="Roll Back", style=discord.ButtonStyle.red)
+    async def roll_back(self, interaction: discord.Interaction, button: Button):
+        if not await claim_buttons(self, interaction):
+            return
+
+        results = await rollback_tribe_swap(interaction.guild, self.results)
+        await interaction.edit_original_response(content=f"Rolled back.\n{format_swap_report(results)}"[:2000], view=self)
+
 class VerifyTribeCreateView(View):
     def __init__(self, tribe_name: str, iteration: int, color: str, order_id: int):
         super().__init__(timeout=None)
@@ -907,13 +957,10 @@ class VerifyTribeCreateView(View):
         guild = interaction.guild
         server_id = guild.id
 
-        for child in self.children:
-            child.disabled = True
-        await interaction.message.edit(view=self)
+        if not await claim_buttons(self, interaction):
+            return
 
-        await interaction.response.defer()
-        
-        result = queries.add_tribe(
+        result = await async_queries.add_tribe(
             tribe_name=self.tribe_name, 
             server_id=server_id, 
             iteration=self.iteration, 
@@ -921,15 +968,9 @@ class VerifyTribeCreateView(View):
             order_id=self.order_id
         )
 
-        new_tribe = get_first(queries.get_tribe(server_id=server_id, tribe_name=self.tribe_name, tribe_iteration=self.iteration))
+        new_tribe = get_first(await async_queries.get_tribe(server_id=server_id, tribe_name=self.tribe_name, tribe_iteration=self.iteration))
         tribe_string = new_tribe.tribe_string if new_tribe is not None else ""
 
-        for child in self.children:
-            if isinstance(child, discord.ui.Button):
-                child.disabled = True
-
-        await interaction.message.edit(view=self)
-
         if result == 1:
             await interaction.followup.send(f"Successfully added tribe **{tribe_string}**.", ephemeral=False)
         elif result == 0:
@@ -959,19 +1000,18 @@ class TribalCouncilNumberModal(discord.ui.Modal):
         )
         embed.add_field(name="Tribe(s) Attending", value="(None)", inline=False)
 
-        view = TribalCouncilOptions(guild=guild, tribal_number=self.tribal_number.value)
+        tribes = await async_queries.get_tribe(server_id=guild.id)
+        view = TribalCouncilOptions(guild=guild, tribal_number=self.tribal_number.value, tribes=tribes)
 
         await interaction.response.send_message(embed=embed, view=view)
 
 class TribalCouncilOptions(View):
-    def __init__(self, guild: discord.Guild, tribal_number: str):
+    def __init__(self, guild: discord.Guild, tribal_number: str, tribes: list[Tribe]):
         super().__init__(timeout=None)
         self.tribal_number = tribal_number
         self.selected_tribes = set()
         self.guild = guild
 
-        tribes = queries.get_tribe(server_id=guild.id)
-
         options = [
             discord.SelectOption(label=t.tribe_string, value=str(t.tribe_id))
             for t in tribes
@@ -998,14 +1038,14 @@ class TribalCouncilOptions(View):
 
         await interaction.response.defer()
 
-        tribal_category = discord.utils.get(guild.categories, name="Tribal Councils")
-        tribes = [get_first(queries.get_tribe(server_id=interaction.guild.id, tribe_id=int(id))) for id in self.selected_tribes]
+        tribal_category = guild_index.get_category(guild, "Tribal Councils")
+        tribes = [get_first(await async_queries.get_tribe(server_id=interaction.guild.id, tribe_id=int(id))) for id in self.selected_tribes]
         
-        tribe_channel_names = [tribe.tribe_name.lower().strip().replace(" ", "-") for tribe in tribes]
+        tribe_channel_names = [tribe.channel_slug for tribe in tribes]
         
         full_channel_name = f"tribal-council-{self.tribal_number}-{"-".join(sorted(tribe_channel_names))}"
 
-        channel = await guild.create_text_channel(name=full_channel_name, category=tribal_category)
+        channel = await scheduler.submit(guild, lambda: guild.create_text_channel(name=full_channel_name, category=tribal_category), priority=scheduler.INTERACTIVE)
         await arrange_tribal_channels(tribal_category)
         await interaction.followup.send(f"Created new Tribal Council in {channel.mention}.")
         
@@ -1021,7 +1061,7 @@ class TribalCouncilOptions(View):
     async def update_embed(self, interaction: discord.Interaction):
         embed = discord.Embed(title=f"Tribal Council #{self.tribal_number} Setup")
 
-        tribes = [get_first(queries.get_tribe(server_id=interaction.guild.id, tribe_id=int(id))) for id in self.selected_tribes]
+        tribes = [get_first(await async_queries.get_tribe(server_id=interaction.guild.id, tribe_id=int(id))) for id in self.selected_tribes]
 
         embed.add_field(
             name="Tribe(s) Attending",
@@ -1033,4 +1073,31 @@ class TribalCouncilOptions(View):
 
     async def select_callback(self, interaction: discord.Interaction):
         self.selected_tribes = set(self.tribe_select.values)
-        await self.update_embed(interaction=interaction)
\ No newline at end of file
+        await self.update_embed(interaction=interaction)
+
+PERSISTENT_VIEWS: dict[str, type[PersistentView]] = {
+    view.prefix: view for view in (PlayerSetupButtons, TribeSetupButtons, ServerSetupButtons, SeasonSetupButtons)
+}
+
+class PersistentButton(discord.ui.DynamicItem[Button], template=r"(?P<prefix>[a-z]+):(?P<key>\d+):(?P<action>\w+)"):
+    """Routes a click on any PersistentView button, including ones sent before a restart."""
+
+    def __init__(self, prefix: str, key: int, action: str):
+        super().__init__(Button(custom_id=f"{prefix}:{key}:{action}"))
+        self.prefix = prefix
+        self.key = key
+        self.action = action
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        return cls(match["prefix"], int(match["key"]), match["action"])
+
+    async def callback(self, interaction: discord.Interaction):
+        view_type = PERSISTENT_VIEWS.get(self.prefix)
+        # These clicks skip View's own dispatch, so they are timed here.
+        async with metrics.track(f"{view_type.__name__ if view_type else self.prefix}.{self.action}", interaction):
+            view = await view_type.rehydrate(interaction.guild, self.key) if view_type else None
+            if view is None:
+                await interaction.response.send_message("This player or tribe no longer exists.", ephemeral=True)
+                return
+            await view.dispatch(self.item.custom_id, interaction)
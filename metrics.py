@@ -0,0 +1,304 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable
+import aiohttp
+import discord
+import config
+import scheduler
+
+logger = logging.getLogger("metrics")
+
+PREFIX = "sharkvivor"
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Samples():
+    """Count and sum of one timing, plus its most recent values for quantiles.
+
+    Quantiles are over the last config.METRICS_SAMPLES values only, so they
+    follow the bot's current behaviour rather than its whole uptime.
+    """
+
+    def __init__(self, size: int):
+        self.recent: deque[float] = deque(maxlen=size)
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value: float):
+        self.recent.append(value)
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+Labels = tuple[tuple[str, str], ...]
+
+# (metric, labels) -> samples / count
+_samples: dict[tuple[str, Labels], Samples] = {}
+_counters: Counter[tuple[str, Labels]] = Counter()
+
+def _labels(labels: dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def observe(metric: str, value: float, **labels):
+    key = (metric, _labels(labels))
+    samples = _samples.get(key)
+    if samples is None:
+        samples = _samples[key] = Samples(config.METRICS_SAMPLES)
+    samples.add(value)
+
+def inc(metric: str, amount: float = 1, **labels):
+    _counters[(metric, _labels(labels))] += amount
+
+class Span():
+    """What one command or button click has cost so far."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.acked: float | None = None
+        self.db_statements = 0
+        self.db_time = 0.0
+        self.api = scheduler.measure()
+
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("metrics_span", default=None)
+
+# interaction id -> span of the handler still running for it. The HTTP trace
+# uses it to see when the interaction was acknowledged.
+_open_spans: dict[int, Span] = {}
+
+@asynccontextmanager
+async def track(name: str, interaction: discord.Interaction):
+    span = Span(name)
+    token = _current.set(span)
+    _open_spans[interaction.id] = span
+    status = "ok"
+    try:
+        async with span.api:
+            yield span
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        _current.reset(token)
+        _open_spans.pop(interaction.id, None)
+        observe("handler_seconds", time.perf_counter() - span.started, handler=name)
+        if span.acked is not None:
+            observe("handler_ack_seconds", span.acked - span.started, handler=name)
+        observe("handler_db_seconds", span.db_time, handler=name)
+        observe("handler_db_statements", span.db_statements, handler=name)
+        # Mutations queued through the scheduler; interaction responses are not included.
+        observe("handler_api_calls", span.api.calls, handler=name)
+        observe("handler_api_seconds", span.api.api_time, handler=name)
+        inc("handler_calls_total", handler=name, status=status)
+
+def instrument(callback: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Wrap an app command callback so every run is tracked under its name."""
+    # functools.wraps keeps the signature and the app_commands decorator
+    # attributes (autocomplete, permissions) discord.py reads off the callback.
+    @functools.wraps(callback)
+    async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+        async with track(callback.__name__, interaction):
+            return await callback(interaction, *args, **kwargs)
+    return wrapper
+
+def _item_name(view: discord.ui.View, item: discord.ui.Item) -> str:
+    # Decorated buttons wrap the method in an object that keeps it as .callback.
+    callback = getattr(item.callback, "callback", item.callback)
+    return f"{type(view).__name__}.{getattr(callback, '__name__', None) or item.custom_id}"
+
+def install_views():
+    """Track every View item callback.
+
+    discord.py has no public hook around item callbacks, so this wraps
+    View._scheduled_task, which runs each of them. If a discord.py upgrade
+    removes it, view callbacks go untracked and a warning is logged.
+    """
+    original = getattr(discord.ui.View, "_scheduled_task", None)
+    if (original is None or not asyncio.iscoroutinefunction(original)
+            or list(inspect.signature(original).parameters) != ["self", "item", "interaction"]):
+        logger.warning(f"discord.ui.View._scheduled_task not found in discord.py {discord.__version__}; view callbacks will not be tracked.")
+        return
+    if getattr(original, "__wrapped__", None) is not None:
+        return
+
+    @functools.wraps(original)
+    async def _scheduled_task(self, item, interaction):
+        async with track(_item_name(self, item), interaction):
+            await original(self, item, interaction)
+
+    discord.ui.View._scheduled_task = _scheduled_task
+    logger.info("Tracking view callbacks through View._scheduled_task.")
+
+def record_query(name: str, seconds: float, statements: int):
+    observe("db_query_seconds", seconds, query=name)
+    inc("db_statements_total", statements, query=name)
+    span = _current.get()
+    if span is not None:
+        span.db_time += seconds
+        span.db_statements += statements
+
+_SNOWFLAKE = re.compile(r"/\d{15,21}(?=/|$)")
+_TOKEN = re.compile(r"/(interactions|webhooks)/[^/]+/[^/]+")
+_INTERACTION_CALLBACK = re.compile(r"/interactions/(\d+)/[^/]+/callback$")
+
+def _route(method: str, path: str) -> str:
+    path = re.sub(r"^/api/v\d+", "", path)
+    path = _SNOWFLAKE.sub("/{id}", path)
+    path = _TOKEN.sub(r"/\1/{id}/{token}", path)
+    return f"{method} {path}"
+
+async def _on_request_start(session, context, params: aiohttp.TraceRequestStartParams):
+    context.started = time.perf_counter()
+
+async def _on_request_end(session, context, params: aiohttp.TraceRequestEndParams):
+    now = time.perf_counter()
+    route = _route(params.method, params.url.path)
+    status = params.response.status
+    inc("discord_http_requests_total", route=route, status=status)
+    if status == 429:
+        inc("discord_http_rate_limited_total", route=route)
+    observe("discord_http_seconds", now - context.started, route=route)
+
+    match = _INTERACTION_CALLBACK.search(params.url.path)
+    if match:
+        span = _open_spans.get(int(match[1]))
+        if span is not None and span.acked is None:
+            span.acked = now
+
+async def _on_request_exception(session, context, params: aiohttp.TraceRequestExceptionParams):
+    inc("discord_http_requests_total", route=_route(params.method, params.url.path), status="error")
+
+def http_trace() -> aiohttp.TraceConfig:
+    """Counts and times every Discord HTTP request, 429s included (discord.py
+    retries those itself, so each attempt shows up)."""
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_request_end.append(_on_request_end)
+    trace.on_request_exception.append(_on_request_exception)
+    return trace
+
+def _gauges() -> dict[str, list[tuple[Labels, float]]]:
+    # Imported here: the database package imports this module.
+    from database import cache
+
+    gauges: dict[str, list[tuple[Labels, float]]] = {}
+    for guild_id, values in scheduler.get_metrics().items():
+        for key, value in values.items():
+            gauges.setdefault(f"scheduler_{key}", []).append(((("guild", str(guild_id)),), value))
+    for key, value in cache.get_stats().items():
+        gauges.setdefault(f"cache_{key}", []).append(((), value))
+    return gauges
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+def render() -> str:
+    """All metrics in the Prometheus text format."""
+    lines = []
+
+    by_metric: dict[str, list[tuple[Labels, Samples]]] = {}
+    for (metric, labels), samples in _samples.items():
+        by_metric.setdefault(metric, []).append((labels, samples))
+    for metric, series in sorted(by_metric.items()):
+        name = f"{PREFIX}_{metric}"
+        lines.append(f"# TYPE {name} summary")
+        for labels, samples in series:
+            for q in QUANTILES:
+                lines.append(f"{name}{_format_labels(labels + (('quantile', str(q)),))} {samples.quantile(q)}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {samples.sum}")
+            lines.append(f"{name}_count{_format_labels(labels)} {samples.count}")
+
+    counters: dict[str, list[tuple[Labels, float]]] = {}
+    for (metric, labels), value in _counters.items():
+        counters.setdefault(metric, []).append((labels, value))
+    for metric, series in sorted(counters.items()):
+        name = f"{PREFIX}_{metric}"
+        lines.append(f"# TYPE {name} counter")
+        lines.extend(f"{name}{_format_labels(labels)} {value}" for labels, value in series)
+
+    for metric, series in sorted(_gauges().items()):
+        name = f"{PREFIX}_{metric}"
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{_format_labels(labels)} {value}" for labels, value in series)
+
+    return "\n".join(lines) + "\n"
+
+async def _handle_scrape(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        request = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+
+        if request.split()[1:2] == [b"/metrics"]:
+            status, body = "200 OK", render().encode()
+        else:
+            status, body = "404 Not Found", b"Not found\n"
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(port: int, host: str = "127.0.0.1") -> asyncio.Server:
+    """Serve render() at http://host:port/metrics."""
+    server = await asyncio.start_server(_handle_scrape, host, port)
+    print(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
+
+def _series(metric: str, label: str) -> dict[str, Samples]:
+    return {dict(labels)[label]: samples for (name, labels), samples in _samples.items() if name == metric}
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}"
+
+def report(limit: int = 12) -> str:
+    """A short plain-text summary for /botstats. Times are in milliseconds;
+    api95 is the 95th percentile of API calls per run."""
+    handlers = _series("handler_seconds", "handler")
+    acks = _series("handler_ack_seconds", "handler")
+    db = _series("handler_db_seconds", "handler")
+    api = _series("handler_api_calls", "handler")
+
+    lines = [f"{'handler':<32} {'n':>5} {'p50':>6} {'p95':>6} {'p99':>6} {'ack95':>6} {'db95':>6} {'api95':>6}"]
+    for name, samples in sorted(handlers.items(), key=lambda item: -item[1].count)[:limit]:
+        ack = acks.get(name)
+        lines.append(
+            f"{name[-32:]:<32} {samples.count:>5} {_ms(samples.quantile(0.5)):>6} {_ms(samples.quantile(0.95)):>6} "
+            f"{_ms(samples.quantile(0.99)):>6} {_ms(ack.quantile(0.95)) if ack else '-':>6} {_ms(db[name].quantile(0.95)) if name in db else '-':>6} "
+            f"{(f'{api[name].quantile(0.95):.0f}' if name in api else '-'):>6}"
+        )
+
+    requests = sum(value for (metric, _), value in _counters.items() if metric == "discord_http_requests_total")
+    limited = sum(value for (metric, _), value in _counters.items() if metric == "discord_http_rate_limited_total")
+    lines.append("")
+    lines.append(f"Discord HTTP: {requests:.0f} requests, {limited:.0f} rate limited")
+    routes = _series("discord_http_seconds", "route")
+    for route, samples in sorted(routes.items(), key=lambda item: -item[1].count)[:5]:
+        lines.append(f"  {route[:44]:<44} {samples.count:>5} p95 {_ms(samples.quantile(0.95))}")
+
+    for guild_id, values in scheduler.get_metrics().items():
+        lines.append(f"Scheduler {guild_id}: {values['completed']} done, {values['queue_depth']} queued, {values['coalesced']} coalesced")
+
+    return "\n".join(lines)
@@ -1,20 +1,79 @@
-from database import queries
+import sqlite3
+from database import async_queries
 import discord
+import artifacts
+import guild_index
+from tribe import Tribe
 
 class Player():
+    """A season's player. Immutable; use replace() to get a changed copy."""
+
+    __slots__ = ("player_id", "display_name", "user_id", "season_id", "tribe_id",
+                 "discord_id", "tribe", "_channel_slug", "_one_on_one_slug")
+
     def __init__(
             self,
             player_id: int,
             display_name: str,
             user_id: int,
             season_id: int,
-            tribe_id: int
+            tribe_id: int,
+            discord_id: int | None = None,
+            tribe: Tribe | None = None
     ):
-        self.player_id = player_id
-        self.display_name = display_name
-        self.user_id = user_id
-        self.season_id = season_id
-        self.tribe_id = tribe_id
+        set_field = object.__setattr__
+        set_field(self, "player_id", player_id)
+        set_field(self, "display_name", display_name)
+        set_field(self, "user_id", user_id)
+        set_field(self, "season_id", season_id)
+        set_field(self, "tribe_id", tribe_id)
+        # Filled in when the player comes from a joined roster query.
+        set_field(self, "discord_id", discord_id)
+        set_field(self, "tribe", tribe)
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row, discord_id: int | None = None, tribe: Tribe | None = None) -> "Player":
+        """Build from a players row (SELECT * FROM players or p.*)."""
+        return cls(row["id"], row["display_name"], row["user_id"], row["season_id"], row["tribe_id"], discord_id, tribe)
+
+    # The slugs are derived on first use and kept, so loading a roster does not
+    # pay for strings nobody reads.
+    @property
+    def channel_slug(self) -> str:
+        """Stem of the -submissions and -confessionals channel names."""
+        try:
+            return self._channel_slug
+        except AttributeError:
+            object.__setattr__(self, "_channel_slug", self.display_name.strip().lower().replace(" ", "-"))
+            return self._channel_slug
+
+    @property
+    def one_on_one_slug(self) -> str:
+        """This player's half of a 1-1 channel name."""
+        try:
+            return self._one_on_one_slug
+        except AttributeError:
+            object.__setattr__(self, "_one_on_one_slug", self.display_name.strip().replace(" ", "").lower())
+            return self._one_on_one_slug
+
+    def replace(self, **changes) -> "Player":
+        fields = {
+            "player_id": self.player_id,
+            "display_name": self.display_name,
+            "user_id": self.user_id,
+            "season_id": self.season_id,
+            "tribe_id": self.tribe_id,
+            "discord_id": self.discord_id,
+            "tribe": self.tribe,
+        }
+        fields.update(changes)
+        return Player(**fields)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Player is immutable, use replace() to change {name}.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Player is immutable, cannot delete {name}.")
 
     def __repr__(self):
         return f"{self.display_name}"
@@ -27,21 +86,25 @@ class Player():
     def __hash__(self):
         return hash(self.player_id)
 
-    def get_discord_id(self):
-        return queries.get_user_discord_id(self.user_id)
+    async def get_discord_id(self):
+        if self.discord_id is not None:
+            return self.discord_id
+        return await async_queries.get_user_discord_id(self.user_id)
     
+    def role(self, guild: discord.Guild) -> discord.Role | None:
+        return artifacts.get_cached(guild, artifacts.PLAYER_ROLE, self.player_id) or guild_index.get_role(guild, self.display_name)
+
     def mention(self, guild: discord.Guild):
-        player_role = discord.utils.get(guild.roles, name=self.display_name)
+        player_role = self.role(guild)
         if player_role:
             return player_role.mention
         else:
             return ""
     
     async def get_discord_user(self, guild: discord.Guild) -> discord.Member:
-        discord_id = self.get_discord_id()
+        discord_id = await self.get_discord_id()
         try:
             member = await guild.fetch_member(discord_id)
             return member
         except discord.NotFound:
             return None
-        
\ No newline at end of file
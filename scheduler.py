@@ -0,0 +1,251 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable
+import discord
+import config
+
+# Priority lanes. Lower runs first, so a host clicking a button is never stuck
+# behind a bulk setup job.
+INTERACTIVE = 0
+BULK = 1
+
+class _Job():
+    def __init__(self, factory: Callable[[], Awaitable[Any]], priority: int, bucket: Any):
+        self.factory = factory
+        self.priority = priority
+        self.bucket = bucket
+        self.changes: dict | None = None
+        self.submitted_at = time.perf_counter()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        # The measure() blocks the job was submitted from, innermost last.
+        self.measures: tuple[measure, ...] = _measures.get()
+        # In the ready queue / taken by a worker. A job can be queued more than
+        # once after a priority raise; the stale entries are skipped.
+        self.ready = False
+        self.dispatched = False
+
+class GuildScheduler():
+    """Runs one guild's Discord mutations.
+
+    Jobs are taken in priority order by a fixed number of workers. Jobs in the
+    same rate-limit bucket (e.g. the same channel or role) never run at the
+    same time, while unrelated ones can. Only one job per bucket is ever in
+    the ready queue; the rest are held back per bucket, in priority order, so
+    a worker never sits idle waiting for a busy bucket. Edits to an object
+    that is still waiting to be edited are merged into the queued edit.
+    """
+
+    def __init__(self, guild_id: int, concurrency: int):
+        self.guild_id = guild_id
+        self.concurrency = concurrency
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.held: dict[Any, list[tuple[int, int, _Job]]] = {}
+        self.active_buckets: set[Any] = set()
+        self.pending_edits: dict[Any, _Job] = {}
+        self.workers: list[asyncio.Task] = []
+        self.counter = itertools.count()
+
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+        # API calls by what they touched: "Role", "TextChannel", "Member",
+        # "channel_positions", "guild" (creates and deletes), ...
+        self.calls: Counter[str] = Counter()
+
+    def _ensure_workers(self):
+        if not self.workers:
+            self.workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    def _entry(self, job: _Job) -> tuple[int, int, _Job]:
+        return job.priority, next(self.counter), job
+
+    def _make_ready(self, job: _Job):
+        job.ready = True
+        self.queue.put_nowait(self._entry(job))
+
+    def _enqueue(self, job: _Job) -> asyncio.Future:
+        self._ensure_workers()
+        if job.bucket in self.active_buckets:
+            heapq.heappush(self.held.setdefault(job.bucket, []), self._entry(job))
+        else:
+            self.active_buckets.add(job.bucket)
+            self._make_ready(job)
+        return job.future
+
+    def _release(self, bucket: Any):
+        """Hand the bucket to its next held job, or free it."""
+        held = self.held.get(bucket)
+        while held:
+            _, _, job = heapq.heappop(held)
+            if not job.ready:
+                self._make_ready(job)
+                return
+        self.held.pop(bucket, None)
+        self.active_buckets.discard(bucket)
+
+    def _raise_priority(self, job: _Job, priority: int):
+        if priority >= job.priority or job.dispatched:
+            return
+        job.priority = priority
+        if job.ready:
+            self.queue.put_nowait(self._entry(job))
+        else:
+            heapq.heappush(self.held[job.bucket], self._entry(job))
+
+    def _cancel_queued(self):
+        jobs = [job for held in self.held.values() for _, _, job in held]
+        while not self.queue.empty():
+            jobs.append(self.queue.get_nowait()[2])
+            self.queue.task_done()
+        for job in jobs:
+            job.future.cancel()
+        # A queue is bound to the loop it was first used on.
+        self.queue = asyncio.PriorityQueue()
+        self.held.clear()
+        self.active_buckets.clear()
+        self.pending_edits.clear()
+
+    async def _worker(self):
+        try:
+            while True:
+                _, _, job = await self.queue.get()
+                self.queue.task_done()
+                if job.dispatched:
+                    continue
+                job.dispatched = True
+                if job.changes is not None and self.pending_edits.get(job.bucket) is job:
+                    del self.pending_edits[job.bucket]
+
+                wait = time.perf_counter() - job.submitted_at
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+                started = time.perf_counter()
+                try:
+                    result = await job.factory()
+                except asyncio.CancelledError:
+                    job.future.cancel()
+                    if asyncio.current_task().cancelling():
+                        raise
+                    self.failed += 1
+                except Exception as e:
+                    self.failed += 1
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                else:
+                    if not job.future.done():
+                        job.future.set_result(result)
+                finally:
+                    # Includes time discord.py spent sleeping out 429s for this call.
+                    run = time.perf_counter() - started
+                    self.total_run += run
+                    self._release(job.bucket)
+
+                self.calls[job.bucket[0] if isinstance(job.bucket, tuple) else "other"] += 1
+                self.completed += 1
+                for cost in job.measures:
+                    cost.calls += 1
+                    cost.api_time += run
+        finally:
+            # Shutting down: nothing is left to run what is still queued, so
+            # fail it rather than leave its callers waiting forever.
+            self.workers.remove(asyncio.current_task())
+            if not self.workers:
+                self._cancel_queued()
+
+    async def close(self):
+        """Stop the workers and cancel every job that has not finished."""
+        workers = list(self.workers)
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def submit(self, factory: Callable[[], Awaitable[Any]], priority: int = BULK, bucket: Any = None) -> asyncio.Future:
+        return self._enqueue(_Job(factory, priority, bucket if bucket is not None else ("guild", self.guild_id)))
+
+    def edit(self, target, priority: int = BULK, **changes) -> asyncio.Future:
+        bucket = (type(target).__name__, target.id)
+        pending = self.pending_edits.get(bucket)
+        if pending is not None:
+            pending.changes.update(changes)
+            self._raise_priority(pending, priority)
+            self.coalesced += 1
+            return pending.future
+
+        job = _Job(None, priority, bucket)
+        job.changes = dict(changes)
+        job.factory = lambda: target.edit(**job.changes)
+        self.pending_edits[bucket] = job
+        return self._enqueue(job)
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "queue_depth": self.queue.qsize() + sum(len(held) for held in self.held.values()),
+            "completed": self.completed,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "avg_wait": self.total_wait / self.completed if self.completed else 0.0,
+            "max_wait": self.max_wait,
+            "avg_run": self.total_run / self.completed if self.completed else 0.0,
+            **{f"calls_{kind}": count for kind, count in self.calls.items()},
+        }
+
+_schedulers: dict[int, GuildScheduler] = {}
+
+def get_scheduler(guild: discord.Guild) -> GuildScheduler:
+    scheduler = _schedulers.get(guild.id)
+    if scheduler is None:
+        scheduler = GuildScheduler(guild.id, config.MUTATION_CONCURRENCY)
+        _schedulers[guild.id] = scheduler
+    return scheduler
+
+def submit(guild: discord.Guild, factory: Callable[[], Awaitable[Any]], priority: int = BULK, bucket: Any = None) -> asyncio.Future:
+    """Queue a mutation and return a future for its result."""
+    return get_scheduler(guild).submit(factory, priority=priority, bucket=bucket)
+
+def edit(target, priority: int = BULK, **changes) -> asyncio.Future:
+    """Queue target.edit(**changes), merging with an edit of target that has not started yet."""
+    return get_scheduler(target.guild).edit(target, priority=priority, **changes)
+
+def get_metrics() -> dict[int, dict[str, float]]:
+    return {guild_id: scheduler.metrics() for guild_id, scheduler in _schedulers.items()}
+
+class measure():
+    """Counts the API calls a block of code makes.
+
+        async with scheduler.measure() as cost:
+            await arrange_player_roles(guild)
+        str(cost)  # e.g. "37 API calls, 4.21s"
+
+    Jobs are attributed to the measure blocks they were submitted from
+    (tasks started inside the block count too), so calls other handlers make
+    at the same time are not included. Calls are counted when they finish, so
+    await everything the block queued before it exits.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.api_time = 0.0
+        self.wall_time = 0.0
+
+    async def __aenter__(self) -> "measure":
+        self._token = _measures.set((*_measures.get(), self))
+        self._started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, *exc):
+        _measures.reset(self._token)
+        self.wall_time = time.perf_counter() - self._started
+        return False
+
+    def __str__(self):
+        return f"{self.calls} API calls, {self.wall_time:.2f}s"
+
+_measures: contextvars.ContextVar[tuple[measure, ...]] = contextvars.ContextVar("scheduler_measures", default=())
@@ -0,0 +1,81 @@
+import asyncio
+import time
+import discord
+from discord.ext import commands
+import config
+from database import async_queries
+
+# on_ready fires again after every reconnect. If a sync is still running when
+# that happens, the new call is skipped instead of starting a second one.
+_startup_lock = asyncio.Lock()
+
+async def fetch_guild_users(guild: discord.Guild) -> list[tuple[int, str]]:
+    if guild.chunked:
+        members = guild.members
+    else:
+        members = [member async for member in guild.fetch_members(limit=None)]
+
+    return [(member.id, str(member)) for member in members if not member.bot]
+
+async def _fetch_worker(guild: discord.Guild, semaphore: asyncio.Semaphore, queue: asyncio.Queue):
+    async with semaphore:
+        print(f"Syncing members from guild: {guild.name}")
+        try:
+            users = await fetch_guild_users(guild)
+        except discord.HTTPException as e:
+            print(f"Failed to fetch members from {guild.name}: {e}")
+            return
+
+    await queue.put(users)
+
+async def _db_writer(queue: asyncio.Queue, totals: dict[str, float]):
+    # Single consumer, so member writes reach the database one guild at a time.
+    while True:
+        users = await queue.get()
+        if users is None:
+            return
+
+        start = time.perf_counter()
+        inserted, updated = await async_queries.add_users_bulk(users)
+        totals["db_write"] += time.perf_counter() - start
+        totals["inserted"] += inserted
+        totals["updated"] += updated
+
+async def run_startup(bot: commands.Bot):
+    if _startup_lock.locked():
+        print("Startup sync already running, skipping.")
+        return
+
+    async with _startup_lock:
+        start = time.perf_counter()
+        try:
+            synced = await bot.tree.sync()
+            print(f"Synced {len(synced)} commands.")
+        except Exception as e:
+            print(f"Failed to sync commands: {e}")
+        tree_sync_time = time.perf_counter() - start
+
+        await async_queries.setup_tables()
+
+        totals = {"db_write": 0.0, "inserted": 0, "updated": 0}
+        queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(config.STARTUP_FETCH_CONCURRENCY)
+        writer = asyncio.create_task(_db_writer(queue, totals))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_fetch_worker(guild, semaphore, queue) for guild in bot.guilds))
+        member_fetch_time = time.perf_counter() - start
+
+        await queue.put(None)
+        await writer
+
+        print(f"Finished syncing users: {totals['inserted']} new, {totals['updated']} updated.")
+        print(
+            f"Startup timings: tree sync {tree_sync_time:.2f}s, "
+            f"member fetch {member_fetch_time:.2f}s, "
+            f"DB write {totals['db_write']:.2f}s."
+        )
+
+async def sync_user(user: discord.abc.User):
+    if not user.bot:
+        await async_queries.add_user(user.id, str(user))
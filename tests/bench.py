@@ -0,0 +1,23 @@
+"""Timing helpers for benchmarks that compare a baseline with its replacement.
+
+Each comparison is kept in RESULTS and printed at the end of the run.
+Assertions on timings only check gaps wide enough not to flake.
+"""
+import time
+
+RESULTS: list[dict] = []
+
+def best_of(fn, number: int = 1, repeat: int = 5) -> float:
+    """Seconds per call of fn: the best mean over repeat rounds of number calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def record(benchmark: str, case: str, baseline: float, new: float) -> dict:
+    row = {"benchmark": benchmark, "case": case, "baseline": baseline, "new": new}
+    RESULTS.append(row)
+    return row
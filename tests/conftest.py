@@ -0,0 +1,78 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Same import order as the bot: database.cache and player import each other.
+from database import async_queries, cache, connection
+
+def _close_connections():
+    connection.close_connection()
+    async_queries._executor.submit(connection.close_connection).result()
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh database with every table and migration. Yields this thread's
+    connection; async_queries use their own thread's connection to the same file."""
+    _close_connections()
+    original_path = connection.DB_PATH
+    connection.DB_PATH = str(tmp_path / "test.db")
+    cache.clear()
+    connection.setup_tables()
+    try:
+        yield connection.get_connection()
+    finally:
+        _close_connections()
+        connection.DB_PATH = original_path
+        cache.clear()
+
+class StatementLog():
+    """Collects the SQL run on this thread's connection inside a with block."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.statements: list[str] = []
+
+    def __enter__(self):
+        self.statements.clear()
+        # Replaces the statement counter for the duration of the block.
+        self.conn.set_trace_callback(self._trace)
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.set_trace_callback(connection._count_statement)
+        return False
+
+    def _trace(self, statement: str):
+        # get_connection() health-checks the connection on every borrow.
+        if statement != "SELECT 1":
+            self.statements.append(statement)
+
+    def __len__(self):
+        return len(self.statements)
+
+@pytest.fixture
+def statements(db):
+    return StatementLog(db)
+
+def pytest_terminal_summary(terminalreporter):
+    from bench import RESULTS
+    from fake_discord import REPORT
+    if REPORT:
+        terminalreporter.section("setup command benchmarks")
+        terminalreporter.write_line(f"{'season':>8} {'operation':<30} {'api':>5} {'queued':>6} {'429':>4} {'wall ms':>8} {'db':>5}")
+        for row in REPORT:
+            players, tribes = row["season"]
+            terminalreporter.write_line(
+                f"{players:>3}p/{tribes}t {row['operation']:<30} {row['api_calls']:>5} {row['scheduled']:>6} "
+                f"{row['rate_limited']:>4} {row['wall'] * 1000:>8.1f} {row['db_statements']:>5}"
+            )
+    if RESULTS:
+        terminalreporter.section("baseline comparisons")
+        terminalreporter.write_line(f"{'benchmark':<28} {'case':<24} {'baseline us':>12} {'new us':>10} {'speedup':>8}")
+        for row in RESULTS:
+            terminalreporter.write_line(
+                f"{row['benchmark']:<28} {row['case']:<24} {row['baseline'] * 1e6:>12.1f} "
+                f"{row['new'] * 1e6:>10.1f} {row['baseline'] / row['new']:>7.1f}x"
+            )
@@ -0,0 +1,488 @@
+"""An in-process stand-in for the parts of a Discord guild the bot mutates.
+
+Roles, channels and members subclass the discord.py models, so isinstance
+checks (guild_index, Role comparisons) behave as they do against a live
+guild; only what discord.py would derive from its connection state is
+replaced with plain attributes. Every method that would hit the HTTP API
+goes through FakeAPI, which adds latency, emulates per-route rate limits
+with 429s and counts the calls. Creates, edits and deletes patch
+guild_index the way the gateway events do in bot.py.
+"""
+import asyncio
+import itertools
+import time
+from collections import Counter, deque
+from types import SimpleNamespace
+import discord
+import guild_index
+
+# Spaced like real snowflakes, so Hashable's id >> 22 hash stays unique.
+_ids = itertools.count(1 << 42, 1 << 22)
+
+def snowflake() -> int:
+    return next(_ids)
+
+class FakeAPI():
+    """Counts, delays and rate limits the calls made against a fake guild.
+
+    limits maps a route to (requests, per seconds) for each major id (guild
+    or channel), like Discord's per-route buckets. A call over the limit
+    gets a 429 and, like discord.py, waits out retry_after and resends.
+    """
+
+    def __init__(self, latency: float = 0.0, limits: dict[str, tuple[int, float]] | None = None):
+        self.latency = latency
+        self.limits = limits or {}
+        self.calls: Counter[str] = Counter()
+        self.rate_limited: Counter[str] = Counter()
+        self.failures: dict[tuple[str, int], Exception] = {}
+        self._windows: dict[tuple[str, int], deque[float]] = {}
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def fail(self, route: str, major: int, error: Exception):
+        """Make the next call to route for major raise error."""
+        self.failures[(route, major)] = error
+
+    async def request(self, route: str, major: int):
+        limit = self.limits.get(route)
+        if limit is not None:
+            requests, per = limit
+            window = self._windows.setdefault((route, major), deque())
+            while True:
+                now = time.perf_counter()
+                while window and now - window[0] >= per:
+                    window.popleft()
+                if len(window) < requests:
+                    break
+                self.rate_limited[route] += 1
+                await asyncio.sleep(per - (now - window[0]))
+            window.append(now)
+
+        self.calls[route] += 1
+        await asyncio.sleep(self.latency)
+        error = self.failures.pop((route, major), None)
+        if error is not None:
+            raise error
+
+def _copy_overwrites(overwrites) -> dict:
+    return {target: discord.PermissionOverwrite.from_pair(*overwrite.pair()) for target, overwrite in (overwrites or {}).items()}
+
+def _color_value(color) -> int:
+    return color.value if isinstance(color, discord.Colour) else int(color or 0)
+
+class FakeRole(discord.Role):
+    def __init__(self, guild: "FakeGuild", name: str, position: int, color: int = 0, role_id: int | None = None):
+        self.id = role_id if role_id is not None else snowflake()
+        self.guild = guild
+        self.name = name
+        self.position = position
+        self._colour = color
+        self.managed = False
+        self.hoist = False
+        self.mentionable = False
+
+    def __repr__(self):
+        return f"<FakeRole {self.name!r} position={self.position}>"
+
+    async def edit(self, *, name: str | None = None, color=None, colour=None, **kwargs):
+        await self.guild.api.request("PATCH /guilds/{guild_id}/roles/{role_id}", self.guild.id)
+        guild_index.remove(self)
+        if name is not None:
+            self.name = name
+        if (color or colour) is not None:
+            self._colour = _color_value(color or colour)
+        guild_index.add(self)
+        return self
+
+    async def delete(self, *, reason: str | None = None):
+        await self.guild.api.request("DELETE /guilds/{guild_id}/roles/{role_id}", self.guild.id)
+        self.guild._remove_role(self)
+
+class _FakeChannel():
+    """What the fake text channels and categories share."""
+
+    # Plain attributes in place of discord.py's properties.
+    overwrites = None
+
+    def _setup(self, guild: "FakeGuild", name: str, position: int, category_id: int | None, overwrites: dict | None):
+        self.id = snowflake()
+        self.guild = guild
+        self.name = name
+        self.position = position
+        self.category_id = category_id
+        self.nsfw = False
+        self.overwrites = _copy_overwrites(overwrites)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name!r} position={self.position}>"
+
+    def overwrites_for(self, obj) -> discord.PermissionOverwrite:
+        overwrite = self.overwrites.get(obj)
+        if overwrite is None:
+            return discord.PermissionOverwrite()
+        return discord.PermissionOverwrite.from_pair(*overwrite.pair())
+
+    def _siblings(self) -> list:
+        return sorted(
+            (c for c in self.guild.channels if type(c) is type(self) and c.category_id == self.category_id),
+            key=lambda c: (c.position, c.id),
+        )
+
+    async def edit(self, *, name: str | None = None, category=discord.utils.MISSING, overwrites=None, position: int | None = None, **kwargs):
+        await self.guild.api.request("PATCH /channels/{channel_id}", self.id)
+        guild_index.remove(self)
+        if name is not None:
+            self.name = name
+        if category is not discord.utils.MISSING:
+            new_category_id = category.id if category is not None else None
+            if new_category_id != self.category_id:
+                self.category_id = new_category_id
+                # Discord appends a channel moved without a position to its new parent.
+                self.position = max((c.position + 1 for c in self._siblings() if c is not self), default=0)
+        if overwrites is not None:
+            self.overwrites = _copy_overwrites(overwrites)
+        if position is not None:
+            self.position = position
+        guild_index.add(self)
+        return self
+
+    async def move(self, *, beginning: bool = False, end: bool = False, before=None, after=None, **kwargs):
+        # discord.py sends the whole reordered sibling list as one bulk update.
+        siblings = [c for c in self._siblings() if c is not self]
+        if beginning:
+            index = 0
+        elif end:
+            index = len(siblings)
+        elif before is not None:
+            index = siblings.index(before)
+        else:
+            index = siblings.index(after) + 1
+        siblings.insert(index, self)
+        payload = [{"id": channel.id, "position": position} for position, channel in enumerate(siblings)]
+        await self.guild._state.http.bulk_channel_update(self.guild.id, payload)
+
+    async def delete(self, *, reason: str | None = None):
+        await self.guild.api.request("DELETE /channels/{channel_id}", self.id)
+        self.guild._remove_channel(self)
+
+class FakeCategory(_FakeChannel, discord.CategoryChannel):
+    def __init__(self, guild: "FakeGuild", name: str, position: int, overwrites: dict | None = None):
+        self._setup(guild, name, position, None, overwrites)
+
+class FakeTextChannel(_FakeChannel, discord.TextChannel):
+    def __init__(self, guild: "FakeGuild", name: str, position: int, category: FakeCategory | None = None, overwrites: dict | None = None):
+        self._setup(guild, name, position, category.id if category else None, overwrites)
+        self.topic = None
+        self.slowmode_delay = 0
+        self.last_message_id = None
+
+class FakeMember(discord.Member):
+    # Plain attributes in place of the properties Member reads off its user.
+    id = None
+    name = None
+    bot = False
+    roles = None
+
+    def __init__(self, guild: "FakeGuild", name: str, member_id: int | None = None, roles: list[FakeRole] | None = None):
+        self.id = member_id if member_id is not None else snowflake()
+        self.guild = guild
+        self.name = name
+        self.nick = None
+        self.roles = [guild.default_role, *(roles or [])]
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+    def __repr__(self):
+        return f"<FakeMember {self.name!r}>"
+
+    @property
+    def top_role(self) -> FakeRole:
+        return max(self.roles, key=lambda r: (r.position, -r.id))
+
+    async def add_roles(self, *roles: FakeRole, reason: str | None = None, atomic: bool = True):
+        # One PUT per role, as discord.py sends with atomic=True.
+        for role in roles:
+            await self.guild.api.request("PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}", self.guild.id)
+            if role not in self.roles:
+                self.roles.append(role)
+
+    async def remove_roles(self, *roles: FakeRole, reason: str | None = None, atomic: bool = True):
+        for role in roles:
+            await self.guild.api.request("DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}", self.guild.id)
+            if role in self.roles:
+                self.roles.remove(role)
+
+    async def edit(self, *, roles: list[FakeRole] | None = None, **kwargs):
+        await self.guild.api.request("PATCH /guilds/{guild_id}/members/{user_id}", self.guild.id)
+        if roles is not None:
+            self.roles = [self.guild.default_role, *(role for role in roles if role is not None)]
+
+class _FakeHTTP():
+    def __init__(self, guild: "FakeGuild"):
+        self.guild = guild
+
+    async def bulk_channel_update(self, guild_id: int, data: list[dict], *, reason: str | None = None):
+        await self.guild.api.request("PATCH /guilds/{guild_id}/channels", guild_id)
+        for entry in data:
+            channel = self.guild.get_channel(entry["id"])
+            guild_index.remove(channel)
+            if "parent_id" in entry:
+                channel.category_id = entry["parent_id"]
+            if "position" in entry:
+                channel.position = entry["position"]
+            guild_index.add(channel)
+
+class FakeGuild():
+    """A guild with @everyone, the bot's member and role, and nothing else.
+
+    The bot's role sits on top, so every role the tests create is below it.
+    """
+
+    def __init__(self, name: str = "Fake Guild", api: FakeAPI | None = None):
+        self.id = snowflake()
+        self.name = name
+        self.api = api or FakeAPI()
+        self.chunked = True
+        self._state = SimpleNamespace(http=_FakeHTTP(self))
+        self._roles: dict[int, FakeRole] = {}
+        self._channels: dict[int, _FakeChannel] = {}
+        self._members: dict[int, FakeMember] = {}
+
+        self._add_role(FakeRole(self, "@everyone", 0, role_id=self.id))
+        bot_role = self._add_role(FakeRole(self, "Survivor Bot", 1))
+        self.me = self.add_member("Survivor Bot", [bot_role])
+
+    # Setup helpers: these build the starting state without any API calls.
+
+    def _add_role(self, role: FakeRole) -> FakeRole:
+        self._roles[role.id] = role
+        guild_index.add(role)
+        return role
+
+    def _remove_role(self, role: FakeRole):
+        del self._roles[role.id]
+        guild_index.remove(role)
+        self._renumber_roles(self.roles)
+
+    def _renumber_roles(self, order: list[FakeRole]):
+        for position, role in enumerate(order):
+            role.position = position
+
+    def add_role(self, name: str, color: int = 0) -> FakeRole:
+        """Add a role directly below the bot's role."""
+        bot_role = self.me.top_role
+        role = FakeRole(self, name, bot_role.position, color)
+        bot_role.position += 1
+        return self._add_role(role)
+
+    def _add_channel(self, channel: _FakeChannel) -> _FakeChannel:
+        self._channels[channel.id] = channel
+        guild_index.add(channel)
+        return channel
+
+    def _remove_channel(self, channel: _FakeChannel):
+        del self._channels[channel.id]
+        guild_index.remove(channel)
+
+    def add_category(self, name: str, overwrites: dict | None = None) -> FakeCategory:
+        return self._add_channel(FakeCategory(self, name, len(self.categories), overwrites))
+
+    def add_text_channel(self, name: str, category: FakeCategory | None = None, overwrites: dict | None = None) -> FakeTextChannel:
+        position = len(category.text_channels) if category else 0
+        return self._add_channel(FakeTextChannel(self, name, position, category, overwrites))
+
+    def add_member(self, name: str, roles: list[FakeRole] | None = None, member_id: int | None = None) -> FakeMember:
+        member = FakeMember(self, name, member_id, roles)
+        self._members[member.id] = member
+        return member
+
+    # The discord.Guild surface the bot uses.
+
+    @property
+    def roles(self) -> list[FakeRole]:
+        return sorted(self._roles.values(), key=lambda r: (r.position, r.id))
+
+    @property
+    def default_role(self) -> FakeRole:
+        return self._roles[self.id]
+
+    @property
+    def channels(self) -> list[_FakeChannel]:
+        return list(self._channels.values())
+
+    @property
+    def categories(self) -> list[FakeCategory]:
+        return sorted((c for c in self._channels.values() if isinstance(c, FakeCategory)), key=lambda c: (c.position, c.id))
+
+    @property
+    def text_channels(self) -> list[FakeTextChannel]:
+        return sorted((c for c in self._channels.values() if isinstance(c, FakeTextChannel)), key=lambda c: (c.position, c.id))
+
+    @property
+    def members(self) -> list[FakeMember]:
+        return list(self._members.values())
+
+    @property
+    def member_count(self) -> int:
+        return len(self._members)
+
+    def get_role(self, role_id: int) -> FakeRole | None:
+        return self._roles.get(role_id)
+
+    def get_channel(self, channel_id: int) -> _FakeChannel | None:
+        return self._channels.get(channel_id)
+
+    def get_member(self, member_id: int) -> FakeMember | None:
+        return self._members.get(member_id)
+
+    async def fetch_member(self, member_id: int) -> FakeMember:
+        await self.api.request("GET /guilds/{guild_id}/members/{user_id}", self.id)
+        member = self._members.get(member_id)
+        if member is None:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Member")
+        return member
+
+    async def query_members(self, *, user_ids: list[int], limit: int = 5, cache: bool = True) -> list[FakeMember]:
+        # A gateway request, not HTTP, but it costs a round trip all the same.
+        await self.api.request("GATEWAY REQUEST_GUILD_MEMBERS", self.id)
+        return [self._members[user_id] for user_id in user_ids if user_id in self._members]
+
+    async def create_role(self, *, name: str = "new role", color=None, colour=None, **kwargs) -> FakeRole:
+        await self.api.request("POST /guilds/{guild_id}/roles", self.id)
+        # Discord puts new roles at the bottom, right above @everyone.
+        for role in self._roles.values():
+            if role.position >= 1:
+                role.position += 1
+        return self._add_role(FakeRole(self, name, 1, _color_value(color or colour)))
+
+    async def edit_role_positions(self, positions: dict[FakeRole, int], *, reason: str | None = None):
+        await self.api.request("PATCH /guilds/{guild_id}/roles", self.id)
+        order = sorted(self._roles.values(), key=lambda r: (positions.get(r, r.position), r not in positions, r.id))
+        self._renumber_roles(order)
+
+    async def create_category(self, name: str, *, overwrites: dict | None = None, position: int | None = None, **kwargs) -> FakeCategory:
+        await self.api.request("POST /guilds/{guild_id}/channels", self.id)
+        return self._add_channel(FakeCategory(self, name, len(self.categories) if position is None else position, overwrites))
+
+    async def create_text_channel(self, name: str, *, category: FakeCategory | None = None, overwrites: dict | None = None, **kwargs) -> FakeTextChannel:
+        await self.api.request("POST /guilds/{guild_id}/channels", self.id)
+        # Without overwrites a new channel is synced with its category.
+        if overwrites is None and category is not None:
+            overwrites = category.overwrites
+        position = max((c.position + 1 for c in category.text_channels), default=0) if category else 0
+        return self._add_channel(FakeTextChannel(self, name, position, category, overwrites))
+
+class FakeMessage():
+    def __init__(self, api: FakeAPI, content: str | None = None, **kwargs):
+        self.id = snowflake()
+        self.api = api
+        self.content = content
+        self.kwargs = kwargs
+
+    async def edit(self, **kwargs):
+        await self.api.request("PATCH /channels/{channel_id}/messages/{message_id}", self.id)
+        self.kwargs.update(kwargs)
+        return self
+
+    async def delete(self, **kwargs):
+        await self.api.request("DELETE /channels/{channel_id}/messages/{message_id}", self.id)
+
+class FakeResponse():
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self) -> bool:
+        return self.done
+
+    async def _respond(self):
+        if self.done:
+            raise discord.InteractionResponded(self.interaction)
+        self.done = True
+        await self.interaction.guild.api.request("POST /interactions/{interaction_id}/{token}/callback", self.interaction.id)
+
+    async def defer(self, **kwargs):
+        await self._respond()
+
+    async def send_message(self, content: str | None = None, **kwargs):
+        await self._respond()
+        self.interaction.sent.append(content)
+
+    async def edit_message(self, content: str | None = None, **kwargs):
+        await self._respond()
+        if content is not None:
+            self.interaction.sent.append(content)
+
+class FakeFollowup():
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(self, content: str | None = None, **kwargs) -> FakeMessage:
+        await self.interaction.guild.api.request("POST /webhooks/{application_id}/{token}", self.interaction.id)
+        self.interaction.sent.append(content)
+        return FakeMessage(self.interaction.guild.api, content, **kwargs)
+
+class FakeInteraction():
+    """A component or command interaction in a fake guild. sent collects the
+    text of every response and followup."""
+
+    def __init__(self, guild: FakeGuild, user: FakeMember | None = None):
+        self.id = snowflake()
+        self.guild = guild
+        self.user = user
+        self.message = FakeMessage(guild.api)
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.sent: list[str | None] = []
+
+    async def edit_original_response(self, content: str | None = None, **kwargs):
+        await self.guild.api.request("PATCH /webhooks/{application_id}/{token}/messages/@original", self.id)
+        if content is not None:
+            self.sent.append(content)
+
+# Synthetic seasons
+
+# Rows collected by the benchmark suite, printed at the end of the run.
+REPORT: list[dict] = []
+
+TRIBE_COLORS = ("#e74c3c", "#3498db", "#2ecc71", "#f1c40f")
+
+def seed_season(guild: FakeGuild, players: int, tribes: int) -> list[FakeMember]:
+    """Register a season for guild with players spread round-robin over tribes.
+
+    The guild gets the roles and categories /setupserver makes and one
+    Castaway member per player; player and tribe roles are left to the
+    setup commands.
+    """
+    # Imported here: the database package imports the bot modules.
+    from database import cache, queries
+
+    for name in ("Viewer", "Trusted Viewer", "Castaway", "Immunity"):
+        guild.add_role(name)
+    for name in ("1-1's", "Closed", "1-1's Archive"):
+        guild.add_category(name)
+
+    queries.add_season(guild.id, guild.name)
+    for t in range(tribes):
+        queries.add_tribe(f"Tribe {t}", guild.id, color=TRIBE_COLORS[t % len(TRIBE_COLORS)], order_id=t)
+
+    castaway = guild_index.get_role(guild, "Castaway")
+    members = []
+    for p in range(players):
+        member = guild.add_member(f"user{p}", [castaway])
+        queries.add_user(member.id, member.name)
+        queries.add_player(f"Player {p:02}", member.id, guild.id, f"Tribe {p % tribes}")
+        members.append(member)
+    cache.invalidate(guild.id)
+    return members
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from bench import record
+from database import async_queries, cache, queries
+
+SERVER_ID = 1000
+
+def users(count: int, offset: int = 0) -> list[tuple[int, str]]:
+    return [(10_000 + offset + i, f"user{offset + i}") for i in range(count)]
+
+def seed_season(players: int = 12):
+    queries.add_season(SERVER_ID, "Test Season")
+    queries.add_tribe("Tribe", SERVER_ID)
+    for p in range(players):
+        queries.add_user(5000 + p, f"member{p}")
+        queries.add_player(f"Player {p:02}", 5000 + p, SERVER_ID, "Tribe")
+    cache.invalidate(SERVER_ID)
+
+async def ticker(stop: asyncio.Event, interval: float = 0.002) -> float:
+    """Worst gap between ticks while stop is unset."""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        worst = max(worst, now - last)
+        last = now
+    return worst
+
+async def worst_gap_during(operation) -> tuple[float, float]:
+    stop = asyncio.Event()
+    ticks = asyncio.create_task(ticker(stop))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await operation()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return await ticks, elapsed
+
+def test_slow_write_does_not_block_the_event_loop(db):
+    batch = users(30_000)
+
+    async def inline():
+        # What the handlers did before: the query runs on the loop's thread.
+        queries.add_users_bulk(batch)
+
+    async def offloaded():
+        await async_queries.add_users_bulk([(discord_id, f"{name}-renamed") for discord_id, name in batch])
+
+    blocked, write = asyncio.run(worst_gap_during(inline))
+    gap, _ = asyncio.run(worst_gap_during(offloaded))
+    record("event loop gap, slow write", "30k user upsert", blocked, gap)
+
+    # Inline, the loop stalls for the whole write. Offloaded, the worker
+    # thread only holds the GIL while it binds parameters.
+    assert blocked >= write / 2
+    assert gap < blocked / 2
+
+def test_reads_are_not_starved_behind_writes(db):
+    seed_season()
+
+    async def main():
+        finished = {}
+
+        async def call(name, query, *args, **kwargs):
+            await query(*args, **kwargs)
+            finished[name] = time.perf_counter()
+
+        # Interactions keep reading while member syncs write in between.
+        calls = []
+        for round_ in range(4):
+            calls.append(call(f"write{round_}", async_queries.add_users_bulk, users(5_000, round_ * 5_000)))
+            calls.extend(call(f"read{round_}.{i}", async_queries.get_roster, server_id=SERVER_ID) for i in range(10))
+        await asyncio.gather(*calls)
+        return finished
+
+    finished = asyncio.run(main())
+
+    # One worker, first in first out: a read never waits behind a write
+    # submitted after it, so each round's reads finish right after its write.
+    assert list(finished) == [f"write{r}" if i < 0 else f"read{r}.{i}" for r in range(4) for i in range(-1, 10)]
+    for r in range(1, 4):
+        write = finished[f"write{r}"] - finished[f"read{r - 1}.9"]
+        reads = finished[f"read{r}.9"] - finished[f"write{r}"]
+        assert reads < write
@@ -0,0 +1,177 @@
+"""API call, wall time and DB statement counts of the setup commands, run
+against fake guilds with synthetic seasons.
+
+Each operation runs the same way a click does: through its button callback,
+inside metrics.track(). The counts are checked against BASELINES, so a
+change that adds calls fails here; the numbers are also printed at the end
+of the run. BENCH_LATENCY sets the simulated latency of one API call in
+seconds (default 0.001), which only changes the wall times.
+"""
+import asyncio
+import os
+import time
+import pytest
+import guild_index
+import metrics
+from fake_discord import FakeAPI, FakeGuild, FakeInteraction, REPORT, seed_season
+from database import async_queries
+from helpers import LOCK_SUFFIX, ONE_ON_ONE_CATEGORY_SIZE
+from interfaces import PlayerEliminationView, ServerSetupButtons, TribeSetupButtons, TribeSwapPlayersView
+
+LATENCY = float(os.getenv("BENCH_LATENCY", "0.001"))
+
+SEASONS = [(8, 2), (18, 3), (24, 4), (40, 4)]
+
+# (players, tribes) -> operation -> (API calls, DB statements). API calls
+# include the interaction responses.
+BASELINES = {
+    (8, 2): {
+        "arrange_player_roles": (11, 52),
+        "arrange_player_roles (again)": (2, 2),
+        "arrange_tribe_roles": (5, 10),
+        "setuptribe1_1s": (20, 52),
+        "setuptribe1_1s (again)": (4, 4),
+        "archive_player_1_1s": (3, 1),
+        "tribe swap confirm": (23, 20),
+    },
+    (18, 3): {
+        "arrange_player_roles": (21, 102),
+        "arrange_player_roles (again)": (2, 2),
+        "arrange_tribe_roles": (6, 14),
+        "setuptribe1_1s": (57, 186),
+        "setuptribe1_1s (again)": (6, 6),
+        "archive_player_1_1s": (5, 1),
+        "tribe swap confirm": (53, 40),
+    },
+    (24, 4): {
+        "arrange_player_roles": (27, 132),
+        "arrange_player_roles (again)": (2, 2),
+        "arrange_tribe_roles": (7, 18),
+        "setuptribe1_1s": (76, 248),
+        "setuptribe1_1s (again)": (8, 8),
+        "archive_player_1_1s": (5, 1),
+        "tribe swap confirm": (71, 52),
+    },
+    (40, 4): {
+        "arrange_player_roles": (43, 212),
+        "arrange_player_roles (again)": (2, 2),
+        "arrange_tribe_roles": (7, 18),
+        "setuptribe1_1s": (196, 728),
+        "setuptribe1_1s (again)": (8, 8),
+        "archive_player_1_1s": (9, 1),
+        "tribe swap confirm": (119, 84),
+    },
+}
+
+async def bench(season: tuple[int, int], name: str, guild: FakeGuild, operation) -> dict:
+    interaction = FakeInteraction(guild)
+    calls = guild.api.total
+    limited = sum(guild.api.rate_limited.values())
+    started = time.perf_counter()
+    async with metrics.track(name, interaction) as span:
+        await operation(interaction)
+    row = {
+        "season": season,
+        "operation": name,
+        "api_calls": guild.api.total - calls,
+        "scheduled": span.api.calls,
+        "rate_limited": sum(guild.api.rate_limited.values()) - limited,
+        "wall": time.perf_counter() - started,
+        "db_statements": span.db_statements,
+        "sent": interaction.sent,
+    }
+    REPORT.append(row)
+    return row
+
+async def click(view, action: str, interaction: FakeInteraction):
+    item = next(item for item in view.children if item.custom_id.endswith(f":{action}"))
+    await view.dispatch(item.custom_id, interaction)
+
+async def run_season(players: int, tribes: int) -> dict[str, dict]:
+    season = (players, tribes)
+    guild = FakeGuild(f"bench-{players}-{tribes}", FakeAPI(latency=LATENCY))
+    members = seed_season(guild, players, tribes)
+    rows = {}
+
+    async def run(name, operation):
+        rows[name] = await bench(season, name, guild, operation)
+
+    server = await ServerSetupButtons.rehydrate(guild, 0)
+    await run("arrange_player_roles", lambda i: click(server, "setupplayerroles", i))
+    await run("arrange_player_roles (again)", lambda i: click(server, "setupplayerroles", i))
+    await run("arrange_tribe_roles", lambda i: click(server, "setuptriberoles", i))
+
+    # Reveal everyone without counting it: each member gets their player and tribe role.
+    roster = await async_queries.get_roster(server_id=guild.id)
+    for player in roster:
+        member = guild.get_member(player.discord_id)
+        member.roles.extend([player.role(guild), player.tribe.role(guild)])
+
+    tribe_list = await async_queries.get_tribe(server_id=guild.id)
+    views = [await TribeSetupButtons.rehydrate(guild, tribe.tribe_id) for tribe in tribe_list]
+
+    async def setup_all_1_1s(interaction, views=views):
+        for view in views:
+            # One click per tribe; each needs its own interaction to respond to.
+            await click(view, "setuptribe1_1s", interaction)
+            interaction.response.done = False
+    await run("setuptribe1_1s", setup_all_1_1s)
+    await run("setuptribe1_1s (again)", setup_all_1_1s)
+
+    eliminated = roster[0]
+    elimination = PlayerEliminationView(guild, eliminated, guild.get_member(eliminated.discord_id))
+    await run("archive_player_1_1s", lambda i: elimination.archive_player_1_1s())
+
+    # Everyone still in the game moves to the next tribe.
+    remaining = [player for player in roster if player != eliminated]
+    swap = TribeSwapPlayersView(guild, tribe_list, tribe_list, remaining, prev_message=None)
+    tribe_index = {tribe.tribe_id: i for i, tribe in enumerate(tribe_list)}
+    for player in remaining:
+        swap.assignments[tribe_list[(tribe_index[player.tribe_id] + 1) % tribes]].append(player)
+    await run("tribe swap confirm", lambda i: swap.confirm_swap_button.callback(i))
+
+    return rows, guild, members
+
+@pytest.mark.parametrize("players, tribes", SEASONS)
+def test_setup_commands(db, players, tribes):
+    rows, guild, members = asyncio.run(run_season(players, tribes))
+
+    for row in rows.values():
+        assert row["rate_limited"] == 0
+
+    # Re-running a setup command only responds to the interaction.
+    assert rows["arrange_player_roles (again)"]["scheduled"] == 0
+    assert rows["setuptribe1_1s (again)"]["scheduled"] == 0
+    assert rows["tribe swap confirm"]["sent"][-1].startswith(f"Swapped {players - 1}/{players - 1} player(s).")
+
+    # The fake guild ends up the way a live one would.
+    tribe_roles = {role for role in guild.roles if role.name.startswith("Tribe ")}
+    assert len(tribe_roles) == tribes
+    sizes = [len(range(t, players, tribes)) for t in range(tribes)]
+    one_on_ones = [c for c in guild.text_channels if c.category.name.startswith("Tribe ")]
+    archived = guild_index.get_category(guild, "1-1's Archive").text_channels
+    assert len(one_on_ones) + len(archived) == sum(n * (n - 1) // 2 for n in sizes)
+    assert len(archived) == sizes[0] - 1 and all(c.name.endswith(LOCK_SUFFIX) for c in archived)
+    assert all(len(category.text_channels) <= ONE_ON_ONE_CATEGORY_SIZE for category in guild.categories)
+    for member in members[1:]:
+        assert len(tribe_roles.intersection(member.roles)) == 1
+
+    assert {name: (row["api_calls"], row["db_statements"]) for name, row in rows.items()} == BASELINES[(players, tribes)]
+
+def test_rate_limited_setup_waits_and_completes(db):
+    route = "POST /guilds/{guild_id}/channels"
+
+    async def main():
+        guild = FakeGuild("bench-limited", FakeAPI(latency=LATENCY, limits={route: (5, 0.05)}))
+        seed_season(guild, 8, 2)
+        tribe_list = await async_queries.get_tribe(server_id=guild.id)
+        interaction = FakeInteraction(guild)
+        for tribe in tribe_list:
+            await click(await TribeSetupButtons.rehydrate(guild, tribe.tribe_id), "setuptribe1_1s", interaction)
+            interaction.response.done = False
+        return guild
+
+    guild = asyncio.run(main())
+    one_on_ones = [c for c in guild.text_channels if c.category.name.startswith("Tribe ")]
+    assert guild.api.rate_limited[route] > 0
+    assert len(one_on_ones) == 2 * (4 * 3 // 2)
@@ -0,0 +1,60 @@
+import sqlite3
+import threading
+from bench import best_of, record
+from database import connection, queries
+
+LOOKUP = "SELECT id FROM users WHERE discord_id = ?"
+
+def connect_per_call(discord_id: int):
+    # What every query did before: open, set up, run, close.
+    conn = sqlite3.connect(connection.DB_PATH, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON;")
+    try:
+        return conn.execute(LOOKUP, (discord_id,)).fetchone()
+    finally:
+        conn.close()
+
+def reused(discord_id: int):
+    with connection.connect() as conn:
+        return conn.execute(LOOKUP, (discord_id,)).fetchone()
+
+def test_connection_is_reused_per_thread(db):
+    assert connection.get_connection() is db
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(connection.get_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not db
+    other[0].close()
+
+def test_broken_connection_is_reopened(db):
+    db.close()
+
+    conn = connection.get_connection()
+    assert conn is not db
+    assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+
+def test_outermost_block_rolls_back_an_open_transaction(db):
+    with connection.connect() as outer:
+        outer.execute("INSERT INTO users (discord_id, username) VALUES (1, 'a')")
+        with connection.connect() as inner:
+            assert inner is outer
+        # Leaving the nested block keeps the transaction open.
+        assert outer.in_transaction
+
+    assert not db.in_transaction
+    assert db.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+
+def test_reused_connection_against_connect_per_call(db):
+    queries.add_users_bulk([(10_000 + i, f"user{i}") for i in range(1_000)])
+    ids = range(10_000, 10_100)
+
+    assert [tuple(connect_per_call(i)) for i in ids] == [tuple(reused(i)) for i in ids]
+
+    per_call = best_of(lambda: [connect_per_call(i) for i in ids]) / len(ids)
+    pooled = best_of(lambda: [reused(i) for i in ids]) / len(ids)
+    record("connect per call vs reused", "users point lookup", per_call, pooled)
+
+    assert pooled < per_call
@@ -0,0 +1,128 @@
+import copy
+import random
+import discord
+import guild_index
+from bench import best_of, record
+from fake_discord import FakeGuild, FakeRole, FakeTextChannel
+
+def populated(roles: int = 500, categories: int = 50, text_channels: int = 450) -> FakeGuild:
+    guild = FakeGuild()
+    for i in range(roles):
+        guild.add_role(f"role-{i}")
+    category_list = [guild.add_category(f"category-{i}") for i in range(categories)]
+    for i in range(text_channels):
+        guild.add_text_channel(f"channel-{i}", category_list[i % categories])
+    return guild
+
+# What the gateway does to the cache before dispatching the event bot.py
+# forwards to guild_index.
+
+def gateway_create(item):
+    (item.guild._roles if isinstance(item, discord.Role) else item.guild._channels)[item.id] = item
+    guild_index.add(item)
+
+def gateway_delete(item):
+    del (item.guild._roles if isinstance(item, discord.Role) else item.guild._channels)[item.id]
+    guild_index.remove(item)
+
+def gateway_rename(item, name: str):
+    before = copy.copy(item)
+    item.name = name
+    guild_index.update(before, item)
+
+def test_lookups_match_a_scan_of_the_guild():
+    guild = populated(roles=40, categories=5, text_channels=30)
+    # Duplicate names resolve to the lowest (position, id), like discord.utils.get.
+    guild.add_role("role-3")
+    guild.add_text_channel("channel-7", guild.categories[2])
+
+    for i in range(40):
+        assert guild_index.get_role(guild, f"role-{i}") is discord.utils.get(guild.roles, name=f"role-{i}")
+    for i in range(30):
+        assert guild_index.get_text_channel(guild, f"channel-{i}") is discord.utils.get(guild.text_channels, name=f"channel-{i}")
+        assert guild_index.get_channel(guild, f"channel-{i}") is discord.utils.get(guild.text_channels, name=f"channel-{i}")
+    for i in range(5):
+        assert guild_index.get_category(guild, f"category-{i}") is discord.utils.get(guild.categories, name=f"category-{i}")
+    assert guild_index.get_role(guild, "missing") is None
+
+def test_role_events_keep_the_index_current():
+    guild = populated(roles=5, categories=0, text_channels=0)
+    guild_index.get_role(guild, "role-0")
+
+    role = FakeRole(guild, "Tribe A", 1)
+    gateway_create(role)
+    assert guild_index.get_role(guild, "Tribe A") is role
+
+    gateway_rename(role, "Tribe B")
+    assert guild_index.get_role(guild, "Tribe A") is None
+    assert guild_index.get_role(guild, "Tribe B") is role
+
+    gateway_delete(role)
+    assert guild_index.get_role(guild, "Tribe B") is None
+
+def test_channel_events_keep_the_index_current():
+    guild = populated(roles=0, categories=2, text_channels=4)
+    guild_index.get_channel(guild, "channel-0")
+
+    category = guild.categories[0]
+    channel = FakeTextChannel(guild, "ana-ben", 9, category)
+    gateway_create(channel)
+    assert guild_index.get_text_channel(guild, "ana-ben") is channel
+
+    gateway_rename(channel, "ana-ben🔒")
+    assert guild_index.get_channel(guild, "ana-ben") is None
+    assert guild_index.get_text_channel(guild, "ana-ben🔒") is channel
+
+    gateway_delete(channel)
+    assert guild_index.get_channel(guild, "ana-ben🔒") is None
+
+    gateway_delete(category)
+    assert guild_index.get_category(guild, "category-0") is None
+
+def test_deleting_a_duplicate_falls_back_to_the_next_one():
+    guild = populated(roles=0, categories=0, text_channels=0)
+    lower = guild.add_role("Castaway")
+    upper = guild.add_role("Castaway")
+    assert guild_index.get_role(guild, "Castaway") is lower
+
+    gateway_delete(lower)
+    assert guild_index.get_role(guild, "Castaway") is upper
+
+def test_events_before_the_first_lookup_are_ignored():
+    guild = populated(roles=2, categories=0, text_channels=0)
+    role = FakeRole(guild, "Early", 1)
+    gateway_create(role)
+    assert guild.id not in guild_index._indexes
+
+    # The first lookup builds the index from the cache, which has the role.
+    assert guild_index.get_role(guild, "Early") is role
+
+def test_a_replaced_guild_object_rebuilds_the_index():
+    guild = populated(roles=2, categories=0, text_channels=0)
+    assert guild_index.get_role(guild, "role-1") is not None
+
+    # A full reconnect hands out a new Guild with the same id.
+    reconnected = FakeGuild()
+    reconnected.id = guild.id
+    role = reconnected.add_role("role-1")
+    assert guild_index.get_role(reconnected, "role-1") is role
+
+    guild_index.drop(reconnected)
+    assert guild.id not in guild_index._indexes
+
+def test_index_against_linear_scan():
+    guild = populated()
+    rng = random.Random(16)
+    roles = [f"role-{rng.randrange(500)}" for _ in range(1_000)]
+    channels = [f"channel-{rng.randrange(450)}" for _ in range(1_000)]
+
+    # guild.roles and guild.text_channels sort on every access, as in discord.py.
+    scan = best_of(lambda: [discord.utils.get(guild.roles, name=name) for name in roles], repeat=3) / len(roles)
+    indexed = best_of(lambda: [guild_index.get_role(guild, name) for name in roles], repeat=3) / len(roles)
+    record("guild_index vs scan", "500 roles", scan, indexed)
+    assert indexed < scan
+
+    scan = best_of(lambda: [discord.utils.get(guild.text_channels, name=name) for name in channels], repeat=3) / len(channels)
+    indexed = best_of(lambda: [guild_index.get_text_channel(guild, name) for name in channels], repeat=3) / len(channels)
+    record("guild_index vs scan", "450 text channels", scan, indexed)
+    assert indexed < scan
@@ -0,0 +1,143 @@
+import copy
+import logging
+import sqlite3
+import tracemalloc
+import pytest
+from bench import best_of, record
+from database import queries
+from player import Player
+from tribe import DEFAULT_COLOR, Tribe
+
+SERVER_ID = 1000
+
+def test_bad_color_falls_back_without_output(capsys):
+    assert Tribe(1, "Shark", 1, 1, "not-a-color", 1).color_int == DEFAULT_COLOR
+    assert Tribe(1, "Shark", 1, 1, None, 1).color_int == DEFAULT_COLOR
+    assert Tribe(1, "Shark", 1, 1, "#000000", 1).color_int == 0
+    assert capsys.readouterr().out == ""
+
+def test_loading_a_bad_color_logs_a_warning(db, caplog):
+    queries.add_season(SERVER_ID, "Test Season")
+    queries.add_tribe("Shark", SERVER_ID, color="00ff00")
+    db.execute("UPDATE tribes SET color = 'not-a-color'")
+    db.commit()
+
+    with caplog.at_level(logging.WARNING, logger="database_logger"):
+        tribes = queries.get_tribe(SERVER_ID)
+
+    assert [tribe.color_int for tribe in tribes] == [DEFAULT_COLOR]
+    assert "Tribe Shark has an invalid color 'not-a-color'" in caplog.text
+
+class DictPlayer():
+    # Player before it was slotted: a plain instance dict, built by keyword
+    # from dict(row) as the queries did.
+    def __init__(self, player_id, display_name, user_id, season_id, tribe_id, discord_id=None, tribe=None):
+        self.player_id = player_id
+        self.display_name = display_name
+        self.user_id = user_id
+        self.season_id = season_id
+        self.tribe_id = tribe_id
+        self.discord_id = discord_id
+        self.tribe = tribe
+
+def player_rows(count: int) -> list[sqlite3.Row]:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE players (id INTEGER PRIMARY KEY, display_name TEXT, user_id INT, season_id INT, tribe_id INT)")
+    conn.executemany("INSERT INTO players VALUES (?, ?, ?, ?, ?)", ((i, f"Player {i}", i, 1, i % 4) for i in range(count)))
+    rows = conn.execute("SELECT * FROM players").fetchall()
+    conn.close()
+    return rows
+
+def load_dict_players(rows) -> list[DictPlayer]:
+    players = []
+    for row in rows:
+        row_dict = dict(row)
+        players.append(DictPlayer(player_id=row_dict["id"], display_name=row_dict["display_name"], user_id=row_dict["user_id"],
+                                  season_id=row_dict["season_id"], tribe_id=row_dict["tribe_id"]))
+    return players
+
+def allocated(build) -> int:
+    tracemalloc.start()
+    try:
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+def test_models_are_immutable():
+    tribe = Tribe(1, "Shark", 2, 1, "#0000ff", 1)
+    player = Player(1, "Ana Lee", 1, 1, 1, tribe=tribe)
+
+    for model, field in ((player, "tribe_id"), (tribe, "color")):
+        with pytest.raises(AttributeError):
+            setattr(model, field, 2)
+        with pytest.raises(AttributeError):
+            delattr(model, field)
+
+def test_replace_returns_a_changed_copy():
+    tribe = Tribe(1, "Shark", 1, 1, "#0000ff", 1)
+    player = Player(1, "Ana Lee", 1, 1, 1, discord_id=42, tribe=tribe)
+
+    moved = player.replace(tribe_id=2, tribe=None)
+    assert (moved.tribe_id, moved.tribe, moved.discord_id) == (2, None, 42)
+    assert (player.tribe_id, player.tribe) == (1, tribe)
+
+    renamed = tribe.replace(iteration=2, color="ff0000")
+    assert (renamed.tribe_string, renamed.color_int, renamed.channel_slug) == ("Shark 2.0", 0xff0000, "shark")
+    assert tribe.tribe_string == "Shark"
+
+def test_slugs_are_derived_once():
+    player = Player(1, " Ana Lee ", 1, 1, 1)
+
+    assert player.channel_slug == "ana-lee"
+    assert player.one_on_one_slug == "analee"
+    assert player.channel_slug is player.channel_slug
+
+def test_from_row_against_dict_rows():
+    rows = player_rows(100_000)
+
+    old = best_of(lambda: load_dict_players(rows), repeat=3)
+    new = best_of(lambda: [Player.from_row(row) for row in rows], repeat=3)
+    record("Player.from_row", "100k rows", old, new)
+
+    old_bytes = allocated(lambda: load_dict_players(rows))
+    new_bytes = allocated(lambda: [Player.from_row(row) for row in rows])
+    assert new_bytes < old_bytes
+
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    tribe_rows = conn.execute("""
+        WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < 999)
+        SELECT i AS id, 'Tribe ' || i AS tribe_name, 1 AS iteration, 1 AS season_id, '#00ff00' AS color, i AS order_id FROM n
+    """).fetchall()
+    conn.close()
+
+    def load_dict_tribes():
+        tribes = []
+        for row in tribe_rows:
+            row_dict = dict(row)
+            tribes.append(Tribe(tribe_id=row_dict["id"], tribe_name=row_dict["tribe_name"], iteration=row_dict["iteration"],
+                                season_id=row_dict["season_id"], color=row_dict["color"], order_id=row_dict["order_id"]))
+        return tribes
+
+    old = best_of(load_dict_tribes, repeat=3)
+    new = best_of(lambda: [Tribe.from_row(row) for row in tribe_rows], repeat=3)
+    record("Tribe.from_row", "1k rows, vs dict(row)", old, new)
+
+def test_replace_against_copy_and_assign():
+    tribe = Tribe(1, "Shark", 1, 1, "#0000ff", 1)
+    player = Player(1, "Ana Lee", 1, 1, 1, discord_id=42, tribe=tribe)
+    dict_player = DictPlayer(1, "Ana Lee", 1, 1, 1, discord_id=42, tribe=tribe)
+
+    def copy_and_assign():
+        # What the season cache and swap_player_tribe did with mutable players.
+        moved = copy.copy(dict_player)
+        moved.tribe_id = 2
+        return moved
+
+    old = best_of(copy_and_assign, number=10_000)
+    new = best_of(lambda: player.replace(tribe_id=2), number=10_000)
+    record("Player.replace", "copy.copy + assign", old, new)
@@ -0,0 +1,84 @@
+import helpers
+from player import Player
+from tribe import Tribe
+
+class Role():
+    def __init__(self, role_id: int, name: str, position: int):
+        self.id = role_id
+        self.name = name
+        self.position = position
+
+    def __repr__(self):
+        return self.name
+
+def make_roles(*names: str) -> list[Role]:
+    """Roles bottom-up, starting with @everyone."""
+    return [Role(i + 1, name, i) for i, name in enumerate(("@everyone", *names))]
+
+def by_name(roles: list[Role], name: str) -> Role:
+    return next(role for role in roles if role.name == name)
+
+def apply(roles: list[Role], positions: dict[Role, int]) -> list[str]:
+    final = {role: positions.get(role, role.position) for role in roles}
+    assert len(set(final.values())) == len(roles)
+    return [role.name for role in sorted(roles, key=lambda r: final[r])]
+
+def baseline_order(roles: list[Role], tribes: list[Tribe], players: list[Player]) -> list[str]:
+    """Replay the role.move(above=previous_role) loops the bulk edit replaced,
+    with discord.py's Role.move semantics."""
+    order = sorted(roles, key=lambda r: r.position)
+
+    def move(role, above):
+        rest = [r for r in order if r is not role]
+        index = rest.index(above) if above is not None else 1
+        rest.insert(max(index, 1), role)
+        order[:] = rest
+
+    for anchor, names in (("Immunity", [t.tribe_string for t in tribes]), ("Castaway", [p.display_name for p in players])):
+        previous = next((r for r in order if r.name == anchor), None)
+        for name in names:
+            role = by_name(roles, name)
+            move(role, previous)
+            previous = role
+    return [role.name for role in order]
+
+TRIBES = [Tribe(2, "Tiger", 1, 1, "ff0000", 2), Tribe(1, "Shark", 1, 1, "0000ff", 1)]
+PLAYERS = [Player(i, name, i, 1, 1) for i, name in enumerate(["Ana", "Ben", "Cy"], start=1)]
+
+def test_layout_matches_baseline_moves():
+    roles = make_roles("Ben", "Viewer", "Trusted Viewer", "Cy", "Castaway", "Ana", "Shark",
+                       "Immunity", "Tiger", "Survivor Bot", "Host")
+    layout = helpers.plan_role_layout(roles, PLAYERS, TRIBES, by_name(roles, "Survivor Bot"))
+    positions = helpers.plan_role_positions(roles, layout)
+
+    assert apply(roles, positions) == baseline_order(roles, TRIBES, PLAYERS)
+    assert apply(roles, positions)[-5:] == ["Shark", "Tiger", "Immunity", "Survivor Bot", "Host"]
+    assert by_name(roles, "Host") not in positions
+
+def test_layout_leaves_unchanged_roles_out():
+    roles = make_roles("Viewer", "Cy", "Ben", "Ana", "Castaway", "Shark", "Tiger", "Immunity", "Bot")
+    layout = helpers.plan_role_layout(roles, PLAYERS, TRIBES, by_name(roles, "Bot"))
+
+    assert helpers.plan_role_positions(roles, layout) == {}
+
+def test_blocked_roles_are_left_out_before_planning():
+    # Ana sits above the bot's role, so only the roles below it are reordered.
+    roles = make_roles("Ben", "Cy", "Castaway", "Shark", "Tiger", "Immunity", "Bot", "Ana", "Host")
+    layout = helpers.plan_role_layout(roles, PLAYERS, TRIBES, by_name(roles, "Bot"))
+    positions = helpers.plan_role_positions(roles, layout)
+
+    assert by_name(roles, "Ana") not in layout
+    assert max(positions.values()) < by_name(roles, "Bot").position
+    assert apply(roles, positions) == ["@everyone", "Cy", "Ben", "Castaway", "Shark", "Tiger", "Immunity", "Bot", "Ana", "Host"]
+
+def test_block_goes_below_the_bot_when_its_anchor_is_above():
+    roles = make_roles("Shark", "Castaway", "Tiger", "Bot", "Immunity")
+    layout = helpers.plan_role_layout(roles, [], TRIBES, by_name(roles, "Bot"))
+
+    assert apply(roles, helpers.plan_role_positions(roles, layout)) == ["@everyone", "Castaway", "Shark", "Tiger", "Bot", "Immunity"]
+
+def test_block_goes_to_the_bottom_without_its_anchor():
+    roles = make_roles("Viewer", "Ana", "Ben", "Bot")
+    layout = helpers.plan_role_layout(roles, PLAYERS, [], by_name(roles, "Bot"))
+
+    assert apply(roles, helpers.plan_role_positions(roles, layout)) == ["@everyone", "Ben", "Ana", "Viewer", "Bot"]
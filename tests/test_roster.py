@@ -0,0 +1,79 @@
+import asyncio
+from database import cache, queries
+
+SERVER_ID = 1000
+
+def seed_season(players: int, tribes: int = 3):
+    queries.add_season(SERVER_ID, "Test Season")
+    for t in range(tribes):
+        queries.add_tribe(f"Tribe {t}", SERVER_ID, color="#00ff00", order_id=t)
+    for p in range(players):
+        queries.add_user(5000 + p, f"user{p}")
+        queries.add_player(f"Player {p:02}", 5000 + p, SERVER_ID, f"Tribe {p % tribes}")
+    cache.invalidate(SERVER_ID)
+
+def test_get_roster_is_one_query(db, statements):
+    seed_season(players=12)
+
+    with statements:
+        roster = queries.get_roster(SERVER_ID)
+
+    assert len(statements) == 1
+    assert [player.display_name for player in roster] == sorted(f"Player {p:02}" for p in range(12))
+    assert all(player.discord_id == 5000 + int(player.display_name[-2:]) for player in roster)
+    assert all(player.tribe.tribe_name == f"Tribe {int(player.display_name[-2:]) % 3}" for player in roster)
+
+def test_get_roster_query_count_does_not_grow_with_the_roster(db, statements):
+    seed_season(players=40, tribes=4)
+
+    with statements:
+        roster = queries.get_roster(SERVER_ID)
+
+    assert len(roster) == 40
+    assert len(statements) == 1
+
+def test_get_roster_from_a_loaded_season_runs_no_query(db, statements):
+    seed_season(players=8)
+    queries.get_player(SERVER_ID)
+
+    with statements:
+        roster = queries.get_roster(SERVER_ID)
+
+    assert len(roster) == 8
+    assert len(statements) == 0
+
+def test_roster_discord_ids_need_no_per_player_query(db, statements):
+    seed_season(players=18)
+    roster = queries.get_roster(SERVER_ID)
+
+    async def discord_ids():
+        return [await player.get_discord_id() for player in roster]
+
+    with statements:
+        ids = asyncio.run(discord_ids())
+
+    assert ids == [player.discord_id for player in roster]
+    assert len(statements) == 0
+
+def test_tribe_embeds_data_is_one_season_load(db, statements):
+    # What build_all_tribe_embeds reads: the tribes and the roster.
+    seed_season(players=24, tribes=4)
+
+    with statements:
+        tribes = queries.get_tribe(SERVER_ID)
+        roster = queries.get_roster(SERVER_ID)
+
+    assert len(tribes) == 4 and len(roster) == 24
+    # The season id, its tribes and its players; the roster is then served from the cache.
+    assert len(statements) == 3
+
+def test_new_database_does_not_see_cached_ids_or_names(db):
+    # Earlier tests cached users.id 1 and their player names; this database
+    # starts its ids at 1 again.
+    queries.add_season(SERVER_ID, "Test Season")
+    queries.add_user(7000, "someone-else")
+    queries.add_player("Newcomer", 7000, SERVER_ID)
+    queries.get_roster(SERVER_ID)
+
+    assert queries.get_user_discord_id(1) == 7000
+    assert cache.player_index(SERVER_ID).search("Player") == []
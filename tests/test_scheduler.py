@@ -0,0 +1,148 @@
+import asyncio
+import time
+import pytest
+import scheduler
+
+GUILD_ID = 1000
+
+class Target():
+    def __init__(self, target_id: int, log: list):
+        self.id = target_id
+        self.log = log
+
+    async def edit(self, **changes):
+        await asyncio.sleep(0.05)
+        self.log.append((self.id, changes))
+
+def job(log: list, name: str, seconds: float = 0.1):
+    async def run():
+        await asyncio.sleep(seconds)
+        log.append((name, time.perf_counter()))
+        return name
+    return run
+
+def test_interactive_job_does_not_wait_behind_held_bulk_jobs():
+    async def main():
+        jobs = scheduler.GuildScheduler(GUILD_ID, concurrency=4)
+        log = []
+        started = time.perf_counter()
+        bulk = [jobs.submit(job(log, f"bulk{i}")) for i in range(8)]
+        interactive = jobs.submit(job(log, "interactive"), priority=scheduler.INTERACTIVE)
+        await asyncio.gather(*bulk, interactive)
+        await jobs.close()
+        finished = dict(log)
+        return finished["interactive"] - started, [name for name, _ in log]
+
+    elapsed, order = asyncio.run(main())
+    # Same bucket: it has to wait for the bulk job already running, but not the ones queued after it.
+    assert order.index("interactive") == 1
+    assert elapsed < 0.3
+
+def test_busy_bucket_does_not_park_workers():
+    async def main():
+        jobs = scheduler.GuildScheduler(GUILD_ID, concurrency=4)
+        log = []
+        started = time.perf_counter()
+        bulk = [jobs.submit(job(log, f"bulk{i}")) for i in range(8)]
+        await asyncio.sleep(0)
+        other = await jobs.submit(job(log, "other"), bucket=("Role", 1))
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*bulk)
+        await jobs.close()
+        return other, elapsed
+
+    other, elapsed = asyncio.run(main())
+    assert other == "other"
+    assert elapsed < 0.15
+
+def test_interactive_edit_raises_coalesced_bulk_edit():
+    async def main():
+        jobs = scheduler.GuildScheduler(GUILD_ID, concurrency=1)
+        log = []
+        target = Target(1, log)
+        blocker = jobs.submit(job(log, "blocker", 0.05), priority=scheduler.INTERACTIVE, bucket=("Role", 99))
+        bulk_edit = jobs.edit(target, name="a")
+        bulk = jobs.submit(job(log, "bulk", 0.01), bucket=("Role", 2))
+        interactive_edit = jobs.edit(target, priority=scheduler.INTERACTIVE, color=1)
+        assert interactive_edit is bulk_edit
+        await asyncio.gather(blocker, bulk_edit, bulk)
+        await jobs.close()
+        return [entry[0] for entry in log], log
+
+    order, log = asyncio.run(main())
+    assert order == ["blocker", 1, "bulk"]
+    assert log[1] == (1, {"name": "a", "color": 1})
+
+def test_close_cancels_running_and_queued_jobs():
+    async def main():
+        jobs = scheduler.GuildScheduler(GUILD_ID, concurrency=1)
+        log = []
+        running = jobs.submit(job(log, "running", 10))
+        held = jobs.submit(job(log, "held", 10))
+        queued = jobs.submit(job(log, "queued", 10), bucket=("Role", 1))
+        await asyncio.sleep(0.01)
+        await jobs.close()
+        results = await asyncio.gather(running, held, queued, return_exceptions=True)
+        return results, log
+
+    results, log = asyncio.run(main())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert log == []
+
+def test_cancelled_job_does_not_stop_its_worker():
+    async def main():
+        jobs = scheduler.GuildScheduler(GUILD_ID, concurrency=1)
+
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        first = jobs.submit(cancelled)
+        second = jobs.submit(job([], "second", 0.01))
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        result = await second
+        await jobs.close()
+        return result, jobs.failed
+
+    assert asyncio.run(main()) == ("second", 1)
+
+def test_scheduler_restarts_on_a_new_loop_after_shutdown():
+    jobs = None
+
+    async def first():
+        nonlocal jobs
+        jobs = scheduler.GuildScheduler(GUILD_ID, concurrency=2)
+        return await jobs.submit(job([], "first", 0.01))
+
+    async def second():
+        result = await jobs.submit(job([], "second", 0.01))
+        await asyncio.sleep(0.01)
+        # Idle workers wait on the queue, which must belong to this loop.
+        alive = len(jobs.workers)
+        await jobs.close()
+        return result, alive
+
+    # asyncio.run cancels the idle workers when its loop closes.
+    assert asyncio.run(first()) == "first"
+    assert asyncio.run(second()) == ("second", 2)
+
+def test_measure_counts_only_its_own_jobs():
+    async def main():
+        jobs = scheduler.GuildScheduler(GUILD_ID, concurrency=4)
+
+        async def operation(count: int):
+            async with scheduler.measure() as cost:
+                await asyncio.gather(*(jobs.submit(job([], f"job{i}", 0.01), bucket=("Role", i)) for i in range(count)))
+            return cost
+
+        async def nested():
+            async with scheduler.measure() as outer:
+                inner = await operation(2)
+                await jobs.submit(job([], "outer", 0.01))
+            return outer, inner
+
+        first, second, (outer, inner) = await asyncio.gather(operation(3), operation(5), nested())
+        await jobs.close()
+        return first.calls, second.calls, outer.calls, inner.calls
+
+    assert asyncio.run(main()) == (3, 5, 3, 2)
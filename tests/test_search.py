@@ -0,0 +1,103 @@
+import random
+import string
+import pytest
+from bench import best_of, record
+from database.search import NameIndex, fold
+
+def index_of(*names: str) -> NameIndex:
+    index = NameIndex()
+    index.sync(names)
+    return index
+
+def test_fold_strips_case_and_accents():
+    assert fold("Zoë") == "zoe"
+    assert fold("ÉLAN") == "elan"
+    assert fold("Straße") == "strasse"
+
+def test_prefix_matches_rank_before_substring_matches():
+    index = index_of("Joanna", "Dan", "Annabel", "Hannah", "Anna", "Bob")
+
+    # Prefixes alphabetically, then substrings by where the match starts.
+    assert index.search("an") == ["Anna", "Annabel", "Dan", "Hannah", "Joanna"]
+
+def test_a_prefix_match_is_not_repeated_as_a_substring_match():
+    index = index_of("Ana", "Banana")
+
+    assert index.search("ana") == ["Ana", "Banana"]
+
+@pytest.mark.parametrize("query, expected", [
+    ("z", ["Zoë", "Liz"]),       # One character: a single n-gram posting.
+    ("iz", ["Liz"]),             # Two characters: a single n-gram posting.
+    ("oë", ["Zoë"]),
+    ("ZOE", ["Zoë"]),
+    ("renee", ["Renée"]),        # Longer queries intersect trigram postings.
+    ("ÉE", ["Renée"]),
+])
+def test_short_and_long_queries_are_folded(query, expected):
+    index = index_of("Zoë", "Liz", "Renée", "Bob")
+
+    assert index.search(query) == expected
+
+def test_trigram_candidates_are_checked_for_the_whole_query():
+    # "bcab abc" has every trigram of "abcab" but not the string itself.
+    index = index_of("bcab abc", "xabcabx")
+
+    assert index.search("abcab") == ["xabcabx"]
+
+def test_sync_adds_and_removes_only_what_changed():
+    index = index_of("Anna", "Bob", "Carl")
+    bob = index.folded["Bob"]
+
+    index.sync(["Anna", "Robert", "Carl"])
+
+    assert index.search("bob") == []
+    assert index.search("rob") == ["Robert"]
+    assert index.names == {"Anna", "Robert", "Carl"}
+    # Nothing of the old name is left behind in the trie or the n-grams.
+    assert not any("Bob" in names for names in index.ngram_index.values())
+    assert bob not in index.folded.values()
+    assert index._prefix_matches("b", 25) == []
+
+def test_sync_drops_empty_postings():
+    index = index_of("Qi")
+    index.sync([])
+
+    assert index.ngram_index == {}
+    assert index.search("") == []
+
+def test_results_are_capped_at_25():
+    index = index_of(*(f"Player {i:02}" for i in range(40)))
+
+    assert index.search("player") == [f"Player {i:02}" for i in range(25)]
+    assert len(index.search("")) == 25
+    assert len(index.search("1")) == 13
+    assert index.search("player", limit=3) == ["Player 00", "Player 01", "Player 02"]
+
+def random_names(count: int, seed: int = 9) -> list[str]:
+    rng = random.Random(seed)
+    return list({"".join(rng.choices(string.ascii_letters, k=rng.randint(4, 12))) for _ in range(count)})
+
+def linear_scan(names: list[str], current: str) -> list[str]:
+    # What autocomplete_players did before the index.
+    return [name for name in names if current.lower() in name.lower()][:25]
+
+@pytest.mark.parametrize("count", [100, 1_000, 10_000])
+def test_index_against_linear_scan(count):
+    names = random_names(count)
+    index = index_of(*names)
+    rng = random.Random(count)
+    queries = [name[start:start + length].lower() for name in rng.sample(names, 20)
+               for start, length in ((0, 3), (1, 2))]
+
+    for query in queries:
+        # Same names, the index only orders them.
+        scanned = [name for name in names if query in name.lower()]
+        assert set(index.search(query)) <= set(scanned)
+        assert len(index.search(query)) == min(len(scanned), 25)
+
+    scan = best_of(lambda: [linear_scan(names, query) for query in queries]) / len(queries)
+    indexed = best_of(lambda: [index.search(query) for query in queries]) / len(queries)
+    record("autocomplete search", f"{count} names", scan, indexed)
+
+    if count >= 10_000:
+        assert indexed < scan
@@ -0,0 +1,51 @@
+import asyncio
+import startup
+from database import connection
+
+class Member():
+    def __init__(self, member_id: int, name: str):
+        self.id = member_id
+        self.bot = False
+        self.name = name
+
+    def __str__(self):
+        return self.name
+
+class Guild():
+    def __init__(self, guild_id: int, members: list[Member]):
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.chunked = True
+        self.members = members
+        self.member_count = len(members)
+
+class Tree():
+    async def sync(self):
+        return []
+
+class Bot():
+    def __init__(self, guilds: list[Guild]):
+        self.guilds = guilds
+        self.tree = Tree()
+
+def stored_name(discord_id: int) -> str | None:
+    row = connection.get_connection().execute("SELECT username FROM users WHERE discord_id = ?", (discord_id,)).fetchone()
+    return row[0] if row else None
+
+def test_first_start_scans_every_guild(db):
+    guilds = [Guild(1, [Member(10, "a"), Member(11, "b")]), Guild(2, [Member(12, "c")])]
+    asyncio.run(startup.run_startup(Bot(guilds)))
+
+    assert [stored_name(i) for i in (10, 11, 12)] == ["a", "b", "c"]
+
+def test_every_ready_rescans(db):
+    # on_ready only follows a new session, which may have missed any number of
+    # renames; the member count stays the same.
+    members = [Member(10, "a"), Member(11, "b")]
+    bot = Bot([Guild(1, members)])
+    asyncio.run(startup.run_startup(bot))
+
+    members[0].name = "a-renamed"
+    asyncio.run(startup.run_startup(bot))
+
+    assert stored_name(10) == "a-renamed"
@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+import discord
+from fake_discord import FakeAPI, FakeGuild, FakeInteraction, seed_season
+from database import async_queries
+from helpers import execute_tribe_swap
+from interfaces import TribeSwapResultView
+
+REMOVE_ROLE = "DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}"
+
+async def swap_with_failed_removal():
+    guild = FakeGuild("swap", FakeAPI())
+    seed_season(guild, 4, 2)
+    tribe_list = await async_queries.get_tribe(server_id=guild.id)
+    for tribe in tribe_list:
+        guild.add_role(tribe.tribe_string, tribe.color_int)
+    roster = await async_queries.get_roster(server_id=guild.id)
+    for player in roster:
+        guild.add_role(player.display_name, player.tribe.color_int)
+        guild.get_member(player.discord_id).roles.extend([player.role(guild), player.tribe.role(guild)])
+
+    player = roster[0]
+    old_tribe = player.tribe
+    new_tribe = next(tribe for tribe in tribe_list if tribe.tribe_id != old_tribe.tribe_id)
+    guild.api.fail(REMOVE_ROLE, guild.id, discord.HTTPException(SimpleNamespace(status=500, reason="Server Error"), "boom"))
+    results = await execute_tribe_swap(guild, {player: new_tribe})
+    return guild, guild.get_member(player.discord_id), old_tribe, new_tribe, results
+
+def test_retry_failed_removes_the_original_tribe_role(db):
+    async def main():
+        guild, member, old_tribe, new_tribe, results = await swap_with_failed_removal()
+        assert not results[0].ok
+        assert old_tribe.role(guild) in member.roles
+
+        view = TribeSwapResultView(results)
+        interaction = FakeInteraction(guild)
+        await view.retry_failed.callback(interaction)
+        return guild, member, old_tribe, new_tribe, view, interaction
+
+    guild, member, old_tribe, new_tribe, view, interaction = asyncio.run(main())
+    assert view.results[0].ok
+    assert view.results[0].old_tribe.tribe_id == old_tribe.tribe_id
+    assert old_tribe.role(guild) not in member.roles
+    assert new_tribe.role(guild) in member.roles
+    assert view.retry_failed.disabled and not view.roll_back.disabled
+    assert interaction.sent[-1].endswith("(ok)")
+
+def test_roll_back_returns_to_the_original_tribe(db):
+    async def main():
+        guild, member, old_tribe, new_tribe, results = await swap_with_failed_removal()
+        view = TribeSwapResultView(results)
+        await view.retry_failed.callback(FakeInteraction(guild))
+        await view.roll_back.callback(FakeInteraction(guild))
+        roster = await async_queries.get_roster(server_id=guild.id)
+        return guild, member, old_tribe, new_tribe, roster
+
+    guild, member, old_tribe, new_tribe, roster = asyncio.run(main())
+    assert roster[0].tribe_id == old_tribe.tribe_id
+    assert old_tribe.role(guild) in member.roles
+    assert new_tribe.role(guild) not in member.roles
@@ -0,0 +1,60 @@
+import time
+import pytest
+from bench import record
+from database import queries
+
+def users(count: int, offset: int = 0, suffix: str = "") -> list[tuple[int, str]]:
+    return [(10_000 + offset + i, f"user{offset + i}{suffix}") for i in range(count)]
+
+def stored(db) -> dict[int, str]:
+    return dict(db.execute("SELECT discord_id, username FROM users").fetchall())
+
+def test_counts_inserted_and_updated(db):
+    assert queries.add_users_bulk(users(3)) == (3, 0)
+
+    # One renamed, one unchanged, one new.
+    batch = [(10_000, "user0-renamed"), (10_001, "user1"), (10_003, "user3")]
+    assert queries.add_users_bulk(batch) == (1, 1)
+    assert stored(db) == {10_000: "user0-renamed", 10_001: "user1", 10_002: "user2", 10_003: "user3"}
+
+def test_counts_span_chunks(db):
+    queries.add_users_bulk(users(1_000))
+    batch = users(500, suffix="-renamed") + users(1_200)[500:]
+
+    assert queries.add_users_bulk(batch, chunk_size=128) == (200, 500)
+    assert len(stored(db)) == 1_200
+
+def test_duplicates_in_one_batch_keep_the_last_name(db):
+    assert queries.add_users_bulk([(1, "a"), (1, "b")]) == (1, 1)
+    assert stored(db) == {1: "b"}
+
+def test_error_writes_nothing(db):
+    queries.add_users_bulk(users(2))
+    before = stored(db)
+
+    # The bad row is in the second chunk, after the first has been executed.
+    batch = users(2, suffix="-renamed") + users(3, offset=2) + [(None, "no id")]
+    assert queries.add_users_bulk(batch, chunk_size=3) == (0, 0)
+    assert stored(db) == before
+
+    # The connection is usable again afterwards.
+    assert queries.add_users_bulk(users(1, offset=5)) == (1, 0)
+
+@pytest.mark.parametrize("count", [1_000, 10_000, 100_000])
+def test_bulk_upsert_against_per_member_inserts(db, count):
+    members = users(count)
+
+    def timed(write) -> float:
+        db.execute("DELETE FROM users")
+        db.commit()
+        started = time.perf_counter()
+        write()
+        return time.perf_counter() - started
+
+    # What on_ready did before: one add_user call, and commit, per member.
+    loop = timed(lambda: [queries.add_user(discord_id, name) for discord_id, name in members])
+    bulk = timed(lambda: queries.add_users_bulk(members))
+    record("member sync write", f"{count} members", loop, bulk)
+
+    assert len(stored(db)) == count
+    assert bulk < loop
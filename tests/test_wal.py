@@ -0,0 +1,107 @@
+import sqlite3
+import threading
+import time
+import pytest
+import config
+from bench import record
+from database import connection
+
+# SQLite's defaults, which every connection used before the profiles.
+ROLLBACK_JOURNAL = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+def open_with(path: str, pragmas: dict) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    for pragma, value in pragmas.items():
+        conn.execute(f"PRAGMA {pragma} = {value};")
+    return conn
+
+def contention(path: str, pragmas: dict, seconds: float = 0.3, readers: int = 2) -> dict:
+    """One writer committing single-row upserts, as the member event
+    handlers do, against readers running point lookups."""
+    setup = open_with(path, pragmas)
+    setup.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, discord_id INT UNIQUE NOT NULL, username TEXT)")
+    setup.executemany("INSERT INTO users (discord_id, username) VALUES (?, ?)", ((i, f"user{i}") for i in range(1_000)))
+    setup.commit()
+    setup.close()
+
+    stop = threading.Event()
+    writes = []
+    reads = []
+    errors = []
+
+    def write():
+        conn = open_with(path, pragmas)
+        i = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                conn.execute("INSERT INTO users (discord_id, username) VALUES (?, ?) ON CONFLICT(discord_id) DO UPDATE SET username = excluded.username",
+                             (i % 1_000, f"user{i}"))
+                conn.commit()
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+            writes.append(time.perf_counter() - started)
+            i += 1
+        conn.close()
+
+    def read():
+        conn = open_with(path, pragmas)
+        i = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                conn.execute("SELECT id, username FROM users WHERE discord_id = ?", (i % 1_000,)).fetchone()
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+            reads.append(time.perf_counter() - started)
+            i += 7
+        conn.close()
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "write": sum(writes) / len(writes),
+        "read": sum(reads) / len(reads),
+        "worst_read": max(reads),
+        "errors": errors,
+    }
+
+@pytest.mark.parametrize("profile", connection.PROFILES)
+def test_profile_pragmas_are_applied(db, monkeypatch, profile):
+    monkeypatch.setattr(config, "DB_PROFILE", profile)
+    connection.close_connection()
+    conn = connection.get_connection()
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    synchronous = {"OFF": 0, "NORMAL": 1, "FULL": 2}[connection.PROFILES[profile]["synchronous"]]
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == connection.PROFILES[profile]["busy_timeout"]
+
+def test_unknown_profile_falls_back_to_balanced(monkeypatch):
+    monkeypatch.setattr(config, "DB_PROFILE", "reckless")
+    assert connection.get_profile() is connection.PROFILES["balanced"]
+
+def test_checkpoint_empties_the_wal(db):
+    db.executemany("INSERT INTO users (discord_id, username) VALUES (?, ?)", ((i, f"user{i}") for i in range(500)))
+    db.commit()
+
+    busy, wal_pages, checkpointed = connection.checkpoint()
+    assert busy == 0 and wal_pages > 0 and checkpointed == wal_pages
+
+@pytest.mark.parametrize("profile", connection.PROFILES)
+def test_profile_against_rollback_journal(tmp_path, profile):
+    baseline = contention(str(tmp_path / "rollback.db"), ROLLBACK_JOURNAL)
+    wal = contention(str(tmp_path / f"{profile}.db"), connection.PROFILES[profile])
+    record(f"{profile} profile", "mean write commit", baseline["write"], wal["write"])
+    record(f"{profile} profile", "mean read, writer busy", baseline["read"], wal["read"])
+    record(f"{profile} profile", "worst read, writer busy", baseline["worst_read"], wal["worst_read"])
+
+    # Under WAL readers never wait on the writer's lock.
+    assert wal["errors"] == []
+    assert wal["worst_read"] < baseline["worst_read"]
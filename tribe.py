@@ -1,6 +1,23 @@
+import sqlite3
 import discord
+import artifacts
+import guild_index
+
+DEFAULT_COLOR = 0xd3d3d3
+
+def parse_color(color: str | None) -> int | None:
+    """The color as an int, or None if it is not a hex color."""
+    try:
+        return int(color.lstrip("#"), 16)
+    except (AttributeError, ValueError):
+        return None
 
 class Tribe():
+    """A season's tribe. Immutable; use replace() to get a changed copy."""
+
+    __slots__ = ("tribe_id", "tribe_name", "iteration", "season_id", "color", "order_id",
+                 "tribe_string", "color_int", "channel_slug")
+
     def __init__(
             self,
             tribe_id: int | None,
@@ -10,17 +27,45 @@ class Tribe():
             color: str,
             order_id: int
     ):
-        self.tribe_id = tribe_id
-        self.tribe_name = tribe_name
-        self.iteration = iteration
-        self.season_id = season_id
-        self.color = color
-        self.order_id = order_id
-
-        if self.iteration == 1:
-            self.tribe_string = self.tribe_name
+        set_field = object.__setattr__
+        set_field(self, "tribe_id", tribe_id)
+        set_field(self, "tribe_name", tribe_name)
+        set_field(self, "iteration", iteration)
+        set_field(self, "season_id", season_id)
+        set_field(self, "color", color)
+        set_field(self, "order_id", order_id)
+
+        if iteration == 1:
+            set_field(self, "tribe_string", tribe_name)
         else:
-            self.tribe_string = f"{self.tribe_name} {self.iteration}.0"
+            set_field(self, "tribe_string", f"{tribe_name} {iteration}.0")
+        # A bad color in the database must not stop the season from loading.
+        color_int = parse_color(color)
+        set_field(self, "color_int", DEFAULT_COLOR if color_int is None else color_int)
+        set_field(self, "channel_slug", tribe_name.lower().strip().replace(" ", "-"))
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Tribe":
+        """Build from a tribes row (SELECT * FROM tribes)."""
+        return cls(row["id"], row["tribe_name"], row["iteration"], row["season_id"], row["color"], row["order_id"])
+
+    def replace(self, **changes) -> "Tribe":
+        fields = {
+            "tribe_id": self.tribe_id,
+            "tribe_name": self.tribe_name,
+            "iteration": self.iteration,
+            "season_id": self.season_id,
+            "color": self.color,
+            "order_id": self.order_id,
+        }
+        fields.update(changes)
+        return Tribe(**fields)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Tribe is immutable, use replace() to change {name}.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Tribe is immutable, cannot delete {name}.")
 
     def __repr__(self):
         return f"{self.tribe_string}"
@@ -39,9 +84,12 @@ class Tribe():
     
     def __hash__(self):
         return hash(self.tribe_id)
-    
+
+    def role(self, guild: discord.Guild) -> discord.Role | None:
+        return artifacts.get_cached(guild, artifacts.TRIBE_ROLE, self.tribe_id) or guild_index.get_role(guild, self.tribe_string)
+
     def mention(self, guild: discord.Guild):
-        tribe_role = discord.utils.get(guild.roles, name=self.tribe_string)
+        tribe_role = self.role(guild)
         if tribe_role:
             return tribe_role.mention
         else: